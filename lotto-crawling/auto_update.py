@@ -15,7 +15,10 @@ import csv
 import os
 from datetime import datetime
 from playwright.async_api import async_playwright
-from bs4 import BeautifulSoup
+
+from job_runs import instrumented, job_stage, set_target
+from lottery_csv import max_round
+from store_parser import parse_stores
 
 
 # 설정
@@ -82,14 +85,10 @@ class LottoAutoUpdater:
             print(f"⚠️  CSV 파일이 없습니다: {self.csv_file}")
             return 0
 
-        with open(self.csv_file, 'r', encoding='utf-8-sig') as f:
-            reader = csv.DictReader(f)
-            rounds = [int(row['회차']) for row in reader if row.get('회차')]
-
-        if not rounds:
+        latest = max_round(self.csv_file)
+        if not latest:
             return 0
 
-        latest = max(rounds)
         print(f"📁 로컬 최신 회차: {latest}회")
         return latest
 
@@ -131,8 +130,7 @@ class LottoAutoUpdater:
 
             # 데이터 추출
             html = await self.page.content()
-            soup = BeautifulSoup(html, 'html.parser')
-            stores = self._extract_stores(soup, str(round_num))
+            stores = await parse_stores(html, str(round_num))
 
             print(f"✅ {round_num}회: {len(stores)}개 판매점 수집")
             return stores
@@ -141,71 +139,6 @@ class LottoAutoUpdater:
             print(f"❌ {round_num}회 크롤링 실패: {e}")
             return []
 
-    def _extract_stores(self, soup: BeautifulSoup, round_num: str) -> list:
-        """HTML에서 판매점 정보 추출"""
-        stores = []
-        store_boxes = soup.select('.store-box')
-
-        for store_box in store_boxes:
-            try:
-                store_id = store_box.get('data-ltshpid', '')
-                store_name_elem = store_box.select_one('.store-loc')
-                store_name = store_name_elem.text.strip() if store_name_elem else ''
-
-                if not store_id or not store_name:
-                    continue
-
-                store_num_elem = store_box.select_one('.store-num')
-                store_num = store_num_elem.text.strip() if store_num_elem else ''
-
-                rank_elem = store_box.select_one('.draw-rank')
-                rank = rank_elem.text.strip() if rank_elem else ''
-
-                opt_elem = store_box.select_one('.draw-opt')
-                opt = opt_elem.text.strip() if opt_elem else ''
-
-                addr_elem = store_box.select_one('.store-addr')
-                address = addr_elem.text.strip() if addr_elem else ''
-
-                tel_elem = store_box.select_one('.store-tel')
-                phone = tel_elem.text.strip() if tel_elem else ''
-
-                lottery_types = []
-                for badge in store_box.select('.txt-bagge'):
-                    lottery_types.append(badge.text.strip())
-
-                lat_input = store_box.select_one('input.shpLat')
-                lon_input = store_box.select_one('input.shpLot')
-                latitude = lat_input.get('value', '') if lat_input else ''
-                longitude = lon_input.get('value', '') if lon_input else ''
-
-                region_elem = store_box.select_one('.tit-detail')
-                region = ''
-                if region_elem:
-                    region_text = region_elem.text.strip()
-                    region = region_text.split('(')[0].strip()
-
-                store_info = {
-                    '회차': round_num,
-                    '판매점ID': store_id,
-                    '번호': store_num,
-                    '판매점명': store_name,
-                    '등수': rank,
-                    '자동수동': opt,
-                    '지역': region,
-                    '주소': address,
-                    '전화번호': phone,
-                    '취급복권': ', '.join(lottery_types),
-                    '위도': latitude,
-                    '경도': longitude,
-                    '크롤링시간': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                }
-                stores.append(store_info)
-            except:
-                continue
-
-        return stores
-
     def append_to_csv(self, stores: list):
         """기존 CSV에 새 데이터 추가"""
         if not stores:
@@ -234,7 +167,9 @@ class LottoAutoUpdater:
             # 브라우저 시작
             await self.start_browser()
 
-            site_latest = await self.get_site_latest_round()
+            with job_stage('check_latest_round'):
+                site_latest = await self.get_site_latest_round()
+            set_target(target_round_no=site_latest or None)
 
             if site_latest == 0:
                 print("❌ 사이트 확인 실패")
@@ -250,14 +185,18 @@ class LottoAutoUpdater:
 
             # 새 회차들 크롤링
             all_new_stores = []
-            for round_num in new_rounds:
-                stores = await self.crawl_round(round_num)
-                all_new_stores.extend(stores)
-                await asyncio.sleep(2)  # 서버 부담 감소
+            with job_stage('crawl') as stage:
+                for round_num in new_rounds:
+                    stores = await self.crawl_round(round_num)
+                    all_new_stores.extend(stores)
+                    await asyncio.sleep(2)  # 서버 부담 감소
+                stage.records = len(all_new_stores)
 
             # CSV에 추가
             if all_new_stores:
-                self.append_to_csv(all_new_stores)
+                with job_stage('save_csv') as stage:
+                    self.append_to_csv(all_new_stores)
+                    stage.records = len(all_new_stores)
                 print(f"\n🎉 업데이트 완료! {len(new_rounds)}개 회차, {len(all_new_stores)}개 판매점 추가")
                 return True
             else:
@@ -302,6 +241,7 @@ class LottoAutoUpdater:
             await asyncio.sleep(interval)
 
 
+@instrumented('auto-update', lottery_type='LOTTO')
 async def main():
     parser = argparse.ArgumentParser(description='로또 당첨 판매점 자동 갱신')
     parser.add_argument('--csv', type=str, default=DEFAULT_CSV_FILE,
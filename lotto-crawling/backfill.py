@@ -0,0 +1,531 @@
+"""
+회차 분할 분산 백필
+전체 회차 재수집을 회차 구간(shard) 단위로 나눠 여러 프로세스/머신의 워커가 나눠 처리합니다.
+워커 1개 = Chromium 1개이므로 워커 수만큼 처리 속도가 늘어납니다.
+
+구성:
+- 작업 큐: SQLite 파일 (backfill_queue.db). 워커는 트랜잭션으로 구간을 하나씩 가져가고(lease),
+  처리 중에는 lease를 갱신합니다. 워커가 죽어 lease가 만료되면 다른 워커가 다시 가져갑니다.
+- 워커: 구간마다 ParallelLottoCrawler/ParallelPensionCrawler.crawl_all_rounds(start, end)를 실행하고
+  backfill_parts/<종류>/<종류>_<시작>-<끝>.csv에 구간 결과를 씁니다.
+  실패한 회차는 별도 구간으로 다시 큐에 넣고, MAX_ATTEMPTS번 실패하면 failed로 남깁니다.
+- 병합: 완료 구간 CSV를 회차 순으로 합쳐 lotto_all_rounds.csv / pension_all_rounds.csv를 만듭니다
+  (crawl_all_rounds.py와 같은 컬럼).
+
+사용법:
+    python backfill.py init --type both --shard-size 50    # 큐 생성 (기본 종료 회차: 추첨일 기준 최신 회차)
+    python backfill.py worker                              # 워커 1개 (터미널/머신마다 여러 개 실행 가능)
+    python backfill.py status                              # 진행 상황
+    python backfill.py merge                               # 구간 CSV 병합
+    python backfill.py run --type both --procs 4           # init + 로컬 워커 4개 + merge
+
+여러 머신에서 실행할 때는 --queue와 --parts-dir를 공유 스토리지(NFS 등)에 두고 각 머신에서 worker를 실행합니다.
+
+로컬 테스트 (실제 사이트 대신 fixture 서버):
+    python crawl_fixture_server.py &
+    python backfill.py run --procs 3 --end 40 --base-url http://127.0.0.1:8765/wnprchsplcsrch/home
+    python check_backfill_fixture.py --procs 2 --end 20     # 위 과정 + 병합 결과를 fixture CSV와 비교
+"""
+import argparse
+import asyncio
+import csv
+import importlib
+import os
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+
+from draw_calendar import FIRST_DRAW_DATES
+from profiling import profiled
+from store_parser import STORE_FIELDS
+
+BASE_DIR = Path(__file__).parent
+DEFAULT_QUEUE = BASE_DIR / 'backfill_queue.db'
+DEFAULT_PARTS_DIR = BASE_DIR / 'backfill_parts'
+
+DEFAULT_SHARD_SIZE = 50  # crawl_all_rounds의 50회차 휴식 주기와 맞춤
+LEASE_SECONDS = 1800
+POLL_SECONDS = 5
+MAX_ATTEMPTS = 3
+STATUS_INTERVAL = 30
+
+LOTTERY_TYPES = ('LOTTO', 'PENSION')
+CRAWLERS = {
+    'LOTTO': ('lotto_crawler', 'ParallelLottoCrawler'),
+    'PENSION': ('pension_crawler', 'ParallelPensionCrawler'),
+}
+OUTPUT_FILES = {
+    'LOTTO': 'lotto_all_rounds.csv',
+    'PENSION': 'pension_all_rounds.csv',
+}
+
+# 크롤러가 만드는 컬럼 (store_parser.parse_stores 결과, crawl_all_rounds.py 출력과 동일)
+PARTITION_COLUMNS = ['회차', *STORE_FIELDS, '크롤링시간']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shards (
+    id INTEGER PRIMARY KEY,
+    lottery_type TEXT NOT NULL,
+    start_round INTEGER NOT NULL,
+    end_round INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',  -- pending / running / done / failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL,
+    rows INTEGER,
+    output TEXT,                             -- parts 디렉터리 기준 상대 경로
+    error TEXT,
+    started_at REAL,
+    finished_at REAL,
+    UNIQUE (lottery_type, start_round, end_round)
+)
+"""
+
+
+def latest_drawn_round(lottery_type: str, today: date = None) -> int:
+    """오늘 이전에 추첨한 마지막 회차 (오늘 추첨 회차는 결과 게시 전일 수 있어 제외)."""
+    days = ((today or date.today()) - FIRST_DRAW_DATES[lottery_type]).days
+    return max(0, (days + 6) // 7)
+
+
+def round_ranges(rounds) -> list:
+    """회차 목록을 연속 구간 [(시작, 끝), ...]으로 묶습니다."""
+    ranges = []
+    for round_no in sorted(set(rounds)):
+        if ranges and ranges[-1][1] == round_no - 1:
+            ranges[-1][1] = round_no
+        else:
+            ranges.append([round_no, round_no])
+    return [tuple(r) for r in ranges]
+
+
+class ShardQueue:
+    """SQLite 기반 회차 구간 작업 큐 (여러 프로세스가 같은 파일을 공유)."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(str(self.path), timeout=60, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    @contextmanager
+    def transaction(self):
+        # IMMEDIATE: 읽기 시점부터 쓰기 잠금을 잡아 두 워커가 같은 구간을 가져가지 않도록 함
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+        self.conn.execute('COMMIT')
+
+    def add_range(self, lottery_type: str, start_round: int, end_round: int, shard_size: int) -> int:
+        """회차 범위를 shard_size 단위 구간으로 추가합니다 (이미 있는 구간은 건너뜀). 추가한 구간 수를 반환합니다."""
+        added = 0
+        with self.transaction() as conn:
+            for start in range(start_round, end_round + 1, shard_size):
+                cursor = conn.execute(
+                    'INSERT OR IGNORE INTO shards (lottery_type, start_round, end_round) VALUES (?, ?, ?)',
+                    (lottery_type, start, min(start + shard_size - 1, end_round)),
+                )
+                added += cursor.rowcount
+        return added
+
+    def claim(self, worker: str, lease: float = LEASE_SECONDS):
+        """대기 중이거나 lease가 만료된 구간 하나를 가져갑니다 (없으면 None)."""
+        now = time.time()
+        with self.transaction() as conn:
+            row = conn.execute("""
+                SELECT id FROM shards
+                WHERE status = 'pending' OR (status = 'running' AND lease_until < ?)
+                ORDER BY start_round, lottery_type
+                LIMIT 1
+            """, (now,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("""
+                UPDATE shards
+                SET status = 'running', worker = ?, lease_until = ?, attempts = attempts + 1,
+                    started_at = ?, error = NULL
+                WHERE id = ?
+            """, (worker, now + lease, now, row['id']))
+            return conn.execute('SELECT * FROM shards WHERE id = ?', (row['id'],)).fetchone()
+
+    def renew(self, shard_id: int, worker: str, lease: float = LEASE_SECONDS):
+        self.conn.execute(
+            "UPDATE shards SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'running'",
+            (time.time() + lease, shard_id, worker),
+        )
+
+    def complete(self, shard, rows: int, output: str, failed_rounds=(), max_attempts: int = MAX_ATTEMPTS) -> bool:
+        """
+        구간 완료 처리. 실패한 회차는 새 구간으로 다시 넣습니다 (시도 횟수 이어서 계산).
+
+        lease가 만료돼 다른 워커가 구간을 가져갔으면 아무것도 바꾸지 않고 False를 반환합니다.
+        """
+        retry_status = 'pending' if shard['attempts'] < max_attempts else 'failed'
+        with self.transaction() as conn:
+            cursor = conn.execute("""
+                UPDATE shards
+                SET status = 'done', rows = ?, output = ?, lease_until = NULL, finished_at = ?
+                WHERE id = ? AND worker = ? AND status = 'running'
+            """, (rows, output, time.time(), shard['id'], shard['worker']))
+            if cursor.rowcount == 0:
+                return False
+            for start, end in round_ranges(int(r) for r in failed_rounds):
+                conn.execute("""
+                    INSERT INTO shards (lottery_type, start_round, end_round, status, attempts, error)
+                    VALUES (?, ?, ?, ?, ?, '회차 크롤링 실패')
+                    ON CONFLICT (lottery_type, start_round, end_round) DO UPDATE
+                    SET status = excluded.status, attempts = excluded.attempts, error = excluded.error,
+                        worker = NULL, lease_until = NULL
+                """, (shard['lottery_type'], start, end, retry_status, shard['attempts']))
+        return True
+
+    def fail(self, shard, error: str, max_attempts: int = MAX_ATTEMPTS) -> bool:
+        """
+        구간 전체 실패 (브라우저 시작 실패 등). 시도 횟수가 남았으면 다시 대기 상태로 돌립니다.
+
+        다른 워커가 이미 가져간 구간이면 그 워커의 상태를 덮어쓰지 않고 False를 반환합니다.
+        """
+        status = 'pending' if shard['attempts'] < max_attempts else 'failed'
+        cursor = self.conn.execute("""
+            UPDATE shards SET status = ?, error = ?, worker = NULL, lease_until = NULL, finished_at = ?
+            WHERE id = ? AND worker = ? AND status = 'running'
+        """, (status, error[:500], time.time(), shard['id'], shard['worker']))
+        return cursor.rowcount > 0
+
+    def unfinished(self, lottery_type: str = None) -> int:
+        query = "SELECT COUNT(*) FROM shards WHERE status IN ('pending', 'running')"
+        params = ()
+        if lottery_type:
+            query += ' AND lottery_type = ?'
+            params = (lottery_type,)
+        return self.conn.execute(query, params).fetchone()[0]
+
+    def shards(self, lottery_type: str = None, status: str = None) -> list:
+        query, params = 'SELECT * FROM shards WHERE 1 = 1', []
+        if lottery_type:
+            query += ' AND lottery_type = ?'
+            params.append(lottery_type)
+        if status:
+            query += ' AND status = ?'
+            params.append(status)
+        return self.conn.execute(query + ' ORDER BY lottery_type, start_round', params).fetchall()
+
+    def summary(self) -> dict:
+        """
+        종류별 진행 상황 {'shards': {status: 구간 수}, 'rounds': 전체 회차 수, 'done_rounds': 완료 회차 수, 'rows': 행 수}.
+        재시도 구간은 원래 구간의 일부이므로 회차는 집합으로 셉니다.
+        """
+        result = {}
+        for shard in self.shards():
+            item = result.setdefault(shard['lottery_type'], {'shards': {}, 'all': set(), 'open': set(), 'rows': 0})
+            item['shards'][shard['status']] = item['shards'].get(shard['status'], 0) + 1
+            rounds = range(shard['start_round'], shard['end_round'] + 1)
+            item['all'].update(rounds)
+            if shard['status'] == 'done':
+                item['rows'] += shard['rows'] or 0
+            else:
+                item['open'].update(rounds)
+        return {
+            lottery_type: {
+                'shards': item['shards'],
+                'rounds': len(item['all']),
+                'done_rounds': len(item['all'] - item['open']),
+                'rows': item['rows'],
+            }
+            for lottery_type, item in result.items()
+        }
+
+
+def partition_path(lottery_type: str, start_round: int, end_round: int) -> str:
+    name = lottery_type.lower()
+    return f"{name}/{name}_{start_round:05d}-{end_round:05d}.csv"
+
+
+def write_partition(parts_dir: Path, shard, rows: list) -> str:
+    """구간 결과를 임시 파일에 쓴 뒤 교체합니다 (lease 만료로 두 워커가 같은 구간을 처리해도 안전)."""
+    relative = partition_path(shard['lottery_type'], shard['start_round'], shard['end_round'])
+    path = parts_dir / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    with open(tmp, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.DictWriter(f, fieldnames=PARTITION_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp, path)
+    return relative
+
+
+async def crawl_shard(shard, base_url: str = None):
+    """구간 하나를 크롤링합니다. (판매점 행 목록, 실패 회차 목록)을 반환합니다."""
+    module_name, class_name = CRAWLERS[shard['lottery_type']]
+    crawler_class = getattr(importlib.import_module(module_name), class_name)
+    crawler = crawler_class(max_workers=1)
+    if base_url:
+        crawler.url = base_url
+    rows = await crawler.crawl_all_rounds(
+        start_round=shard['start_round'],
+        end_round=shard['end_round'],
+        save_interval=0,
+    )
+    return rows, list(crawler.failed_rounds)
+
+
+async def _keep_lease(queue: ShardQueue, shard_id: int, worker: str, lease: float):
+    while True:
+        await asyncio.sleep(lease / 3)
+        queue.renew(shard_id, worker, lease)
+
+
+async def run_worker(queue_path, parts_dir, worker: str, base_url: str = None,
+                     lease: float = LEASE_SECONDS, max_attempts: int = MAX_ATTEMPTS) -> int:
+    """
+    큐가 빌 때까지 구간을 가져가 처리합니다.
+    다른 워커가 처리 중인 구간이 남아 있으면 lease 만료(워커 종료)에 대비해 기다립니다.
+
+    Returns:
+        처리한 구간 수
+    """
+    queue = ShardQueue(queue_path)
+    parts_dir = Path(parts_dir)
+    processed = 0
+    try:
+        while True:
+            shard = queue.claim(worker, lease)
+            if shard is None:
+                if queue.unfinished() == 0:
+                    break
+                await asyncio.sleep(POLL_SECONDS)
+                continue
+
+            label = f"{shard['lottery_type']} {shard['start_round']}~{shard['end_round']}회"
+            print(f"\n📦 [{worker}] {label} 시작 (시도 {shard['attempts']}/{max_attempts})")
+            keeper = asyncio.create_task(_keep_lease(queue, shard['id'], worker, lease))
+            try:
+                rows, failed_rounds = await crawl_shard(shard, base_url)
+                output = write_partition(parts_dir, shard, rows)
+                if queue.complete(shard, len(rows), output, failed_rounds, max_attempts):
+                    print(f"✅ [{worker}] {label} 완료: {len(rows)}개 판매점"
+                          + (f", 실패 회차 {len(failed_rounds)}개 재등록" if failed_rounds else ''))
+                else:
+                    print(f"⚠️  [{worker}] {label}: lease 만료로 다른 워커가 가져감 - 완료 기록 안 함")
+            except Exception as e:
+                if queue.fail(shard, str(e), max_attempts):
+                    print(f"❌ [{worker}] {label} 실패: {e}")
+                else:
+                    print(f"⚠️  [{worker}] {label} 실패 (lease 만료로 다른 워커가 가져감): {e}")
+            finally:
+                keeper.cancel()
+            processed += 1
+    finally:
+        queue.close()
+    return processed
+
+
+def merge_partitions(queue: ShardQueue, parts_dir, lottery_type: str, output_file,
+                     allow_partial: bool = False) -> bool:
+    """완료 구간 CSV를 회차 순으로 합칩니다. 대기/진행 중 구간이 있으면 allow_partial 없이는 병합하지 않습니다."""
+    unfinished = queue.unfinished(lottery_type)
+    if unfinished and not allow_partial:
+        print(f"❌ {lottery_type}: 아직 끝나지 않은 구간 {unfinished}개 (--allow-partial로 강제 병합)")
+        return False
+
+    done = queue.shards(lottery_type, 'done')
+    if not done:
+        print(f"⚠️  {lottery_type}: 완료된 구간이 없습니다.")
+        return False
+
+    rows = []
+    for shard in done:
+        path = Path(parts_dir) / shard['output']
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            if header != PARTITION_COLUMNS:
+                raise ValueError(f"{path}: 예상과 다른 헤더 {header}")
+            rows.extend(reader)
+    # 재시도 구간은 원래 구간과 회차가 겹치지 않으므로 회차 기준 안정 정렬만 하면 됨
+    rows.sort(key=lambda row: int(row[0]))
+
+    output_file = Path(output_file)
+    tmp = output_file.with_name(f'.{output_file.name}.tmp')
+    with open(tmp, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(PARTITION_COLUMNS)
+        writer.writerows(rows)
+    os.replace(tmp, output_file)
+
+    rounds = {row[0] for row in rows}
+    print(f"💾 {lottery_type}: {len(done)}개 구간 → {output_file} ({len(rows):,}개 판매점, {len(rounds)}개 회차)")
+    failed = queue.shards(lottery_type, 'failed')
+    if failed:
+        ranges = ', '.join(f"{s['start_round']}~{s['end_round']}" for s in failed)
+        print(f"   ⚠️ 실패 구간 (판매점이 없는 회차일 수 있음): {ranges}")
+    return True
+
+
+def print_status(queue: ShardQueue):
+    summary = queue.summary()
+    if not summary:
+        print("📭 큐가 비어 있습니다. (python backfill.py init)")
+        return
+    for lottery_type in LOTTERY_TYPES:
+        item = summary.get(lottery_type)
+        if not item:
+            continue
+        shards = ' | '.join(f"{status} {item['shards'][status]}" for status in ('pending', 'running', 'done', 'failed')
+                            if status in item['shards'])
+        print(f"  {lottery_type:<8} 회차 {item['done_rounds']}/{item['rounds']} "
+              f"({item['done_rounds'] / item['rounds'] * 100:.1f}%) | 판매점 {item['rows']:,}개 | 구간 {shards}")
+    for shard in queue.shards(status='running'):
+        remaining = shard['lease_until'] - time.time()
+        print(f"    - {shard['worker']}: {shard['lottery_type']} {shard['start_round']}~{shard['end_round']}회 "
+              f"(lease {remaining:.0f}초 남음)")
+
+
+def selected_types(value: str) -> list:
+    return list(LOTTERY_TYPES) if value == 'both' else [value.upper()]
+
+
+def init_queue(queue: ShardQueue, types: list, start_round: int, end_round: int, shard_size: int):
+    for lottery_type in types:
+        end = end_round or latest_drawn_round(lottery_type)
+        added = queue.add_range(lottery_type, start_round, end, shard_size)
+        print(f"📋 {lottery_type}: {start_round}~{end}회 → {shard_size}회차 구간 {added}개 추가")
+
+
+def run_local(args) -> int:
+    """init + 로컬 워커 프로세스 N개 + merge. 워커 출력은 parts 디렉터리의 worker-N.log에 저장합니다."""
+    parts_dir = Path(args.parts_dir)
+    parts_dir.mkdir(parents=True, exist_ok=True)
+    types = selected_types(args.type)
+    queue = ShardQueue(args.queue)
+    init_queue(queue, types, args.start, args.end, args.shard_size)
+
+    print(f"\n🚀 로컬 워커 {args.procs}개 시작 (로그: {parts_dir}/worker-N.log)")
+    started = time.time()
+    procs = []
+    for i in range(args.procs):
+        command = [sys.executable, str(Path(__file__).resolve()),
+                   '--queue', str(Path(args.queue).resolve()), '--parts-dir', str(parts_dir.resolve()),
+                   'worker', '--name', f'{socket.gethostname()}-{i + 1}']
+        if args.base_url:
+            command += ['--base-url', args.base_url]
+        log = open(parts_dir / f'worker-{i + 1}.log', 'w', encoding='utf-8')
+        procs.append((subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT, cwd=BASE_DIR), log))
+
+    last_status = started
+    try:
+        while any(proc.poll() is None for proc, _ in procs):
+            time.sleep(1)
+            if args.status_interval > 0 and time.time() - last_status >= args.status_interval:
+                last_status = time.time()
+                print(f"\n⏱️  {last_status - started:.0f}초 경과")
+                print_status(queue)
+    finally:
+        for proc, log in procs:
+            if proc.poll() is None:
+                proc.terminate()
+            proc.wait()
+            log.close()
+
+    elapsed = time.time() - started
+    failed_workers = [i + 1 for i, (proc, _) in enumerate(procs) if proc.returncode]
+    print(f"\n✅ 워커 종료 ({elapsed / 60:.1f}분)")
+    print_status(queue)
+    if failed_workers:
+        print(f"⚠️  비정상 종료 워커: {failed_workers} (로그 확인)")
+
+    results = [merge_partitions(queue, parts_dir, t, Path(args.output_dir) / OUTPUT_FILES[t]) for t in types]
+    queue.close()
+    return 0 if all(results) else 1
+
+
+@profiled('backfill')
+def main():
+    parser = argparse.ArgumentParser(description='회차 분할 분산 백필')
+    parser.add_argument('--queue', default=str(DEFAULT_QUEUE), help=f'작업 큐 SQLite 파일 (기본값: {DEFAULT_QUEUE.name})')
+    parser.add_argument('--parts-dir', default=str(DEFAULT_PARTS_DIR),
+                        help=f'구간 CSV 디렉터리 (기본값: {DEFAULT_PARTS_DIR.name}/)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    def add_range_args(p):
+        p.add_argument('--type', choices=['lotto', 'pension', 'both'], default='both', help='복권 종류 (기본값: both)')
+        p.add_argument('--start', type=int, default=1, help='시작 회차 (기본값: 1)')
+        p.add_argument('--end', type=int, default=None, help='종료 회차 (기본값: 추첨일 기준 최신 회차)')
+        p.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE,
+                       help=f'구간당 회차 수 (기본값: {DEFAULT_SHARD_SIZE})')
+
+    p_init = sub.add_parser('init', help='작업 큐에 회차 구간 추가')
+    add_range_args(p_init)
+    p_init.add_argument('--reset', action='store_true', help='기존 큐와 구간 CSV 삭제 후 생성')
+
+    p_worker = sub.add_parser('worker', help='워커 실행 (큐가 빌 때까지)')
+    p_worker.add_argument('--name', default=None, help='워커 이름 (기본값: 호스트명-PID)')
+    p_worker.add_argument('--base-url', default=None, help='크롤링 페이지 URL (fixture 서버 테스트용)')
+    p_worker.add_argument('--lease', type=float, default=LEASE_SECONDS, help=f'구간 lease 초 (기본값: {LEASE_SECONDS})')
+    p_worker.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS,
+                          help=f'구간당 최대 시도 횟수 (기본값: {MAX_ATTEMPTS})')
+
+    sub.add_parser('status', help='진행 상황 출력')
+
+    p_merge = sub.add_parser('merge', help='구간 CSV 병합')
+    p_merge.add_argument('--type', choices=['lotto', 'pension', 'both'], default='both', help='복권 종류 (기본값: both)')
+    p_merge.add_argument('--output-dir', default=str(BASE_DIR), help='병합 결과 디렉터리 (기본값: lotto-crawling/)')
+    p_merge.add_argument('--allow-partial', action='store_true', help='끝나지 않은 구간이 있어도 병합')
+
+    p_run = sub.add_parser('run', help='init + 로컬 워커 + merge')
+    add_range_args(p_run)
+    p_run.add_argument('--procs', type=int, default=max(1, min(4, os.cpu_count() or 1)),
+                       help='로컬 워커 프로세스 수 (기본값: CPU 수, 최대 4)')
+    p_run.add_argument('--base-url', default=None, help='크롤링 페이지 URL (fixture 서버 테스트용)')
+    p_run.add_argument('--output-dir', default=str(BASE_DIR), help='병합 결과 디렉터리 (기본값: lotto-crawling/)')
+    p_run.add_argument('--status-interval', type=float, default=STATUS_INTERVAL,
+                       help=f'진행 상황 출력 간격 초 (기본값: {STATUS_INTERVAL}, 0이면 출력 안 함)')
+
+    args = parser.parse_args()
+
+    if args.command == 'init':
+        if args.reset:
+            Path(args.queue).unlink(missing_ok=True)
+            shutil.rmtree(args.parts_dir, ignore_errors=True)
+        queue = ShardQueue(args.queue)
+        init_queue(queue, selected_types(args.type), args.start, args.end, args.shard_size)
+        queue.close()
+
+    elif args.command == 'worker':
+        name = args.name or f'{socket.gethostname()}-{os.getpid()}'
+        processed = asyncio.run(run_worker(args.queue, args.parts_dir, name, args.base_url,
+                                           args.lease, args.max_attempts))
+        print(f"\n🏁 [{name}] 종료: {processed}개 구간 처리")
+
+    elif args.command == 'status':
+        queue = ShardQueue(args.queue)
+        print_status(queue)
+        queue.close()
+
+    elif args.command == 'merge':
+        queue = ShardQueue(args.queue)
+        results = [merge_partitions(queue, args.parts_dir, t, Path(args.output_dir) / OUTPUT_FILES[t],
+                                    args.allow_partial)
+                   for t in selected_types(args.type)]
+        queue.close()
+        sys.exit(0 if all(results) else 1)
+
+    elif args.command == 'run':
+        sys.exit(run_local(args))
+
+
+if __name__ == '__main__':
+    main()
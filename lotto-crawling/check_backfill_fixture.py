@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+분산 백필(backfill.py) fixture 점검 스크립트
+crawl_fixture_server.py를 빈 포트로 띄우고 임시 디렉터리에서 `backfill.py run --procs N --end N`을 실행한 뒤,
+병합된 CSV가 fixture CSV의 1~N회 행과 (행 순서 무관하게) 같은지 확인합니다.
+큐/구간 CSV/병합 결과는 임시 디렉터리에만 쓰고 끝나면 지웁니다 (--keep이면 남김).
+
+필요: playwright + chromium (python -m playwright install chromium)
+
+사용법:
+    python check_backfill_fixture.py                          # 로또/연금복권 1~20회, 워커 2개
+    python check_backfill_fixture.py --type pension --end 40 --procs 3
+"""
+import argparse
+import importlib.util
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+from backfill import OUTPUT_FILES, selected_types
+from lottery_csv import iter_rows
+from profiling import profiled
+
+BASE_DIR = Path(__file__).parent
+SERVER_START_TIMEOUT = 30
+DIFF_SAMPLES = 5
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, process, timeout: float = SERVER_START_TIMEOUT) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            return False
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def row_counter(path, end_round: int) -> Counter:
+    """1~end_round회 행을 (복권 종류 제외) 필드 튜플의 다중집합으로 읽습니다."""
+    return Counter(row[:-1] for row in iter_rows(path) if row.round_no <= end_round)
+
+
+def compare(lottery_type: str, fixture_csv: Path, merged_csv: Path, end_round: int) -> list:
+    """병합 결과와 fixture의 차이를 메시지 목록으로 돌려줍니다 (같으면 빈 목록)."""
+    if not merged_csv.exists():
+        return [f"{lottery_type}: 병합 결과 없음 ({merged_csv})"]
+    expected = row_counter(fixture_csv, end_round)
+    actual = row_counter(merged_csv, end_round)
+    print(f"  - {lottery_type}: fixture {sum(expected.values()):,}행, 병합 {sum(actual.values()):,}행")
+    if expected == actual:
+        return []
+    problems = [f"{lottery_type}: 누락 {sum((expected - actual).values())}행, "
+                f"초과 {sum((actual - expected).values())}행"]
+    problems += [f"    누락: {row}" for row in list((expected - actual).elements())[:DIFF_SAMPLES]]
+    problems += [f"    초과: {row}" for row in list((actual - expected).elements())[:DIFF_SAMPLES]]
+    return problems
+
+
+@profiled('check-backfill-fixture')
+def main():
+    parser = argparse.ArgumentParser(description='분산 백필 fixture 서버 점검')
+    parser.add_argument('--type', choices=['lotto', 'pension', 'both'], default='both', help='복권 종류 (기본값: both)')
+    parser.add_argument('--end', type=int, default=20, help='종료 회차 (기본값: 20)')
+    parser.add_argument('--procs', type=int, default=2, help='로컬 워커 프로세스 수 (기본값: 2)')
+    parser.add_argument('--shard-size', type=int, default=5, help='구간당 회차 수 (기본값: 5 - 워커가 구간을 나눠 가지도록)')
+    parser.add_argument('--keep', action='store_true', help='점검 후 임시 디렉터리를 지우지 않음')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("분산 백필 fixture 점검")
+    print("=" * 60)
+
+    if importlib.util.find_spec('playwright') is None:
+        print("❌ playwright가 설치되지 않았습니다.")
+        print("설치: pip install playwright && python -m playwright install chromium")
+        sys.exit(1)
+
+    types = selected_types(args.type)
+    fixtures = {t: BASE_DIR / OUTPUT_FILES[t] for t in types}
+    missing = [str(path) for path in fixtures.values() if not path.exists()]
+    if missing:
+        print(f"❌ fixture CSV를 찾을 수 없습니다: {', '.join(missing)}")
+        sys.exit(1)
+
+    work_dir = Path(tempfile.mkdtemp(prefix='backfill-check-'))
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}/wnprchsplcsrch/home"
+    server = subprocess.Popen(
+        [sys.executable, 'crawl_fixture_server.py', '--port', str(port), '--csv', *map(str, fixtures.values())],
+        cwd=BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT,
+    )
+    problems = []
+    try:
+        if not wait_for_port(port, server):
+            print(f"❌ fixture 서버가 {SERVER_START_TIMEOUT}초 안에 시작되지 않았습니다.")
+            sys.exit(1)
+        print(f"\n🧪 fixture 서버: {base_url}")
+
+        command = [sys.executable, 'backfill.py',
+                   '--queue', str(work_dir / 'backfill_queue.db'), '--parts-dir', str(work_dir / 'parts'),
+                   'run', '--type', args.type, '--end', str(args.end), '--procs', str(args.procs),
+                   '--shard-size', str(args.shard_size), '--base-url', base_url,
+                   '--output-dir', str(work_dir), '--status-interval', '0']
+        print(f"▶️  {' '.join(command[1:])}")
+        started = time.perf_counter()
+        result = subprocess.run(command, cwd=BASE_DIR)
+        print(f"\n⏱️  백필 {time.perf_counter() - started:.1f}초, 종료 코드 {result.returncode}")
+        if result.returncode != 0:
+            problems.append(f"backfill.py run 종료 코드 {result.returncode} (로그: {work_dir / 'parts'}/worker-N.log)")
+
+        print(f"\n📊 병합 결과 비교 (1~{args.end}회)")
+        for lottery_type in types:
+            problems += compare(lottery_type, fixtures[lottery_type], work_dir / OUTPUT_FILES[lottery_type], args.end)
+    finally:
+        server.terminate()
+        server.wait()
+        if args.keep or problems:
+            print(f"\n💾 임시 디렉터리 유지: {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print("\n" + "=" * 60)
+    if problems:
+        for problem in problems:
+            print(problem if problem.startswith(' ') else f"❌ {problem}")
+        sys.exit(1)
+    print(f"✅ 워커 {args.procs}개 병합 결과가 fixture CSV와 일치")
+
+
+if __name__ == '__main__':
+    main()
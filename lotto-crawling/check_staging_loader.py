@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+COPY 적재기(staging_loader.py) 점검 스크립트
+로컬 Postgres에 일회용 DB를 만들어 supabase_schema.sql을 적용하고, CSV를 COPY + 병합으로 두 번 적재해
+테이블 행 수가 CSV에서 계산한 기대값과 같은지, 두 번째 적재가 아무 행도 바꾸지 않는지 확인합니다.
+끝나면 일회용 DB를 삭제합니다 (--keep이면 남김).
+
+사용법:
+    python check_staging_loader.py                                     # postgresql://localhost/postgres 사용
+    python check_staging_loader.py --admin-url postgresql://postgres@127.0.0.1:5432/postgres
+    python check_staging_loader.py --csv all_lottery_stores.csv --keep
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+from load_data_to_supabase import load_csv_data
+from profiling import profiled
+
+BASE_DIR = Path(__file__).parent
+SCHEMA_FILE = BASE_DIR.parent / 'supabase_schema.sql'
+DEFAULT_CSV = BASE_DIR / 'pension_all_rounds.csv'
+DEFAULT_ADMIN_URL = 'postgresql://localhost/postgres'
+
+
+def expected_counts(csv_path) -> tuple:
+    """CSV에서 테이블별 기대 행 수와 COPY에 넘길 stores 딕셔너리를 계산합니다."""
+    draws, stores, winning_records = load_csv_data(str(csv_path))
+    counts = {
+        'draws': len(draws),
+        'stores': len(stores),
+        'winning_records': len({record['source_row_hash'] for record in winning_records}),
+    }
+    return counts, stores
+
+
+def table_counts(cursor) -> dict:
+    counts = {}
+    for table in ('draws', 'stores', 'winning_records'):
+        cursor.execute(f"SELECT COUNT(*) FROM {table};")
+        counts[table] = cursor.fetchone()[0]
+    cursor.execute("SELECT COUNT(*) FROM winning_records WHERE won_at IS NULL;")
+    counts['null_won_at'] = cursor.fetchone()[0]
+    cursor.execute("SELECT COUNT(*) FROM stg_winning_store_rows;")
+    counts['staging'] = cursor.fetchone()[0]
+    return counts
+
+
+def run_checks(database_url: str, csv_path) -> list:
+    """적재 2회와 행 수 비교를 실행하고 실패 메시지 목록을 돌려줍니다."""
+    import psycopg2
+
+    from staging_loader import load_via_copy
+
+    failures = []
+    expected, stores = expected_counts(csv_path)
+    print(f"\n📊 기대 행 수: {expected}")
+
+    conn = psycopg2.connect(database_url)
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(SCHEMA_FILE.read_text(encoding='utf-8'))
+
+            first = load_via_copy(database_url, csv_path, stores)
+            print(f"\n📌 1차 적재: {first}")
+            counts = table_counts(cursor)
+            print(f"   테이블 행 수: {counts}")
+            for table, count in expected.items():
+                if counts[table] != count:
+                    failures.append(f"{table}: {counts[table]}행 (기대 {count}행)")
+                if first[table] != count:
+                    failures.append(f"1차 병합 {table}: {first[table]}행 (기대 {count}행)")
+            if first['rows'] != expected['winning_records']:
+                failures.append(f"COPY 행 수: {first['rows']} (기대 {expected['winning_records']})")
+            if counts['null_won_at']:
+                failures.append(f"won_at NULL: {counts['null_won_at']}행")
+            if counts['staging']:
+                failures.append(f"스테이징 테이블이 비워지지 않음: {counts['staging']}행")
+
+            second = load_via_copy(database_url, csv_path, stores)
+            print(f"\n📌 2차 적재 (같은 CSV): {second}")
+            recount = table_counts(cursor)
+            for table in expected:
+                if second[table]:
+                    failures.append(f"2차 병합이 {table} {second[table]}행을 바꿈 (기대 0행)")
+                if recount[table] != counts[table]:
+                    failures.append(f"2차 적재 후 {table}: {recount[table]}행 (1차 {counts[table]}행)")
+    finally:
+        conn.close()
+    return failures
+
+
+@profiled('check-staging-loader')
+def main():
+    parser = argparse.ArgumentParser(description='COPY 적재기 일회용 로컬 Postgres 점검')
+    parser.add_argument('--admin-url', default=os.getenv('CHECK_ADMIN_DATABASE_URL', DEFAULT_ADMIN_URL),
+                        help=f'CREATE DATABASE 권한이 있는 접속 URL (기본값: CHECK_ADMIN_DATABASE_URL 또는 {DEFAULT_ADMIN_URL})')
+    parser.add_argument('--csv', type=Path, default=DEFAULT_CSV,
+                        help=f'적재할 CSV (기본값: {DEFAULT_CSV.name})')
+    parser.add_argument('--keep', action='store_true', help='점검 후 일회용 DB를 삭제하지 않음')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("COPY 적재기 점검 (일회용 로컬 DB)")
+    print("=" * 60)
+
+    if not args.csv.exists():
+        print(f"❌ CSV 파일을 찾을 수 없습니다: {args.csv}")
+        sys.exit(1)
+
+    try:
+        import psycopg2
+        from psycopg2.extensions import make_dsn, parse_dsn
+    except ImportError:
+        print("❌ psycopg2가 설치되지 않았습니다.")
+        print("설치: pip install psycopg2-binary")
+        sys.exit(1)
+
+    db_name = f"lottomap_copy_check_{os.getpid()}"
+    admin = psycopg2.connect(args.admin_url)
+    admin.autocommit = True
+    try:
+        with admin.cursor() as cursor:
+            cursor.execute(f"CREATE DATABASE {db_name};")
+        print(f"\n🔗 일회용 DB 생성: {db_name}")
+        database_url = make_dsn(**{**parse_dsn(args.admin_url), 'dbname': db_name})
+
+        try:
+            failures = run_checks(database_url, args.csv)
+        finally:
+            if args.keep:
+                print(f"\n💾 DB 유지: {db_name}")
+            else:
+                with admin.cursor() as cursor:
+                    cursor.execute(f"DROP DATABASE IF EXISTS {db_name};")
+                print(f"\n🗑️  일회용 DB 삭제: {db_name}")
+    finally:
+        admin.close()
+
+    print("\n" + "=" * 60)
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ COPY 적재/병합 행 수 일치, 재적재 시 변경 없음")
+
+
+if __name__ == '__main__':
+    main()
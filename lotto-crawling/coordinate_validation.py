@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+판매점 좌표 검증/보정 단계
+CSV의 위도/경도를 벡터 연산으로 검사합니다.
+- 대한민국 영역(bounding box) 범위 검증
+- 위도/경도 뒤바뀜 감지 및 보정
+- 같은 판매점의 마지막 정상 좌표 대비 이동 거리(jump) 검사 (이상치 좌표는 기준에서 제외)
+
+이상치로 판정된 판매점만 geocode_cache/지오코딩으로 보냅니다.
+
+사용법:
+    python coordinate_validation.py                        # all_lottery_stores.csv 검증 리포트
+    python coordinate_validation.py --csv lotto_all_rounds.csv
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from lottery_csv import read_frame
+from profiling import profiled
+
+# 대한민국 영역 (제주/마라도 ~ 강원 북단, 서해 도서 ~ 울릉도/독도)
+KOREA_LAT_RANGE = (33.0, 38.7)
+KOREA_LNG_RANGE = (124.5, 132.0)
+
+# 주소가 같은데 이전 회차 대비 이 거리(km) 이상 움직이면 이상치로 판정
+MAX_JUMP_KM = 2.0
+
+EARTH_RADIUS_KM = 6371.0
+
+STATUS_OK = 'OK'
+STATUS_SWAPPED = 'SWAPPED'  # 위도/경도 뒤바뀜 → 교환하여 보정
+STATUS_MISSING = 'MISSING'
+STATUS_OUT_OF_RANGE = 'OUT_OF_RANGE'
+STATUS_JUMP = 'JUMP'
+
+# 지오코딩으로 보정해야 하는 상태
+SUSPECT_STATUSES = {STATUS_MISSING, STATUS_OUT_OF_RANGE, STATUS_JUMP}
+
+# 판매점/복권종류별 마지막 검증 좌표 (증분 적재 시 이동 거리 검사의 이전 좌표로 사용)
+BASELINE_FILE = Path(__file__).parent / 'coord_baseline.json'
+FRAME_COLUMNS = ['source_id', 'lottery_type', 'round_no', 'address', 'lat', 'lng']
+
+
+def _in_range(values, value_range):
+    return (values >= value_range[0]) & (values <= value_range[1])
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """두 좌표 배열 사이의 대원 거리(km)를 계산합니다."""
+    lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def _sequential_jumps(group_ids, address, lat, lng, usable, rows, max_jump_km: float):
+    """
+    rows(같은 그룹이 연속된 행 번호)를 순서대로 보며, 마지막으로 신뢰한 좌표(이동 거리 이상치가 아닌 좌표)와
+    비교해 이동 거리 이상치를 찾습니다. 이상치 행은 다음 행의 비교 기준이 되지 않습니다.
+    """
+    jumped = np.zeros(len(rows), dtype=bool)
+    current_group = None
+    ref_address = ref_lat = ref_lng = None
+    for position, i in enumerate(rows):
+        if group_ids[i] != current_group:
+            current_group = group_ids[i]
+            ref_address = None
+        if not usable[i]:
+            continue
+        if (ref_address is not None and ref_address == address[i]
+                and haversine_km(ref_lat, ref_lng, lat[i], lng[i]) > max_jump_km):
+            jumped[position] = True
+            continue
+        ref_address, ref_lat, ref_lng = address[i], lat[i], lng[i]
+    return jumped
+
+
+def validate_coordinates(frame: pd.DataFrame, max_jump_km: float = MAX_JUMP_KM) -> pd.DataFrame:
+    """
+    당첨 행 단위 좌표를 검증합니다.
+
+    Args:
+        frame: source_id, lottery_type, round_no, address, lat, lng 컬럼을 가진 DataFrame
+        max_jump_km: 이동 거리 이상치 기준 (km)
+
+    Returns:
+        lat/lng를 보정하고 coord_status 컬럼을 추가한 DataFrame
+        (source_id, lottery_type, round_no 순으로 정렬됨)
+    """
+    df = frame.sort_values(['source_id', 'lottery_type', 'round_no'], kind='mergesort').reset_index(drop=True)
+    lat = pd.to_numeric(df['lat'], errors='coerce').to_numpy(dtype='float64')
+    lng = pd.to_numeric(df['lng'], errors='coerce').to_numpy(dtype='float64')
+
+    missing = np.isnan(lat) | np.isnan(lng)
+    valid = _in_range(lat, KOREA_LAT_RANGE) & _in_range(lng, KOREA_LNG_RANGE)
+    swapped = ~valid & _in_range(lng, KOREA_LAT_RANGE) & _in_range(lat, KOREA_LNG_RANGE)
+
+    fixed_lat = np.where(swapped, lng, lat)
+    fixed_lng = np.where(swapped, lat, lng)
+    usable = valid | swapped
+    fixed_lat[~usable] = np.nan
+    fixed_lng[~usable] = np.nan
+
+    # 같은 판매점/복권종류에서 마지막으로 신뢰한 좌표와 비교 (주소가 바뀐 경우는 이전으로 판단하여 제외)
+    # 1) 직전의 사용 가능한 좌표와 벡터 비교 → 후보가 없는 그룹은 그대로 확정
+    # 2) 후보가 있는 그룹만 순서대로 다시 보며, 이상치 좌표는 다음 행의 기준에서 제외 (A, A, B, A → B만 JUMP)
+    df['lat'] = fixed_lat
+    df['lng'] = fixed_lng
+    group_ids = df.groupby(['source_id', 'lottery_type'], sort=False).ngroup().to_numpy()
+    usable_rows = df.loc[usable, ['lat', 'lng', 'address']].reindex(df.index)
+    prev = usable_rows.groupby(group_ids, sort=False).shift().groupby(group_ids, sort=False).ffill()
+    jump_km = haversine_km(prev['lat'].to_numpy(dtype='float64'), prev['lng'].to_numpy(dtype='float64'),
+                           fixed_lat, fixed_lng)
+    same_address = (prev['address'] == df['address']).to_numpy()
+    jumped = usable & same_address & (np.nan_to_num(jump_km, nan=0.0) > max_jump_km)
+    if jumped.any():
+        rows = np.flatnonzero(np.isin(group_ids, np.unique(group_ids[jumped])))
+        jumped[rows] = _sequential_jumps(group_ids, df['address'].to_numpy(), fixed_lat, fixed_lng,
+                                         usable, rows, max_jump_km)
+
+    status = np.full(len(df), STATUS_OK, dtype=object)
+    status[swapped] = STATUS_SWAPPED
+    status[~usable] = STATUS_OUT_OF_RANGE
+    status[missing] = STATUS_MISSING
+    status[jumped] = STATUS_JUMP
+    df['coord_status'] = status
+    return df
+
+
+def latest_store_coordinates(validated: pd.DataFrame) -> pd.DataFrame:
+    """
+    판매점별 최신 회차의 좌표와 상태를 반환합니다.
+
+    load_csv_data와 동일하게 회차 번호가 가장 큰 행을 최신 정보로 사용합니다.
+    """
+    latest = validated.sort_values('round_no', kind='mergesort').drop_duplicates('source_id', keep='last')
+    return latest.set_index('source_id')[['address', 'lat', 'lng', 'coord_status']]
+
+
+def read_coordinate_frame(csv_path) -> pd.DataFrame:
+    """CSV에서 좌표 검증에 필요한 컬럼만 읽습니다."""
+    df = read_frame(csv_path, columns=['회차', '판매점ID', '주소', '위도', '경도'])
+    return pd.DataFrame({
+        'source_id': df['판매점ID'].str.strip(),
+        'lottery_type': df['복권종류'].astype(str).str.strip().str.upper(),
+        'round_no': df['회차'].astype('int64'),
+        'address': df['주소'].str.strip(),
+        'lat': df['위도'],
+        'lng': df['경도'],
+    })
+
+
+def read_coordinate_baseline(path=BASELINE_FILE):
+    """coord_baseline.json을 읽습니다. 없으면 None."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    return pd.read_json(path, orient='records', dtype={'source_id': str, 'lottery_type': str, 'address': str})
+
+
+def write_coordinate_baseline(validated: pd.DataFrame, previous: pd.DataFrame = None, path=BASELINE_FILE):
+    """
+    검증된 행(과 이전 기준 좌표)에서 판매점/복권종류별로 마지막으로 신뢰한(OK/SWAPPED) 좌표만 남겨 저장합니다.
+    이상치 좌표는 다음 실행의 비교 기준이 되지 않습니다.
+    """
+    frame = validated.loc[~validated['coord_status'].isin(SUSPECT_STATUSES), FRAME_COLUMNS]
+    if previous is not None:
+        frame = pd.concat([previous[FRAME_COLUMNS], frame], ignore_index=True)
+    latest = frame.sort_values('round_no', kind='mergesort').drop_duplicates(['source_id', 'lottery_type'], keep='last')
+    latest.to_json(path, orient='records', force_ascii=False)
+
+
+def validate_new_rows(rows, baseline: pd.DataFrame, max_jump_km: float = MAX_JUMP_KM) -> pd.DataFrame:
+    """
+    증분 적재로 새로 들어온 행만 검증합니다. 이동 거리 검사는 baseline의 마지막 좌표를 직전 회차로 사용합니다.
+
+    Args:
+        rows: (source_id, lottery_type, round_no, address, lat, lng) 튜플 목록 (좌표는 원문 문자열)
+        baseline: read_coordinate_baseline() 결과
+
+    Returns:
+        새 행만 담은 validate_coordinates 결과
+    """
+    new = pd.DataFrame(rows, columns=FRAME_COLUMNS)
+    new['baseline'] = False
+    previous = baseline[baseline['source_id'].isin(new['source_id'])][FRAME_COLUMNS].copy()
+    previous['baseline'] = True
+    validated = validate_coordinates(pd.concat([previous, new], ignore_index=True), max_jump_km)
+    return validated[~validated['baseline']].drop(columns='baseline')
+
+
+def repair_store_coordinates(stores: dict, csv_path, geocode_cache=None, provider=None, new_rows=None):
+    """
+    load_csv_data가 만든 stores 딕셔너리의 좌표를 검증/보정합니다.
+
+    정상/뒤바뀜 좌표는 보정값으로 덮어쓰고, 이상치 판매점만 지오코딩합니다.
+    지오코딩 결과가 없으면 이상치 좌표는 None으로 두고, 적재 시 DB에 이미 있는 좌표를 그대로 유지합니다.
+
+    Args:
+        stores: source_id -> store_data 딕셔너리 (제자리에서 수정)
+        csv_path: 원본 CSV 경로
+        geocode_cache: geocode_worker의 캐시 (선택)
+        provider: geocode_worker의 지오코딩 제공자 (선택)
+        new_rows: 증분 적재 시 새 행의 좌표 목록 (validate_new_rows 형식). coord_baseline.json이 있으면
+            CSV 전체 대신 이 행만 검증합니다.
+
+    Returns:
+        상태별 판매점 수 딕셔너리
+    """
+    baseline = read_coordinate_baseline() if new_rows is not None else None
+    if baseline is not None:
+        validated = validate_new_rows(new_rows, baseline)
+    else:
+        validated = validate_coordinates(read_coordinate_frame(csv_path))
+    write_coordinate_baseline(validated, baseline)
+    latest = latest_store_coordinates(validated)
+
+    suspects = latest[latest['coord_status'].isin(SUSPECT_STATUSES)]
+    geocoded = {}
+    if geocode_cache is not None and provider is not None and len(suspects):
+        from geocode_worker import geocode_addresses, normalize_address
+        results, _ = geocode_addresses(suspects['address'].tolist(), geocode_cache, provider)
+        geocoded = {a: results.get(normalize_address(a)) for a in suspects['address']}
+
+    counts = latest['coord_status'].value_counts().to_dict()
+    for source_id, row in latest.iterrows():
+        store = stores.get(source_id)
+        if store is None:
+            continue
+        store['coord_status'] = row['coord_status']
+        if row['coord_status'] in SUSPECT_STATUSES:
+            coords = geocoded.get(row['address'])
+            store['lat'], store['lng'] = coords if coords else (None, None)
+        else:
+            store['lat'], store['lng'] = float(row['lat']), float(row['lng'])
+    counts['geocoded'] = sum(1 for c in geocoded.values() if c)
+    return counts
+
+
+@profiled('coordinate-validation')
+def main():
+    parser = argparse.ArgumentParser(description='판매점 좌표 검증 리포트')
+    parser.add_argument('--csv', type=str, default='all_lottery_stores.csv', help='검증할 CSV 파일')
+    parser.add_argument('--max-jump-km', type=float, default=MAX_JUMP_KM,
+                        help=f'이동 거리 이상치 기준 km (기본값: {MAX_JUMP_KM})')
+    args = parser.parse_args()
+
+    csv_path = Path(args.csv)
+    if not csv_path.is_absolute():
+        csv_path = Path(__file__).parent / csv_path
+    if not csv_path.exists():
+        print(f"❌ CSV 파일을 찾을 수 없습니다: {csv_path}")
+        sys.exit(1)
+
+    print("=" * 60)
+    print("판매점 좌표 검증")
+    print("=" * 60)
+
+    validated = validate_coordinates(read_coordinate_frame(csv_path), max_jump_km=args.max_jump_km)
+    latest = latest_store_coordinates(validated)
+
+    print(f"\n당첨 행 기준 ({len(validated):,}행):")
+    for status, count in validated['coord_status'].value_counts().items():
+        print(f"  - {status}: {count:,}")
+
+    print(f"\n판매점 기준 ({len(latest):,}개, 최신 회차):")
+    for status, count in latest['coord_status'].value_counts().items():
+        print(f"  - {status}: {count:,}")
+
+    suspects = latest[latest['coord_status'].isin(SUSPECT_STATUSES)]
+    if len(suspects):
+        print("\n지오코딩 대상 샘플:")
+        for source_id, row in suspects.head(5).iterrows():
+            print(f"  - [{source_id}] {row['coord_status']}: {row['address'][:50]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -8,21 +8,27 @@
     python crawl_all_rounds.py --start 1000      # 1000회부터 크롤링
     python crawl_all_rounds.py --start 1000 --end 1100  # 1000~1100회 크롤링
     python crawl_all_rounds.py --workers 5       # 워커 5개로 크롤링
+    python crawl_all_rounds.py --metrics-output crawl_metrics.json  # 회차별 지표를 JSON으로 저장
 """
 
 import asyncio
 import argparse
 from lotto_crawler import ParallelLottoCrawler
+from job_runs import instrumented, job_stage, set_target
 
 
+@instrumented('crawl-lotto', lottery_type='LOTTO')
 async def main():
     parser = argparse.ArgumentParser(description='전체 회차 로또 당첨 판매점 크롤링')
     parser.add_argument('--start', type=int, default=1, help='시작 회차 (기본값: 1)')
     parser.add_argument('--end', type=int, default=None, help='종료 회차 (기본값: 최신 회차)')
     parser.add_argument('--workers', type=int, default=3, help='병렬 워커 수 (기본값: 3, 권장: 2-5)')
     parser.add_argument('--output', type=str, default='lotto_all_rounds.csv', help='출력 파일명')
+    parser.add_argument('--metrics-output', type=str, default='crawl_metrics_lotto.prom',
+                        help='회차별 크롤링 지표 파일 (.json이면 JSON, 그 외 Prometheus 텍스트)')
 
     args = parser.parse_args()
+    set_target(target_round_no=args.end)
 
     print("\n" + "="*60)
     print("🎰 로또 전체 회차 크롤러")
@@ -37,14 +43,19 @@ async def main():
     crawler = ParallelLottoCrawler(max_workers=args.workers)
 
     # 전체 회차 크롤링
-    all_stores = await crawler.crawl_all_rounds(
-        start_round=args.start,
-        end_round=args.end
-    )
+    with job_stage('crawl') as stage:
+        all_stores = await crawler.crawl_all_rounds(
+            start_round=args.start,
+            end_round=args.end,
+            metrics_output=args.metrics_output
+        )
+        stage.records = len(all_stores)
 
     # CSV 저장
     if all_stores:
-        crawler.save_to_csv(all_stores, args.output)
+        with job_stage('save_csv') as stage:
+            crawler.save_to_csv(all_stores, args.output)
+            stage.records = len(all_stores)
 
         # 통계 출력
         print("\n" + "="*60)
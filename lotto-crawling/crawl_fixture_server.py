@@ -0,0 +1,168 @@
+"""
+크롤러 테스트용 가짜 당첨 판매점 페이지
+실제 사이트(dhlottery.co.kr/wnprchsplcsrch/home) 대신 로컬 CSV로 같은 구조의 페이지를 제공합니다.
+ParallelLottoCrawler/ParallelPensionCrawler가 쓰는 요소만 흉내냅니다.
+
+- select#ltGds (lt645 / pt720), select#srchLtEpsd (최신 회차가 첫 번째)
+- .store-list, WnPrchsPlcSrchM.fn_selectWnShp() → .store-box 목록 갱신
+- .store-box 안의 .store-loc, .store-num, .draw-rank, .draw-opt, .store-addr, .store-tel, .txt-bagge,
+  input.shpLat/shpLot, .tit-detail
+
+사용법:
+    python crawl_fixture_server.py                           # http://127.0.0.1:8765/wnprchsplcsrch/home
+    python crawl_fixture_server.py --delay 0.5 --port 9000   # 회차 조회마다 0.5초 지연 (사이트 응답 흉내)
+    python backfill.py run --procs 3 --end 40 --base-url http://127.0.0.1:8765/wnprchsplcsrch/home
+"""
+import argparse
+import html
+import json
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from lottery_csv import iter_rows
+from profiling import profiled
+
+PAGE_PATH = '/wnprchsplcsrch/home'
+STORES_PATH = '/fixture/stores'
+LOTTERY_CODES = {'lt645': 'LOTTO', 'pt720': 'PENSION'}
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="ko">
+<head><meta charset="utf-8"><title>당첨 판매점 (fixture)</title></head>
+<body>
+<select id="ltGds">
+  <option value="lt645">로또6/45</option>
+  <option value="pt720">연금복권720+</option>
+</select>
+<select id="srchLtEpsd"></select>
+<div class="store-list"><ul id="storeList"></ul></div>
+<script>
+const ROUNDS = __ROUNDS__;
+function fillRounds() {
+  const select = document.getElementById('srchLtEpsd');
+  select.innerHTML = '';
+  for (const round of ROUNDS[document.getElementById('ltGds').value] || []) {
+    select.add(new Option(round + '회', String(round)));
+  }
+}
+document.getElementById('ltGds').addEventListener('change', fillRounds);
+fillRounds();
+window.WnPrchsPlcSrchM = {
+  fn_selectWnShp: function () {
+    const params = new URLSearchParams({
+      type: document.getElementById('ltGds').value,
+      round: document.getElementById('srchLtEpsd').value,
+    });
+    return fetch('__STORES_PATH__?' + params).then(r => r.text()).then(body => {
+      document.getElementById('storeList').innerHTML = body;
+    });
+  },
+};
+</script>
+</body>
+</html>
+"""
+
+STORE_TEMPLATE = """<li class="store-box" data-ltshpid="{source_id}">
+  <div class="tit-detail">{region} (fixture)</div>
+  <strong class="store-loc">{name}</strong><span class="store-num">{seq}</span>
+  <span class="draw-rank">{prize}</span><span class="draw-opt">{method}</span>
+  <p class="store-addr">{address}</p><p class="store-tel">{phone}</p>
+  {badges}
+  <input type="hidden" class="shpLat" value="{lat}"><input type="hidden" class="shpLot" value="{lng}">
+</li>
+"""
+
+
+def load_fixture(csv_paths) -> dict:
+    """(복권 종류, 회차) -> StoreRow 목록. 없는 파일은 건너뜁니다."""
+    stores = defaultdict(list)
+    for path in csv_paths:
+        if not Path(path).exists():
+            print(f"⚠️  {path} 없음 - 건너뜀")
+            continue
+        for row in iter_rows(path):
+            stores[(row.lottery_type, row.round_no)].append(row)
+    return stores
+
+
+def render_stores(rows) -> str:
+    parts = []
+    for row in rows:
+        values = {field: html.escape(str(value if value is not None else '')) for field, value in row._asdict().items()}
+        values['badges'] = ''.join(
+            f'<span class="txt-bagge">{html.escape(name.strip())}</span>'
+            for name in row.products.split(',') if name.strip()
+        )
+        parts.append(STORE_TEMPLATE.format(**values))
+    return ''.join(parts)
+
+
+def make_handler(stores: dict, delay: float):
+    latest = defaultdict(int)
+    for lottery_type, round_no in stores:
+        latest[lottery_type] = max(latest[lottery_type], round_no)
+    rounds = {code: list(range(latest[lottery_type], 0, -1)) for code, lottery_type in LOTTERY_CODES.items()}
+    page = (PAGE_TEMPLATE
+            .replace('__ROUNDS__', json.dumps(rounds))
+            .replace('__STORES_PATH__', STORES_PATH)
+            .encode('utf-8'))
+
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == PAGE_PATH:
+                self._send(page)
+            elif url.path == STORES_PATH:
+                query = parse_qs(url.query)
+                lottery_type = LOTTERY_CODES.get(query.get('type', [''])[0])
+                try:
+                    round_no = int(query.get('round', ['0'])[0])
+                except ValueError:
+                    round_no = 0
+                if delay:
+                    time.sleep(delay)
+                self._send(render_stores(stores.get((lottery_type, round_no), [])).encode('utf-8'))
+            else:
+                self.send_error(404)
+
+        def _send(self, body: bytes):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FixtureHandler
+
+
+@profiled('crawl-fixture-server')
+def main():
+    parser = argparse.ArgumentParser(description='크롤러 테스트용 가짜 당첨 판매점 페이지')
+    parser.add_argument('--host', default='127.0.0.1', help='바인드 주소 (기본값: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='포트 (기본값: 8765)')
+    parser.add_argument('--csv', nargs='+', default=['lotto_all_rounds.csv', 'pension_all_rounds.csv'],
+                        help='판매점 데이터 CSV (기본값: lotto_all_rounds.csv pension_all_rounds.csv)')
+    parser.add_argument('--delay', type=float, default=0.0, help='회차 조회 응답 지연 (초, 기본값: 0)')
+    args = parser.parse_args()
+
+    stores = load_fixture(args.csv)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(stores, args.delay))
+    print(f"🧪 fixture 서버: http://{args.host}:{args.port}{PAGE_PATH} "
+          f"({len(stores)}개 회차, {sum(len(rows) for rows in stores.values()):,}개 판매점)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+"""
+회차별 크롤링 계측
+crawl_all_rounds의 회차마다 단계별 지연 시간, 페이지 크기, 재시도 횟수, 수집 행 수를 기록합니다.
+
+단계:
+- navigation: 회차 선택 + 조회 함수 호출
+- sleep: 고정 대기 (데이터 로드 대기, 실패 후 대기, 50회차 휴식)
+- wait: .store-box 표시 대기 (사이트 응답)
+- content: page.content()로 HTML 가져오기
+- parse: 판매점 추출 (store_parser 프로세스 풀에서 파싱, 결과 대기 시간)
+
+종료 시 단계별 히스토그램을 Prometheus 텍스트(.prom) 또는 JSON(.json)으로 내보내고,
+단계별 시간 비중과 느린 회차를 출력해 사이트/대기/파싱 중 무엇이 병목인지 보여줍니다.
+남은 시간은 최근 ETA_WINDOW개 회차의 실제 처리 속도로 계산합니다.
+"""
+import json
+import time
+from bisect import bisect_right
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+PHASES = ('navigation', 'sleep', 'wait', 'content', 'parse')
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 2.5, 5, 10, 15, 30)
+BYTES_BUCKETS = (16_384, 32_768, 65_536, 131_072, 262_144, 524_288, 1_048_576, 2_097_152)
+ROWS_BUCKETS = (0, 1, 5, 10, 20, 50, 100)
+
+ETA_WINDOW = 20
+SLOW_ROUND_COUNT = 10
+
+METRIC_PREFIX = 'lottomap_crawl'
+
+
+class RoundMetrics:
+    """회차 1개의 계측값. phase()로 단계 시간을 누적합니다 (재시도 시 같은 단계 시간이 합산됨)."""
+
+    __slots__ = ('round_no', 'phases', 'bytes', 'rows', 'retries', 'error', 'duration')
+
+    def __init__(self, round_no: str):
+        self.round_no = round_no
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.bytes = 0
+        self.rows = 0
+        self.retries = 0
+        self.error = None
+        self.duration = 0.0
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] += time.perf_counter() - started
+
+    def as_dict(self) -> dict:
+        return {
+            'round': self.round_no,
+            'duration': round(self.duration, 3),
+            'phases': {name: round(value, 3) for name, value in self.phases.items()},
+            'bytes': self.bytes,
+            'rows': self.rows,
+            'retries': self.retries,
+            'error': self.error,
+        }
+
+
+def histogram(values, buckets) -> dict:
+    """누적 버킷 히스토그램 (Prometheus le 의미: 값 <= 경계)."""
+    ordered = sorted(values)
+    return {
+        'buckets': [[bound, bisect_right(ordered, bound)] for bound in buckets],
+        'sum': sum(ordered),
+        'count': len(ordered),
+    }
+
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class CrawlTelemetry:
+    """전체 회차 크롤링 1회의 계측 (회차별 기록 + 실시간 ETA + 내보내기)."""
+
+    def __init__(self, lottery_type: str, total_rounds: int):
+        self.lottery_type = lottery_type
+        self.total_rounds = total_rounds
+        self.rounds = []
+        self.started = time.perf_counter()
+        self._completions = deque(maxlen=ETA_WINDOW + 1)
+        self._completions.append(self.started)
+
+    @contextmanager
+    def round(self, round_no: str):
+        metrics = RoundMetrics(round_no)
+        started = time.perf_counter()
+        try:
+            yield metrics
+        finally:
+            finished = time.perf_counter()
+            metrics.duration = finished - started
+            self.rounds.append(metrics)
+            self._completions.append(finished)
+
+    # ----- 진행 상황 -----
+
+    def seconds_per_round(self) -> float:
+        """최근 ETA_WINDOW개 회차의 실제 회차당 소요 시간 (휴식/재시도 포함)."""
+        if len(self._completions) < 2:
+            return 0.0
+        return (self._completions[-1] - self._completions[0]) / (len(self._completions) - 1)
+
+    def eta_seconds(self) -> float:
+        return self.seconds_per_round() * (self.total_rounds - len(self.rounds))
+
+    def progress_line(self, stores: int) -> str:
+        done = len(self.rounds)
+        pct = done / self.total_rounds * 100 if self.total_rounds else 100.0
+        return (f"   진행: {done}/{self.total_rounds} ({pct:.1f}%) | 판매점: {stores}개 | "
+                f"{self.seconds_per_round():.2f}초/회차 | 예상 남은 시간: {self.eta_seconds() / 60:.1f}분")
+
+    # ----- 집계 -----
+
+    def slow_rounds(self, count: int = SLOW_ROUND_COUNT) -> list:
+        """고정 대기를 뺀 소요 시간 기준으로 느린 회차 (사이트/파싱 지연만 비교)."""
+        return sorted(self.rounds, key=lambda m: m.duration - m.phases['sleep'], reverse=True)[:count]
+
+    def to_dict(self) -> dict:
+        succeeded = [m for m in self.rounds if not m.error]
+        return {
+            'lottery_type': self.lottery_type,
+            'total_rounds': self.total_rounds,
+            'elapsed': round(time.perf_counter() - self.started, 3),
+            'rounds_ok': len(succeeded),
+            'rounds_failed': len(self.rounds) - len(succeeded),
+            'retries': sum(m.retries for m in self.rounds),
+            'histograms': {
+                'round_seconds': histogram([m.duration for m in self.rounds], LATENCY_BUCKETS),
+                **{f'{name}_seconds': histogram([m.phases[name] for m in self.rounds], LATENCY_BUCKETS)
+                   for name in PHASES},
+                'payload_bytes': histogram([m.bytes for m in succeeded], BYTES_BUCKETS),
+                'rows': histogram([m.rows for m in succeeded], ROWS_BUCKETS),
+            },
+            'slow_rounds': [m.as_dict() for m in self.slow_rounds()],
+            'rounds': [m.as_dict() for m in self.rounds],
+        }
+
+    def to_prometheus(self) -> str:
+        """Prometheus 텍스트 노출 형식 (node_exporter textfile collector용)."""
+        data = self.to_dict()
+        base = f'lottery_type="{self.lottery_type}"'
+        lines = []
+
+        def write_histogram(name, help_text, series):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} histogram')
+            for series_labels, values in series:
+                for bound, count in values['buckets']:
+                    lines.append(f'{name}_bucket{{{series_labels},le="{bound}"}} {count}')
+                lines.append(f'{name}_bucket{{{series_labels},le="+Inf"}} {values["count"]}')
+                lines.append(f'{name}_sum{{{series_labels}}} {values["sum"]:.6f}')
+                lines.append(f'{name}_count{{{series_labels}}} {values["count"]}')
+
+        hists = data['histograms']
+        write_histogram(f'{METRIC_PREFIX}_round_seconds', 'Wall time per round including retries and sleeps',
+                        [(base, hists['round_seconds'])])
+        write_histogram(f'{METRIC_PREFIX}_phase_seconds', 'Time per round spent in each crawl phase',
+                        [(f'{base},phase="{name}"', hists[f'{name}_seconds']) for name in PHASES])
+        write_histogram(f'{METRIC_PREFIX}_payload_bytes', 'HTML payload size per round',
+                        [(base, hists['payload_bytes'])])
+        write_histogram(f'{METRIC_PREFIX}_rows', 'Store rows extracted per round',
+                        [(base, hists['rows'])])
+
+        lines.append(f'# HELP {METRIC_PREFIX}_rounds_total Rounds crawled by outcome')
+        lines.append(f'# TYPE {METRIC_PREFIX}_rounds_total counter')
+        lines.append(f'{METRIC_PREFIX}_rounds_total{{{base},status="ok"}} {data["rounds_ok"]}')
+        lines.append(f'{METRIC_PREFIX}_rounds_total{{{base},status="failed"}} {data["rounds_failed"]}')
+        lines.append(f'# HELP {METRIC_PREFIX}_retries_total Round retries')
+        lines.append(f'# TYPE {METRIC_PREFIX}_retries_total counter')
+        lines.append(f'{METRIC_PREFIX}_retries_total{{{base}}} {data["retries"]}')
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path: str):
+        """확장자가 .json이면 JSON, 그 외에는 Prometheus 텍스트로 저장합니다."""
+        path = Path(path)
+        if path.suffix == '.json':
+            content = json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+        else:
+            content = self.to_prometheus()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        print(f"   📈 크롤링 지표 저장: {path}")
+
+    def print_summary(self):
+        """단계별 시간 비중과 느린 회차를 출력합니다."""
+        if not self.rounds:
+            return
+        total = sum(m.duration for m in self.rounds) or 1.0
+        print(f"\n⏱️  단계별 소요 시간 ({len(self.rounds)}개 회차, 재시도 {sum(m.retries for m in self.rounds)}회):")
+        for name in PHASES:
+            values = [m.phases[name] for m in self.rounds]
+            print(f"   - {name:<10} 합계 {sum(values):7.1f}초 ({sum(values) / total * 100:4.1f}%) | "
+                  f"p50 {percentile(values, 50):.2f}초 | p95 {percentile(values, 95):.2f}초")
+        payloads = [m.bytes for m in self.rounds if not m.error]
+        if payloads:
+            print(f"   - 페이지 크기 p50 {percentile(payloads, 50) / 1024:.0f}KB | 최대 {max(payloads) / 1024:.0f}KB")
+
+        print("\n🐢 느린 회차 (고정 대기 제외):")
+        for m in self.slow_rounds(5):
+            busiest = max((name for name in PHASES if name != 'sleep'), key=lambda name: m.phases[name])
+            status = f" ❌ {m.error}" if m.error else ''
+            print(f"   - {m.round_no}회: {m.duration - m.phases['sleep']:.2f}초 "
+                  f"(최대 단계 {busiest} {m.phases[busiest]:.2f}초, 재시도 {m.retries}회){status}")
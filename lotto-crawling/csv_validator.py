@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+적재 전 CSV 오프라인 검증
+DB에 올리기 전에 크롤링 결과 CSV를 검사해 잘못된 크롤링을 바로 걸러냅니다.
+
+검사 항목:
+- 인코딩: UTF-8 디코딩 오류, 파일 중간에 끼어든 BOM(추가 쓰기 시 발생), 헤더 컬럼 누락
+- 회차: 복권 종류별 min~max 사이에 빠진 회차, 오늘 기준 예상 최신 회차보다 뒤처진 경우
+- 중복: source_row_hash(회차|복권종류|판매점ID|등수|번호) 중복
+- 제약: winning_records_rank_check 위반 (로또는 1/2등, 연금복권은 1/2등/보너스), 알 수 없는 등수 값
+- 좌표: 빈 값, 숫자가 아닌 값, 국내 범위 밖, 위도/경도 뒤바뀜
+
+파일을 줄 경계에 맞춘 바이트 구간으로 나눠 프로세스 풀에서 병렬로 읽습니다.
+구간마다 스트리밍으로 처리하고 샘플은 종류별 MAX_SAMPLES개까지만 보관하므로
+메모리는 해시 8바이트/행 외에는 파일 크기와 무관합니다.
+
+사용법:
+    python csv_validator.py                                  # 기본 CSV 3개 검사
+    python csv_validator.py pension_all_rounds.csv --workers 4
+    python csv_validator.py lotto_all_rounds.csv --json      # JSON 결과 (종료 코드 1 = 오류 있음)
+"""
+import argparse
+import codecs
+import csv
+import io
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+from coordinate_validation import KOREA_LAT_RANGE, KOREA_LNG_RANGE
+from draw_calendar import FIRST_DRAW_DATES
+from load_rules import compute_source_row_hash, normalize_rank
+from profiling import profiled
+
+DEFAULT_FILES = ('lotto_all_rounds.csv', 'pension_all_rounds.csv', 'all_lottery_stores.csv')
+
+REQUIRED_COLUMNS = ('회차', '판매점ID', '번호', '판매점명', '등수', '자동수동', '주소', '위도', '경도')
+
+KNOWN_PRIZES = {'1등', '2등', '보너스'}
+
+# supabase_schema.sql의 winning_records_rank_check와 동일
+ALLOWED_RANKS = {
+    'LOTTO': {1, 2},
+    'PENSION': {0, 1, 2},
+}
+
+DEFAULT_CHUNK_BYTES = 4 * 1024 * 1024
+MAX_SAMPLES = 10
+
+# 문제 종류 -> 심각도 (error가 하나라도 있으면 적재 거부)
+ISSUE_SEVERITY = {
+    'missing_columns': 'error',
+    'encoding_error': 'error',
+    'stray_bom': 'error',
+    'bad_number': 'error',
+    'unknown_prize': 'error',
+    'rank_check': 'error',
+    'duplicate_hash': 'error',
+    'missing_rounds': 'error',
+    'column_count': 'error',
+    'stale_rounds': 'warn',
+    'coord_missing': 'warn',
+    'coord_invalid': 'warn',
+    'coord_out_of_range': 'warn',
+    'coord_swapped': 'warn',
+    'no_bom': 'info',
+}
+
+
+def default_lottery_type(path: Path) -> str:
+    """복권종류 컬럼이 없는 파일의 기본 복권 종류 (pension_*.csv는 연금복권)."""
+    return 'pension' if path.name.startswith('pension') else 'lotto'
+
+
+def chunk_ranges(path: Path, data_start: int, chunk_bytes: int) -> list:
+    """헤더 이후를 줄 경계에 맞춘 (시작, 끝) 바이트 구간으로 나눕니다."""
+    size = path.stat().st_size
+    ranges = []
+    start = data_start
+    with open(path, 'rb') as f:
+        while start < size:
+            end = min(start + chunk_bytes, size)
+            if end < size:
+                f.seek(end)
+                f.readline()
+                end = f.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _in_range(value: float, value_range) -> bool:
+    return value_range[0] <= value <= value_range[1]
+
+
+def scan_chunk(path: str, start: int, end: int, header: list, fallback_type: str) -> dict:
+    """
+    바이트 구간 하나를 검사합니다 (프로세스 풀 작업자).
+
+    줄 번호는 구간 안에서의 상대 번호(0부터)이며, 호출한 쪽에서 앞 구간의 줄 수를 더해 보정합니다.
+    """
+    with open(path, 'rb') as f:
+        f.seek(start)
+        raw = f.read(end - start)
+
+    counts = Counter()
+    samples = {}
+
+    def issue(kind, line, detail):
+        counts[kind] += 1
+        bucket = samples.setdefault(kind, [])
+        if len(bucket) < MAX_SAMPLES:
+            bucket.append([line, detail])
+
+    bom_at = raw.find(codecs.BOM_UTF8)
+    while bom_at != -1:
+        issue('stray_bom', raw.count(b'\n', 0, bom_at), f'byte {start + bom_at}')
+        bom_at = raw.find(codecs.BOM_UTF8, bom_at + 1)
+
+    try:
+        text = raw.decode('utf-8')
+    except UnicodeDecodeError as e:
+        issue('encoding_error', raw.count(b'\n', 0, e.start), str(e))
+        text = raw.decode('utf-8', errors='replace')
+    text = text.replace('﻿', '')
+
+    columns = {name: i for i, name in enumerate(header)}
+    has_type = '복권종류' in columns
+    rounds = {}
+    hashes = []
+    hash_lines = []
+    lines = 0
+
+    for line, row in enumerate(csv.reader(io.StringIO(text, newline=''))):
+        lines = line + 1
+        if not row:
+            continue
+        if len(row) != len(header):
+            issue('column_count', line, f'{len(row)}개 (헤더 {len(header)}개)')
+            continue
+
+        try:
+            round_no = int(row[columns['회차']])
+        except ValueError:
+            issue('bad_number', line, f"회차={row[columns['회차']]!r}")
+            continue
+
+        lottery_type = (row[columns['복권종류']] if has_type else fallback_type).strip().upper()
+        if lottery_type not in ALLOWED_RANKS:
+            issue('bad_number', line, f'복권종류={lottery_type!r}')
+            continue
+        rounds.setdefault(lottery_type, set()).add(round_no)
+
+        prize_raw = row[columns['등수']].strip()
+        if prize_raw not in KNOWN_PRIZES:
+            issue('unknown_prize', line, f'등수={prize_raw!r}')
+        rank = normalize_rank(prize_raw)
+        if rank not in ALLOWED_RANKS[lottery_type]:
+            issue('rank_check', line, f'{lottery_type} {prize_raw} ({round_no}회)')
+
+        seq_raw = row[columns['번호']].strip()
+        try:
+            source_seq = int(seq_raw) if seq_raw else None
+        except ValueError:
+            issue('bad_number', line, f'번호={seq_raw!r}')
+            source_seq = None
+        row_hash = compute_source_row_hash(round_no, lottery_type, row[columns['판매점ID']].strip(), rank, source_seq)
+        hashes.append(int(row_hash[:16], 16))
+        hash_lines.append(line)
+
+        lat_raw, lng_raw = row[columns['위도']].strip(), row[columns['경도']].strip()
+        if not lat_raw or not lng_raw:
+            issue('coord_missing', line, row[columns['판매점ID']])
+            continue
+        try:
+            lat, lng = float(lat_raw), float(lng_raw)
+        except ValueError:
+            issue('coord_invalid', line, f'{lat_raw}, {lng_raw}')
+            continue
+        if not (_in_range(lat, KOREA_LAT_RANGE) and _in_range(lng, KOREA_LNG_RANGE)):
+            if _in_range(lng, KOREA_LAT_RANGE) and _in_range(lat, KOREA_LNG_RANGE):
+                issue('coord_swapped', line, f'{lat_raw}, {lng_raw}')
+            else:
+                issue('coord_out_of_range', line, f'{lat_raw}, {lng_raw}')
+
+    return {
+        'lines': lines,
+        'rounds': rounds,
+        'hashes': np.array(hashes, dtype='uint64'),
+        'hash_lines': np.array(hash_lines, dtype='int64'),
+        'counts': counts,
+        'samples': samples,
+    }
+
+
+def expected_latest_round(lottery_type: str, today: date) -> int:
+    """오늘 기준으로 이미 추첨이 끝났어야 하는 최신 회차."""
+    return (today - FIRST_DRAW_DATES[lottery_type]).days // 7 + 1
+
+
+def validate_csv(path: Path, workers: int = None, chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+                 today: date = None) -> dict:
+    """
+    CSV 파일 하나를 검사합니다.
+
+    Returns:
+        {'file', 'rows', 'rounds', 'issues': {종류: {'severity', 'count', 'samples'}}, 'elapsed_ms'} 딕셔너리
+        samples의 줄 번호는 헤더를 1번 줄로 하는 파일 기준 줄 번호입니다.
+    """
+    started = time.perf_counter()
+    counts = Counter()
+    samples = {}
+
+    with open(path, 'rb') as f:
+        header_raw = f.readline()
+        data_start = f.tell()
+    if header_raw.startswith(codecs.BOM_UTF8):
+        header_raw = header_raw[len(codecs.BOM_UTF8):]
+    else:
+        counts['no_bom'] += 1
+    header = next(csv.reader([header_raw.decode('utf-8', errors='replace')]))
+    header = [name.strip() for name in header]
+
+    missing = [name for name in REQUIRED_COLUMNS if name not in header]
+    if missing:
+        counts['missing_columns'] += 1
+        samples['missing_columns'] = [[1, ', '.join(missing)]]
+        return _summarize(path, 0, {}, counts, samples, started)
+
+    ranges = chunk_ranges(path, data_start, chunk_bytes)
+    fallback_type = default_lottery_type(path)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(scan_chunk, str(path), s, e, header, fallback_type) for s, e in ranges]
+        results = [future.result() for future in futures]
+
+    # 구간별 상대 줄 번호 → 파일 줄 번호 (헤더가 1번 줄)
+    rounds = {}
+    hash_parts, line_parts = [], []
+    line_offset = 2
+    for result in results:
+        counts.update(result['counts'])
+        for kind, bucket in result['samples'].items():
+            merged = samples.setdefault(kind, [])
+            merged.extend([line + line_offset, detail] for line, detail in bucket[:MAX_SAMPLES - len(merged)])
+        for lottery_type, values in result['rounds'].items():
+            rounds.setdefault(lottery_type, set()).update(values)
+        hash_parts.append(result['hashes'])
+        line_parts.append(result['hash_lines'] + line_offset)
+        line_offset += result['lines']
+
+    hashes = np.concatenate(hash_parts) if hash_parts else np.empty(0, dtype='uint64')
+    hash_lines = np.concatenate(line_parts) if line_parts else np.empty(0, dtype='int64')
+    order = np.argsort(hashes, kind='stable')
+    duplicated = np.flatnonzero(hashes[order][1:] == hashes[order][:-1]) + 1
+    if len(duplicated):
+        counts['duplicate_hash'] += len(duplicated)
+        samples['duplicate_hash'] = [
+            [int(hash_lines[order[i]]), f'{int(hash_lines[order[i - 1]])}번 줄과 중복'] for i in duplicated[:MAX_SAMPLES]
+        ]
+
+    today = today or date.today()
+    round_summary = {}
+    for lottery_type, values in sorted(rounds.items()):
+        low, high = min(values), max(values)
+        gaps = sorted(set(range(low, high + 1)) - values)
+        expected = expected_latest_round(lottery_type, today)
+        round_summary[lottery_type] = {'min': low, 'max': high, 'count': len(values), 'expected_latest': expected}
+        if gaps:
+            counts['missing_rounds'] += len(gaps)
+            samples.setdefault('missing_rounds', []).append([None, f'{lottery_type}: {gaps[:20]}'])
+        if high < expected - 1:
+            counts['stale_rounds'] += expected - high
+            samples.setdefault('stale_rounds', []).append([None, f'{lottery_type}: 최신 {high}회, 예상 {expected}회'])
+
+    return _summarize(path, len(hashes), round_summary, counts, samples, started)
+
+
+def _summarize(path: Path, rows: int, rounds: dict, counts: Counter, samples: dict, started: float) -> dict:
+    issues = {
+        kind: {'severity': ISSUE_SEVERITY[kind], 'count': count, 'samples': samples.get(kind, [])}
+        for kind, count in sorted(counts.items())
+    }
+    return {
+        'file': str(path),
+        'rows': rows,
+        'rounds': rounds,
+        'issues': issues,
+        'ok': not any(i['severity'] == 'error' for i in issues.values()),
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def print_result(result: dict):
+    """검사 결과를 사람이 읽는 형태로 출력합니다."""
+    status = "✅" if result['ok'] else "❌"
+    print(f"\n{status} {Path(result['file']).name}: {result['rows']:,}행 ({result['elapsed_ms']}ms)")
+    for lottery_type, r in result['rounds'].items():
+        print(f"  - {lottery_type}: {r['min']}~{r['max']}회 ({r['count']}개 회차, 예상 최신 {r['expected_latest']}회)")
+    icons = {'error': '❌', 'warn': '⚠️ ', 'info': 'ℹ️ '}
+    for kind, issue in result['issues'].items():
+        print(f"  {icons[issue['severity']]} {kind}: {issue['count']:,}건")
+        for line, detail in issue['samples'][:3]:
+            location = f"{line}번 줄: " if line else ''
+            print(f"      {location}{detail}")
+
+
+@profiled('csv-validator')
+def main():
+    parser = argparse.ArgumentParser(description='적재 전 CSV 오프라인 검증')
+    parser.add_argument('files', nargs='*', help=f'검사할 CSV 파일 (기본값: {", ".join(DEFAULT_FILES)})')
+    parser.add_argument('--workers', type=int, default=None, help='프로세스 수 (기본값: CPU 수)')
+    parser.add_argument('--chunk-mb', type=float, default=DEFAULT_CHUNK_BYTES / 1024 / 1024,
+                        help='작업 단위 크기(MB) (기본값: 4)')
+    parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+    args = parser.parse_args()
+
+    base_dir = Path(__file__).parent
+    if args.files:
+        paths = [Path(p) if Path(p).is_absolute() else Path.cwd() / p for p in args.files]
+    else:
+        paths = [base_dir / name for name in DEFAULT_FILES if (base_dir / name).exists()]
+    missing = [p for p in paths if not p.exists()]
+    if missing or not paths:
+        print(f"❌ CSV 파일을 찾을 수 없습니다: {', '.join(str(p) for p in missing) or '기본 파일 없음'}")
+        sys.exit(1)
+
+    chunk_bytes = max(int(args.chunk_mb * 1024 * 1024), 64 * 1024)
+    workers = args.workers or os.cpu_count()
+    results = [validate_csv(path, workers, chunk_bytes) for path in paths]
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        print("=" * 60)
+        print("CSV 오프라인 검증")
+        print("=" * 60)
+        for result in results:
+            print_result(result)
+
+    if not all(r['ok'] for r in results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
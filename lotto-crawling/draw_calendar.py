@@ -0,0 +1,150 @@
+"""
+추첨일 계산 모듈
+(복권 종류, 회차) → 추첨일 매핑을 한 곳에서 관리합니다.
+
+- 로또 6/45: 2002-12-07(토) 1회차, 매주 토요일
+- 연금복권 720+: 2020-05-07(목) 1회차, 매주 목요일
+
+정규 주기에서 벗어난 회차는 draw_date_overrides.json에 등록하면(DRAW_DATE_OVERRIDES) 적재/검증 등
+모든 계산에 반영됩니다. 형식: {"LOTTO": {"1234": "2026-01-02"}, "PENSION": {}}
+
+사용법:
+    python draw_calendar.py --check     # 예외 회차 적용 경로(단건/배열/딕셔너리) 자체 점검
+"""
+import argparse
+import json
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Union
+
+import numpy as np
+
+FIRST_DRAW_DATES: Dict[str, date] = {
+    'LOTTO': date(2002, 12, 7),
+    'PENSION': date(2020, 5, 7),
+}
+
+OVERRIDES_FILE = Path(__file__).parent / 'draw_date_overrides.json'
+
+
+def read_overrides(path=OVERRIDES_FILE) -> Dict[str, Dict[int, date]]:
+    """draw_date_overrides.json을 읽습니다 (없으면 빈 예외 목록)."""
+    overrides = {lottery_type: {} for lottery_type in FIRST_DRAW_DATES}
+    path = Path(path)
+    if path.exists():
+        with open(path, 'r', encoding='utf-8') as f:
+            for lottery_type, rounds in json.load(f).items():
+                overrides[lottery_type] = {int(r): date.fromisoformat(d) for r, d in rounds.items()}
+    return overrides
+
+
+# 불규칙 추첨 회차 (lottery_type -> {round_no: draw_date})
+DRAW_DATE_OVERRIDES: Dict[str, Dict[int, date]] = read_overrides()
+
+
+def draw_date(lottery_type: str, round_no: int) -> date:
+    """복권 종류와 회차 번호로 추첨일을 계산합니다."""
+    override = DRAW_DATE_OVERRIDES[lottery_type].get(round_no)
+    if override is not None:
+        return override
+    return FIRST_DRAW_DATES[lottery_type] + timedelta(weeks=round_no - 1)
+
+
+def draw_dates(lottery_types: Union[str, Iterable[str]], rounds: Iterable[int]) -> np.ndarray:
+    """
+    회차 배열의 추첨일을 한 번에 계산합니다.
+
+    Args:
+        lottery_types: 복권 종류 (하나의 문자열 또는 rounds와 같은 길이의 배열)
+        rounds: 회차 번호 배열
+
+    Returns:
+        datetime64[D] 배열
+    """
+    rounds = np.asarray(rounds, dtype='int64')
+    types = np.broadcast_to(np.asarray(lottery_types, dtype=object), rounds.shape)
+    result = np.empty(rounds.shape, dtype='datetime64[D]')
+
+    for lottery_type, first_date in FIRST_DRAW_DATES.items():
+        mask = types == lottery_type
+        if not mask.any():
+            continue
+        result[mask] = np.datetime64(first_date, 'D') + (rounds[mask] - 1) * 7
+        for round_no, override in DRAW_DATE_OVERRIDES[lottery_type].items():
+            result[mask & (rounds == round_no)] = np.datetime64(override, 'D')
+
+    unknown = ~np.isin(types, list(FIRST_DRAW_DATES))
+    if unknown.any():
+        raise ValueError(f"지원하지 않는 복권 종류: {sorted(set(types[unknown]))}")
+    return result
+
+
+def draw_date_map(draw_keys: Iterable[tuple]) -> Dict[tuple, date]:
+    """(round_no, lottery_type) 목록을 추첨일 딕셔너리로 변환합니다."""
+    keys = list(draw_keys)
+    if not keys:
+        return {}
+    dates = draw_dates([t for _, t in keys], [r for r, _ in keys])
+    return {key: d.item() for key, d in zip(keys, dates)}
+
+
+def override_rows():
+    """예외 회차를 (lottery_type, round_no, draw_date) 목록으로 반환합니다 (SQL unnest 파라미터용)."""
+    return [(t, r, d) for t, rounds in DRAW_DATE_OVERRIDES.items() for r, d in sorted(rounds.items())]
+
+
+def check_overrides() -> list:
+    """
+    등록된 예외 회차와 임시 예외 회차 1개로 단건/배열/딕셔너리 계산이 모두 예외 날짜를 쓰는지 확인합니다.
+
+    Returns:
+        불일치 설명 목록 (비어 있으면 정상)
+    """
+    problems = []
+    probe = ('LOTTO', 2, FIRST_DRAW_DATES['LOTTO'] + timedelta(days=8))
+    added = probe[1] not in DRAW_DATE_OVERRIDES[probe[0]]
+    if added:
+        DRAW_DATE_OVERRIDES[probe[0]][probe[1]] = probe[2]
+    try:
+        rows = override_rows()
+        vector = draw_dates([t for t, _, _ in rows], [r for _, r, _ in rows])
+        mapped = draw_date_map([(r, t) for t, r, _ in rows])
+        for (lottery_type, round_no, expected), vector_date in zip(rows, vector):
+            results = {
+                'draw_date': draw_date(lottery_type, round_no),
+                'draw_dates': vector_date.item(),
+                'draw_date_map': mapped[(round_no, lottery_type)],
+            }
+            for name, value in results.items():
+                if value != expected:
+                    problems.append(f"{lottery_type} {round_no}회: {name}={value} (예외 날짜 {expected})")
+            regular = FIRST_DRAW_DATES[lottery_type] + timedelta(weeks=round_no - 1)
+            if abs((expected - regular).days) > 6:
+                problems.append(f"{lottery_type} {round_no}회: 예외 날짜 {expected}가 정규 추첨일 {regular}와 7일 이상 차이")
+    finally:
+        if added:
+            del DRAW_DATE_OVERRIDES[probe[0]][probe[1]]
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='추첨일 계산 모듈')
+    parser.add_argument('--check', action='store_true', help='예외 회차 적용 경로 자체 점검')
+    args = parser.parse_args()
+    if not args.check:
+        parser.print_help()
+        return
+
+    registered = sum(len(rounds) for rounds in DRAW_DATE_OVERRIDES.values())
+    print(f"📌 등록된 예외 회차: {registered}개 ({OVERRIDES_FILE.name})")
+    problems = check_overrides()
+    for problem in problems:
+        print(f"  ❌ {problem}")
+    if problems:
+        sys.exit(1)
+    print("✅ 예외 회차가 단건/배열/딕셔너리 계산에 모두 반영됩니다.")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,14 +2,20 @@
 """
 연금복권 추첨일 수정 스크립트
 1회차: 2020년 5월 7일 (목), 매주 목요일 추첨
+
+추첨일은 draw_calendar.py 기준으로 load_data_to_supabase.py가 적재 시점에 기록합니다.
+이 스크립트는 이미 적재된 잘못된 날짜를 보정할 때만 사용합니다.
 """
 import os
 import sys
 from pathlib import Path
-from datetime import date, timedelta
+from datetime import date
+
+from draw_calendar import FIRST_DRAW_DATES, draw_date
+from job_runs import instrumented, job_stage
 
 # 연금복권 720+ 1회차: 2020년 5월 7일 (목) - 298회차가 2026-01-15 기준 역산
-PENSION_FIRST_DRAW_DATE = date(2020, 5, 7)
+PENSION_FIRST_DRAW_DATE = FIRST_DRAW_DATES['PENSION']
 
 
 def get_database_url():
@@ -38,9 +44,10 @@ def get_database_url():
 
 def calculate_pension_draw_date(round_no: int) -> date:
     """연금복권 회차 번호로 추첨일을 계산합니다."""
-    return PENSION_FIRST_DRAW_DATE + timedelta(weeks=round_no - 1)
+    return draw_date('PENSION', round_no)
 
 
+@instrumented('fix-pension-dates', lottery_type='PENSION')
 def main():
     print("=" * 60)
     print("연금복권 추첨일 수정")
@@ -75,27 +82,30 @@ def main():
 
         updates = []
         for round_no in pension_rounds:
-            draw_date = calculate_pension_draw_date(round_no)
-            updates.append((draw_date, round_no))
-
-        cursor.executemany("""
-            UPDATE draws SET draw_date = %s
-            WHERE round_no = %s AND lottery_type = 'PENSION';
-        """, updates)
+            updates.append((calculate_pension_draw_date(round_no), round_no))
+
+        with job_stage('update_draws') as stage:
+            cursor.executemany("""
+                UPDATE draws SET draw_date = %s
+                WHERE round_no = %s AND lottery_type = 'PENSION';
+            """, updates)
+            stage.records = len(updates)
         print(f"  ✅ draws 테이블 업데이트 완료")
 
         # Step 2: winning_records 테이블의 연금복권 won_at 업데이트
         print("\n" + "-" * 40)
         print("Step 2: winning_records 테이블 연금복권 won_at 업데이트")
 
-        cursor.execute("""
-            UPDATE winning_records wr
-            SET won_at = d.draw_date
-            FROM draws d
-            WHERE wr.draw_id = d.round_no
-              AND wr.lottery_type = d.lottery_type
-              AND wr.lottery_type = 'PENSION';
-        """)
+        with job_stage('update_won_at') as stage:
+            cursor.execute("""
+                UPDATE winning_records wr
+                SET won_at = d.draw_date
+                FROM draws d
+                WHERE wr.draw_id = d.round_no
+                  AND wr.lottery_type = d.lottery_type
+                  AND wr.lottery_type = 'PENSION';
+            """)
+            stage.records = cursor.rowcount
         print(f"  ✅ winning_records 테이블 업데이트 완료")
 
         # 검증
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+좌표가 없는 판매점을 지오코딩하는 워커
+geocode_cache 테이블을 배치 단위로 조회하고, 캐시 미스만 지오코딩 제공자로 보낸 뒤 결과를 일괄 저장합니다.
+제공자가 찾지 못한 주소도 좌표 없이(lat/lng NULL) 캐시해 NEGATIVE_CACHE_DAYS 동안 다시 요청하지 않습니다.
+요청 오류(네트워크/API 오류)는 캐시하지 않고 다음 실행에서 다시 시도합니다.
+
+사용법:
+    python geocode_worker.py                       # 카카오 지오코딩 (KAKAO_REST_API_KEY 필요)
+    python geocode_worker.py --provider stub       # 오프라인 결정적 스텁 제공자
+    python geocode_worker.py --concurrency 8       # 동시 요청 수 조정
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import unicodedata
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from profiling import profiled
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_CONCURRENCY = 4
+# 찾지 못한 주소(음성 캐시)를 다시 지오코딩하기까지의 기간 (새 주소가 나중에 검색될 수 있음)
+NEGATIVE_CACHE_DAYS = 30
+
+KAKAO_ADDRESS_URL = "https://dapi.kakao.com/v2/local/search/address.json"
+KAKAO_KEYWORD_URL = "https://dapi.kakao.com/v2/local/search/keyword.json"
+
+
+def get_database_url():
+    """환경변수 또는 .env.local에서 DATABASE_URL을 읽어옵니다."""
+    database_url = os.getenv('DATABASE_URL') or os.getenv('SUPABASE_DB_URL')
+    if database_url:
+        return database_url
+
+    env_file = Path(__file__).parent.parent / '.env.local'
+    if env_file.exists():
+        try:
+            with open(env_file, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith('#') and '=' in line:
+                        key, value = line.split('=', 1)
+                        key = key.strip()
+                        value = value.strip().strip('"').strip("'")
+                        if key in ('DATABASE_URL', 'SUPABASE_DB_URL'):
+                            return value
+        except PermissionError:
+            pass
+
+    return None
+
+
+def get_kakao_api_key():
+    """환경변수 또는 .env.local에서 KAKAO_REST_API_KEY를 읽어옵니다."""
+    api_key = os.getenv('KAKAO_REST_API_KEY')
+    if api_key:
+        return api_key
+
+    env_file = Path(__file__).parent.parent / '.env.local'
+    if env_file.exists():
+        try:
+            with open(env_file, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith('#') and '=' in line:
+                        key, value = line.split('=', 1)
+                        if key.strip() == 'KAKAO_REST_API_KEY':
+                            return value.strip().strip('"').strip("'")
+        except PermissionError:
+            pass
+
+    return None
+
+
+def normalize_address(address: str) -> str:
+    """지오코딩/캐시 키용으로 주소를 정규화합니다 (NFC, 공백 정리)."""
+    address = unicodedata.normalize('NFC', address or '')
+    return re.sub(r'\s+', ' ', address).strip()
+
+
+def compute_address_hash(address: str) -> str:
+    """정규화된 주소의 address_hash(sha256)를 계산합니다."""
+    return hashlib.sha256(normalize_address(address).encode()).hexdigest()
+
+
+# ============================================
+# 캐시
+# ============================================
+
+class GeocodeCache:
+    """
+    geocode_cache 테이블 기반 캐시 (배치당 조회 1회, 저장 1회)
+
+    lat/lng가 NULL인 행은 "제공자가 찾지 못한 주소"이며, NEGATIVE_CACHE_DAYS가 지나면 미스로 취급합니다.
+    """
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def lookup_many(self, address_hashes: List[str]) -> Dict[str, Optional[Tuple[float, float]]]:
+        """address_hash 목록을 한 번의 쿼리로 조회합니다 (찾지 못한 주소는 None)."""
+        if not address_hashes:
+            return {}
+        self.cursor.execute(
+            """
+            SELECT address_hash, lat, lng FROM geocode_cache
+            WHERE address_hash = ANY(%s)
+              AND (lat IS NOT NULL OR created_at >= now() - make_interval(days => %s));
+            """,
+            (list(address_hashes), NEGATIVE_CACHE_DAYS)
+        )
+        return {row[0]: (row[1], row[2]) if row[1] is not None else None for row in self.cursor.fetchall()}
+
+    def store_many(self, entries: List[Tuple[str, str, Optional[float], Optional[float]]]):
+        """
+        (address_hash, address, lat, lng) 목록을 한 번의 쿼리로 저장합니다 (찾지 못한 주소는 lat/lng None).
+        기존 음성 캐시 행은 새 결과로 덮어씁니다.
+        """
+        if not entries:
+            return
+        from psycopg2.extras import execute_values
+        execute_values(
+            self.cursor,
+            """
+            INSERT INTO geocode_cache (address_hash, address, lat, lng)
+            VALUES %s
+            ON CONFLICT (address_hash) DO UPDATE SET
+                lat = EXCLUDED.lat,
+                lng = EXCLUDED.lng,
+                created_at = now()
+            WHERE geocode_cache.lat IS NULL;
+            """,
+            entries,
+            page_size=len(entries)
+        )
+
+
+class InMemoryGeocodeCache:
+    """DB 없이 사용하는 딕셔너리 기반 캐시 (오프라인 실행/검증용)"""
+
+    def __init__(self):
+        self.entries: Dict[str, Tuple[str, float, float]] = {}
+        self.lookups = 0
+        self.stores = 0
+
+    def lookup_many(self, address_hashes: List[str]) -> Dict[str, Optional[Tuple[float, float]]]:
+        self.lookups += 1
+        return {
+            h: (self.entries[h][1], self.entries[h][2]) if self.entries[h][1] is not None else None
+            for h in address_hashes if h in self.entries
+        }
+
+    def store_many(self, entries: List[Tuple[str, str, Optional[float], Optional[float]]]):
+        if not entries:
+            return
+        self.stores += 1
+        for address_hash, address, lat, lng in entries:
+            if address_hash not in self.entries or self.entries[address_hash][1] is None:
+                self.entries[address_hash] = (address, lat, lng)
+
+
+# ============================================
+# 지오코딩 제공자
+# ============================================
+
+class GeocodeProvider:
+    """
+    지오코딩 제공자 인터페이스 - geocode()는 (lat, lng) 또는 None(찾지 못함)을 반환하고,
+    요청 자체가 실패하면 예외를 던집니다. geocode()는 워커 스레드에서 동시에 호출됩니다.
+    """
+
+    name = 'base'
+
+    def __init__(self):
+        self.calls = 0
+        self._calls_lock = threading.Lock()
+
+    def count_call(self):
+        with self._calls_lock:
+            self.calls += 1
+
+    def geocode(self, address: str) -> Optional[Tuple[float, float]]:
+        raise NotImplementedError
+
+
+class KakaoGeocodeProvider(GeocodeProvider):
+    """카카오 로컬 API 지오코딩 (주소 검색 → 키워드 검색 순)"""
+
+    name = 'kakao'
+
+    def __init__(self, api_key: str, timeout: float = 10.0):
+        super().__init__()
+        self.api_key = api_key
+        self.timeout = timeout
+
+    def _search(self, url: str, address: str) -> Optional[Tuple[float, float]]:
+        query = urllib.parse.urlencode({'query': address, 'size': 1})
+        request = urllib.request.Request(
+            f"{url}?{query}",
+            headers={'Authorization': f"KakaoAK {self.api_key}"}
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            payload = json.loads(response.read().decode('utf-8'))
+        documents = payload.get('documents') or []
+        if not documents:
+            return None
+        return float(documents[0]['y']), float(documents[0]['x'])
+
+    def geocode(self, address: str) -> Optional[Tuple[float, float]]:
+        self.count_call()
+        return (self._search(KAKAO_ADDRESS_URL, address)
+                or self._search(KAKAO_KEYWORD_URL, address))
+
+
+class StubGeocodeProvider(GeocodeProvider):
+    """
+    오프라인 결정적 스텁 제공자
+
+    주소 해시로부터 국내 범위 안의 좌표를 만들어 내므로, 같은 주소는 항상 같은 좌표를 반환합니다.
+    """
+
+    name = 'stub'
+
+    def geocode(self, address: str) -> Optional[Tuple[float, float]]:
+        self.count_call()
+        if not address:
+            return None
+        digest = hashlib.sha256(address.encode()).digest()
+        lat = 34.0 + int.from_bytes(digest[:4], 'big') / 0xFFFFFFFF * 4.0
+        lng = 126.0 + int.from_bytes(digest[4:8], 'big') / 0xFFFFFFFF * 3.5
+        return round(lat, 7), round(lng, 7)
+
+
+def create_provider(name: str) -> GeocodeProvider:
+    """이름으로 지오코딩 제공자를 생성합니다."""
+    if name == 'stub':
+        return StubGeocodeProvider()
+    if name == 'kakao':
+        api_key = get_kakao_api_key()
+        if not api_key:
+            raise ValueError("KAKAO_REST_API_KEY를 찾을 수 없습니다.")
+        return KakaoGeocodeProvider(api_key)
+    raise ValueError(f"지원하지 않는 지오코딩 제공자: {name}")
+
+
+# ============================================
+# 워커
+# ============================================
+
+GEOCODE_ERROR = object()
+
+
+def _geocode_or_error(provider: GeocodeProvider, address: str):
+    """provider.geocode를 호출하고, 요청 오류는 GEOCODE_ERROR로 바꿉니다 (캐시하지 않고 다음 실행에서 재시도)."""
+    try:
+        return provider.geocode(address)
+    except Exception as e:
+        print(f"  ⚠️ 지오코딩 실패 ({address[:30]}...): {e}")
+        return GEOCODE_ERROR
+
+
+def geocode_addresses(addresses: Iterable[str], cache, provider: GeocodeProvider,
+                      batch_size: int = DEFAULT_BATCH_SIZE,
+                      max_concurrency: int = DEFAULT_CONCURRENCY):
+    """
+    주소 목록을 지오코딩합니다.
+
+    배치마다 캐시를 한 번에 조회하고, 미스만 제공자로 보내며(동시 요청 수 제한),
+    새로 얻은 좌표와 찾지 못한 주소(음성 캐시)를 한 번에 캐시에 저장합니다.
+
+    Args:
+        addresses: 주소 목록 (중복 허용)
+        cache: lookup_many/store_many를 제공하는 캐시
+        provider: 지오코딩 제공자
+        batch_size: 캐시 조회/저장 배치 크기
+        max_concurrency: 제공자 동시 요청 수
+
+    Returns:
+        (정규화 주소 -> (lat, lng) 또는 None 딕셔너리, 통계 딕셔너리)
+        통계: cache_hits(그중 cached_unresolved는 음성 캐시), provider_calls,
+              resolved, unresolved(찾지 못함, 캐시함), errors(요청 오류, 캐시하지 않음)
+    """
+    unique_addresses = list(dict.fromkeys(
+        normalize_address(a) for a in addresses if normalize_address(a)
+    ))
+    results: Dict[str, Optional[Tuple[float, float]]] = {}
+    stats = {'addresses': len(unique_addresses), 'cache_hits': 0, 'cached_unresolved': 0,
+             'provider_calls': 0, 'resolved': 0, 'unresolved': 0, 'errors': 0}
+
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as pool:
+        for i in range(0, len(unique_addresses), batch_size):
+            batch = unique_addresses[i:i+batch_size]
+            hash_to_address = {compute_address_hash(a): a for a in batch}
+
+            cached = cache.lookup_many(list(hash_to_address))
+            for address_hash, coords in cached.items():
+                results[hash_to_address[address_hash]] = coords
+                if coords is None:
+                    stats['cached_unresolved'] += 1
+            stats['cache_hits'] += len(cached)
+
+            misses = [(h, a) for h, a in hash_to_address.items() if h not in cached]
+            if not misses:
+                continue
+
+            resolved = list(pool.map(lambda a: _geocode_or_error(provider, a), [a for _, a in misses]))
+            stats['provider_calls'] += len(misses)
+
+            new_entries = []
+            for (address_hash, address), coords in zip(misses, resolved):
+                if coords is GEOCODE_ERROR:
+                    results[address] = None
+                    stats['errors'] += 1
+                    continue
+                results[address] = coords
+                if coords is None:
+                    stats['unresolved'] += 1
+                    new_entries.append((address_hash, address, None, None))
+                    continue
+                stats['resolved'] += 1
+                new_entries.append((address_hash, address, coords[0], coords[1]))
+            cache.store_many(new_entries)
+
+    return results, stats
+
+
+def update_store_coordinates(cursor, updates: List[Tuple[int, float, float]]):
+    """(store_id, lat, lng) 목록으로 stores 좌표를 한 번에 갱신합니다."""
+    if not updates:
+        return
+    from psycopg2.extras import execute_values
+    execute_values(
+        cursor,
+        """
+        UPDATE stores AS s
+        SET lat = v.lat, lng = v.lng, updated_at = now()
+        FROM (VALUES %s) AS v(id, lat, lng)
+        WHERE s.id = v.id;
+        """,
+        updates,
+        page_size=len(updates)
+    )
+
+
+@profiled('geocode-worker')
+def main():
+    parser = argparse.ArgumentParser(description='좌표 없는 판매점 지오코딩')
+    parser.add_argument('--provider', choices=['kakao', 'stub'], default='kakao',
+                        help='지오코딩 제공자 (기본값: kakao)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'캐시 조회/저장 배치 크기 (기본값: {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'지오코딩 동시 요청 수 (기본값: {DEFAULT_CONCURRENCY})')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("판매점 좌표 지오코딩")
+    print("=" * 60)
+
+    database_url = get_database_url()
+    if not database_url:
+        print("❌ DATABASE_URL 환경변수를 찾을 수 없습니다.")
+        sys.exit(1)
+
+    try:
+        provider = create_provider(args.provider)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    try:
+        import psycopg2
+        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+    except ImportError:
+        print("❌ psycopg2가 설치되지 않았습니다.")
+        sys.exit(1)
+
+    print(f"\n🔗 데이터베이스 연결 중...")
+    conn = psycopg2.connect(database_url)
+    conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("""
+            SELECT id, address_norm
+            FROM stores
+            WHERE lat IS NULL OR lng IS NULL;
+        """)
+        targets = cursor.fetchall()
+        print(f"  - 좌표 없는 판매점: {len(targets)}개")
+        if not targets:
+            print("\n✅ 지오코딩할 판매점이 없습니다.")
+            return
+
+        print(f"\n📍 지오코딩 중... (제공자: {provider.name}, 동시 요청: {args.concurrency})")
+        results, stats = geocode_addresses(
+            (address for _, address in targets),
+            GeocodeCache(cursor),
+            provider,
+            batch_size=args.batch_size,
+            max_concurrency=args.concurrency
+        )
+
+        updates = []
+        for store_id, address in targets:
+            coords = results.get(normalize_address(address))
+            if coords is not None:
+                updates.append((store_id, coords[0], coords[1]))
+        update_store_coordinates(cursor, updates)
+
+        print(f"  - 고유 주소: {stats['addresses']}개")
+        print(f"  - 캐시 적중: {stats['cache_hits']}개 (찾지 못한 주소 {stats['cached_unresolved']}개)")
+        print(f"  - 제공자 호출: {stats['provider_calls']}회 "
+              f"(성공 {stats['resolved']}, 찾지 못함 {stats['unresolved']}, 오류 {stats['errors']} - 다음 실행에서 재시도)")
+        print(f"  - 좌표 갱신: {len(updates)}개 판매점")
+
+        print("\n" + "=" * 60)
+        print("✅ 지오코딩 완료!")
+        print("=" * 60)
+
+    except Exception as e:
+        print(f"\n❌ 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+작업 실행 기록 (job_runs)
+크롤링/적재/집계/날짜 보정/검증 스크립트의 실행 이력을 job_runs 테이블에 남깁니다.
+
+- 시작 시 STARTED 행 1개를 넣고, 종료 시 같은 행을 COMPLETED/FAILED로 갱신합니다.
+- 단계별 소요 시간과 처리 건수, 초당 처리량은 메모리에 모았다가 종료 시 details(JSONB)에 한 번에 씁니다.
+  행 단위 처리 중에는 카운터만 올리므로 DB 왕복이 없습니다.
+- DATABASE_URL이 없거나 DB 기록에 실패하면 job_runs.jsonl에 한 줄로 남깁니다.
+
+사용법:
+    from job_runs import instrumented, job_stage, add_records
+
+    @instrumented('store-stats')
+    def main():
+        with job_stage('rebuild') as stage:
+            stage.records = rebuild_store_stats(cursor, cutoff)
+
+    python job_runs.py                    # 최근 실행 이력 조회 (DB 또는 job_runs.jsonl)
+    python job_runs.py --job load-csv --limit 5
+"""
+import argparse
+import functools
+import inspect
+import json
+import os
+import sys
+import time
+import traceback
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+
+from profiling import profile_run, profiled
+
+JOB_LOG_FILE = Path(__file__).parent / 'job_runs.jsonl'
+
+INSERT_STARTED_SQL = """
+INSERT INTO job_runs (job_name, run_at, status, target_round_no, lottery_type)
+VALUES (%s, %s, 'STARTED', %s, %s)
+RETURNING id
+"""
+
+UPDATE_FINISHED_SQL = """
+UPDATE job_runs
+SET status = %s,
+    target_round_no = %s,
+    lottery_type = %s,
+    records_processed = %s,
+    error_message = %s,
+    duration_ms = %s,
+    details = %s::jsonb
+WHERE id = %s
+"""
+
+RECENT_RUNS_SQL = """
+SELECT job_name, run_at, status, target_round_no, lottery_type, records_processed, duration_ms, error_message, details
+FROM job_runs
+WHERE (%(job)s::text IS NULL OR job_name = %(job)s)
+ORDER BY run_at DESC
+LIMIT %(limit)s
+"""
+
+MAX_ERROR_LENGTH = 2000
+
+_current_run = ContextVar('job_run', default=None)
+
+
+def get_database_url():
+    """환경변수 또는 .env.local에서 DATABASE_URL을 읽어옵니다."""
+    database_url = os.getenv('DATABASE_URL') or os.getenv('SUPABASE_DB_URL')
+    if database_url:
+        return database_url
+
+    env_file = Path(__file__).parent.parent / '.env.local'
+    if env_file.exists():
+        try:
+            with open(env_file, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith('#') and '=' in line:
+                        key, value = line.split('=', 1)
+                        key = key.strip()
+                        value = value.strip().strip('"').strip("'")
+                        if key in ('DATABASE_URL', 'SUPABASE_DB_URL'):
+                            return value
+        except PermissionError:
+            pass
+
+    return None
+
+
+def rows_per_sec(records: int, duration_ms: float):
+    if not records or duration_ms <= 0:
+        return None
+    return round(records * 1000 / duration_ms, 1)
+
+
+class Stage:
+    """job_stage()가 돌려주는 단계 기록. records를 직접 지정하거나 add()로 누적합니다."""
+
+    __slots__ = ('name', 'records', 'duration_ms')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.records = 0
+        self.duration_ms = None
+
+    def add(self, count: int = 1):
+        self.records += count
+
+    def as_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'duration_ms': self.duration_ms,
+            'records': self.records,
+            'rows_per_sec': rows_per_sec(self.records, self.duration_ms or 0),
+        }
+
+
+class JobRun:
+    """
+    작업 1회 실행 기록 (컨텍스트 매니저).
+
+    records_processed는 add_records()로 누적한 값이며, 지정하지 않으면 단계 건수의 최댓값을 씁니다.
+    SystemExit(0)은 성공, 그 밖의 예외와 0이 아닌 종료 코드는 실패로 기록하고 예외는 그대로 전파합니다.
+    """
+
+    def __init__(self, job_name: str, lottery_type: str = None, target_round_no: int = None,
+                 database_url: str = None, log_file: Path = JOB_LOG_FILE):
+        self.job_name = job_name
+        self.lottery_type = lottery_type
+        self.target_round_no = target_round_no
+        self.database_url = database_url if database_url is not None else get_database_url()
+        self.log_file = log_file
+        self.records = None
+        self.stages = []
+        self.started_at = None
+        self.row_id = None
+        self._started = None
+        self._token = None
+
+    # ----- 실행 중 기록 -----
+
+    def add_records(self, count: int):
+        self.records = (self.records or 0) + count
+
+    @contextmanager
+    def stage(self, name: str):
+        stage = Stage(name)
+        started = time.perf_counter()
+        try:
+            yield stage
+        finally:
+            stage.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+            self.stages.append(stage)
+
+    # ----- 시작/종료 -----
+
+    def __enter__(self):
+        self.started_at = datetime.now(timezone.utc)
+        self._started = time.perf_counter()
+        self._token = _current_run.set(self)
+        if self.database_url:
+            try:
+                self.row_id = self._execute(INSERT_STARTED_SQL, (
+                    self.job_name, self.started_at, self.target_round_no, self.lottery_type,
+                ), fetch=True)
+            except Exception as e:
+                print(f"⚠️  job_runs 시작 기록 실패, {self.log_file.name}에 기록합니다: {e}", file=sys.stderr)
+                self.database_url = None
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_run.reset(self._token)
+        duration_ms = int((time.perf_counter() - self._started) * 1000)
+
+        if exc_type is None or (exc_type is SystemExit and exc.code in (0, None)):
+            status, error_message = 'COMPLETED', None
+        elif exc_type is SystemExit:
+            status, error_message = 'FAILED', f'exit code {exc.code}'
+        else:
+            status = 'FAILED'
+            error_message = ''.join(traceback.format_exception_only(exc_type, exc)).strip()[:MAX_ERROR_LENGTH]
+
+        records = self.records
+        if records is None:
+            records = max((stage.records for stage in self.stages), default=0)
+        details = {
+            'stages': [stage.as_dict() for stage in self.stages],
+            'rows_per_sec': rows_per_sec(records, duration_ms),
+            'argv': sys.argv[1:],
+        }
+        self._finish(status, records, error_message, duration_ms, details)
+        return False
+
+    def _finish(self, status, records, error_message, duration_ms, details):
+        if self.row_id is not None:
+            try:
+                self._execute(UPDATE_FINISHED_SQL, (
+                    status, self.target_round_no, self.lottery_type, records, error_message, duration_ms,
+                    json.dumps(details, ensure_ascii=False), self.row_id,
+                ))
+                return
+            except Exception as e:
+                print(f"⚠️  job_runs 종료 기록 실패, {self.log_file.name}에 기록합니다: {e}", file=sys.stderr)
+
+        entry = {
+            'job_name': self.job_name,
+            'run_at': self.started_at.isoformat(),
+            'status': status,
+            'target_round_no': self.target_round_no,
+            'lottery_type': self.lottery_type,
+            'records_processed': records,
+            'error_message': error_message,
+            'duration_ms': duration_ms,
+            'details': details,
+        }
+        try:
+            with open(self.log_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        except OSError as e:
+            print(f"⚠️  {self.log_file.name} 기록 실패: {e}", file=sys.stderr)
+
+    def _execute(self, sql: str, params: tuple, fetch: bool = False):
+        """짧은 연결 하나로 쿼리를 실행합니다 (작업당 시작/종료 2회만 호출)."""
+        import psycopg2
+
+        conn = psycopg2.connect(self.database_url)
+        try:
+            with conn, conn.cursor() as cursor:
+                cursor.execute(sql, params)
+                if fetch:
+                    return cursor.fetchone()[0]
+        finally:
+            conn.close()
+
+
+def current_run():
+    """실행 중인 JobRun (없으면 None)."""
+    return _current_run.get()
+
+
+@contextmanager
+def job_stage(name: str):
+    """실행 중인 작업에 단계를 기록합니다. 작업 밖에서 호출하면 시간만 재고 버립니다."""
+    run = _current_run.get()
+    if run is None:
+        yield Stage(name)
+        return
+    with run.stage(name) as stage:
+        yield stage
+
+
+def add_records(count: int):
+    """실행 중인 작업의 처리 건수를 더합니다 (작업 밖이면 무시)."""
+    run = _current_run.get()
+    if run is not None:
+        run.add_records(count)
+
+
+def set_target(lottery_type: str = None, target_round_no: int = None):
+    """실행 중인 작업의 대상 복권 종류/회차를 지정합니다 (인자 파싱 후 호출)."""
+    run = _current_run.get()
+    if run is None:
+        return
+    if lottery_type is not None:
+        run.lottery_type = lottery_type
+    if target_round_no is not None:
+        run.target_round_no = target_round_no
+
+
+def instrumented(job_name: str, **run_kwargs):
+    """함수 실행 전체를 JobRun으로 감싸는 데코레이터 (async 함수 지원, --profile / LOTTOMAP_PROFILE이면 프로파일링)."""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with JobRun(job_name, **run_kwargs), profile_run(job_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with JobRun(job_name, **run_kwargs), profile_run(job_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def read_local_runs(job: str = None, limit: int = 20, log_file: Path = JOB_LOG_FILE) -> list:
+    """job_runs.jsonl에서 최근 실행 이력을 읽습니다 (최신순)."""
+    if not log_file.exists():
+        return []
+    runs = []
+    with open(log_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if job is None or entry['job_name'] == job:
+                runs.append(entry)
+    return runs[::-1][:limit]
+
+
+def fetch_recent_runs(database_url: str, job: str = None, limit: int = 20) -> list:
+    """job_runs 테이블에서 최근 실행 이력을 읽습니다 (최신순)."""
+    import psycopg2
+
+    conn = psycopg2.connect(database_url)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(RECENT_RUNS_SQL, {'job': job, 'limit': limit})
+            columns = [d[0] for d in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    finally:
+        conn.close()
+
+
+def print_runs(runs: list):
+    for run in runs:
+        status = {'COMPLETED': '✅', 'FAILED': '❌'}.get(run['status'], '⏳')
+        duration = f"{run['duration_ms'] / 1000:.1f}s" if run['duration_ms'] is not None else '-'
+        print(f"\n{status} {run['job_name']} {run['run_at']} ({duration}, {run['records_processed'] or 0:,}건)")
+        details = run.get('details') or {}
+        for stage in details.get('stages', []):
+            speed = f", {stage['rows_per_sec']:,}건/s" if stage.get('rows_per_sec') else ''
+            print(f"    - {stage['name']}: {stage['duration_ms'] / 1000:.2f}s, {stage['records']:,}건{speed}")
+        if run.get('error_message'):
+            print(f"    ❌ {run['error_message']}")
+
+
+@profiled('job-runs')
+def main():
+    parser = argparse.ArgumentParser(description='작업 실행 이력 조회')
+    parser.add_argument('--job', type=str, default=None, help='작업 이름 필터 (예: load-csv)')
+    parser.add_argument('--limit', type=int, default=20, help='조회 개수 (기본값: 20)')
+    parser.add_argument('--local', action='store_true', help=f'DB 대신 {JOB_LOG_FILE.name}에서 조회')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("작업 실행 이력")
+    print("=" * 60)
+
+    database_url = None if args.local else get_database_url()
+    if database_url:
+        try:
+            import psycopg2  # noqa: F401
+        except ImportError:
+            print("❌ psycopg2가 설치되지 않았습니다.")
+            sys.exit(1)
+        runs = fetch_recent_runs(database_url, args.job, args.limit)
+    else:
+        print(f"\n📂 {JOB_LOG_FILE.name}에서 조회")
+        runs = read_local_runs(args.job, args.limit)
+
+    if not runs:
+        print("\n실행 이력이 없습니다.")
+        return
+    print_runs(runs)
+
+
+if __name__ == '__main__':
+    main()
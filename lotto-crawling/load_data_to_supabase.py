@@ -3,12 +3,43 @@
 CSV 데이터를 Supabase에 적재하는 스크립트
 DB.md의 변환 규칙에 따라 draws, stores, winning_records 테이블에 데이터를 삽입합니다.
 """
-import csv
+import argparse
 import hashlib
+import json
 import os
 import sys
 from pathlib import Path
-from collections import defaultdict
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from draw_calendar import draw_date_map
+from job_runs import instrumented, job_stage
+from load_rules import (
+    compute_source_row_hash,
+    normalize_lottery_type,
+    normalize_method,
+    normalize_rank,
+    parse_coordinate,
+)
+from lottery_csv import iter_rows
+from stage_cache import StageCache, stage_key
+
+BATCH_SIZE = 500
+
+# 행 단위로 격리할 수 있는 오류의 SQLSTATE 클래스 (21: 배치 내 중복 키, 22: 데이터 오류, 23: 제약 위반)
+# 그 외(인증, 네트워크, 스키마 오류 등)는 배치를 나눠도 같은 오류가 나므로 바로 중단합니다.
+ROW_ERROR_SQLSTATE_CLASSES = ('21', '22', '23')
+
+# 증분 적재 상태 파일: 복권 종류별로 적재 완료된 최고 회차(high-water mark)
+LOAD_STATE_FILE = Path(__file__).parent / 'load_state.json'
+
+# source_id -> stores.id 매핑 로컬 캐시 (증분 갱신)
+STORE_ID_CACHE_FILE = Path(__file__).parent / 'store_id_map.json'
+
+# 적재 결과에 영향을 주는 코드 (단계 캐시 키)
+LOAD_CODE_FILES = [Path(__file__).parent / name for name in (
+    'load_data_to_supabase.py', 'load_rules.py', 'staging_loader.py', 'coordinate_validation.py', 'draw_calendar.py', 'draw_date_overrides.json', 'lottery_csv.py',
+)]
 
 def get_supabase_config():
     """환경변수 또는 .env.local에서 Supabase 설정을 읽어옵니다."""
@@ -34,115 +65,212 @@ def get_supabase_config():
     return supabase_url, supabase_key
 
 
-def normalize_method(method_raw: str) -> str:
-    """자동수동 값을 정규화합니다."""
-    method_map = {
-        '자동': 'AUTO',
-        '수동': 'MANUAL',
-        '반자동': 'SEMI',
-    }
-    return method_map.get(method_raw.strip(), 'UNKNOWN')
+def read_load_state():
+    """load_state.json에서 복권 종류별 워터마크를 읽어옵니다. 파일이 없으면 None을 반환합니다."""
+    if not LOAD_STATE_FILE.exists():
+        return None
+    with open(LOAD_STATE_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f).get('watermarks', {})
 
 
-def normalize_rank(rank_raw: str) -> int:
-    """등수 값을 정규화합니다."""
-    rank_map = {
-        '1등': 1,
-        '2등': 2,
-        '보너스': 0,
-    }
-    return rank_map.get(rank_raw.strip(), 1)
+def write_load_state(watermarks: dict):
+    """복권 종류별 워터마크를 load_state.json에 저장합니다."""
+    from datetime import datetime
 
+    with open(LOAD_STATE_FILE, 'w', encoding='utf-8') as f:
+        json.dump({
+            'watermarks': watermarks,
+            'updated_at': datetime.now().isoformat(timespec='seconds'),
+        }, f, ensure_ascii=False, indent=2)
 
-def normalize_lottery_type(lottery_type_raw: str) -> str:
-    """복권종류 값을 정규화합니다."""
-    return 'LOTTO' if lottery_type_raw.strip().lower() == 'lotto' else 'PENSION'
 
+def advance_watermarks(watermarks: dict, winning_records: list, failed_rounds: dict = None) -> dict:
+    """
+    적재한 당첨 기록의 복권 종류별 최고 회차로 워터마크를 올립니다.
 
-def compute_source_row_hash(round_no: int, lottery_type: str, store_source_id: str, rank: int, source_seq: int) -> str:
-    """source_row_hash를 계산합니다."""
-    hash_input = f"{round_no}|{lottery_type}|{store_source_id}|{rank}|{source_seq or 0}"
-    return hashlib.sha256(hash_input.encode()).hexdigest()
+    failed_rounds(복권 종류 -> 실패한 가장 낮은 회차)가 있으면 그 종류는 실패 회차 바로 아래까지만 올려
+    다음 --incremental 실행에서 실패 회차부터 다시 적재합니다.
+    """
+    failed_rounds = failed_rounds or {}
+    advanced = dict(watermarks or {})
+    for record in winning_records:
+        lottery_type, round_no = record['lottery_type'], record['round_no']
+        if lottery_type in failed_rounds and round_no >= failed_rounds[lottery_type]:
+            continue
+        if round_no > advanced.get(lottery_type, 0):
+            advanced[lottery_type] = round_no
+    return advanced
+
+
+def note_failed_round(failed_rounds: dict, lottery_type: str, round_no: int):
+    """복권 종류별로 실패한 가장 낮은 회차를 기록합니다."""
+    if failed_rounds is not None and round_no < failed_rounds.get(lottery_type, round_no + 1):
+        failed_rounds[lottery_type] = round_no
 
 
-def load_csv_data(csv_path: str):
-    """CSV 파일을 읽어서 파싱합니다."""
-    draws = set()  # round_no 집합
+def load_csv_data(csv_path: str, watermarks: dict = None, coordinate_rows: list = None):
+    """
+    CSV 파일을 읽어서 파싱합니다.
+
+    watermarks가 주어지면 복권 종류별로 해당 회차 이하의 행은 정규화/해시 계산 없이 건너뜁니다.
+    coordinate_rows가 주어지면 읽은 행의 원문 좌표를 (source_id, lottery_type, round_no, 주소, 위도, 경도)로 추가합니다
+    (증분 적재 시 새 행만 좌표 검증).
+    """
+    draws = set()  # (round_no, lottery_type) 집합
     stores = {}  # source_id -> store_data
     winning_records = []  # 당첨 기록 리스트
 
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            round_no = int(row['회차'])
-            source_id = row['판매점ID'].strip()
-            source_seq = int(row['번호']) if row['번호'].strip() else None
-            name = row['판매점명'].strip()
-            rank_raw = row['등수'].strip()
-            method_raw = row['자동수동'].strip()
-            address_raw = row['주소'].strip()
-            lat_raw = row['위도'].strip()
-            lng_raw = row['경도'].strip()
-            lottery_type_raw = row['복권종류'].strip()
-
-            # 정규화
-            rank = normalize_rank(rank_raw)
-            method = normalize_method(method_raw)
-            lottery_type = normalize_lottery_type(lottery_type_raw)
-            lat = float(lat_raw) if lat_raw else None
-            lng = float(lng_raw) if lng_raw else None
-
-            # draws 수집
-            draws.add(round_no)
-
-            # stores 수집 (같은 source_id면 가장 최신 정보로 덮어씀)
-            if source_id not in stores or stores[source_id]['round_no'] < round_no:
-                stores[source_id] = {
-                    'source_id': source_id,
-                    'name': name,
-                    'address_raw': address_raw,
-                    'address_norm': address_raw,  # 현재는 동일하게 사용
-                    'lat': lat,
-                    'lng': lng,
-                    'round_no': round_no,  # 최신 정보 판단용 (DB에는 저장 안 함)
-                }
-
-            # winning_records 수집
-            source_row_hash = compute_source_row_hash(round_no, lottery_type, source_id, rank, source_seq)
-            winning_records.append({
-                'source_row_hash': source_row_hash,
-                'round_no': round_no,  # draw_id로 사용
-                'store_source_id': source_id,  # 나중에 store_id로 변환
-                'lottery_type': lottery_type,
-                'rank': rank,
-                'method': method,
-                'source_seq': source_seq,
-            })
+    for row in iter_rows(csv_path):
+        round_no = row.round_no
+        lottery_type = normalize_lottery_type(row.lottery_type)
+        if watermarks and round_no <= watermarks.get(lottery_type, 0):
+            continue
+
+        source_id = row.source_id
+        source_seq = row.seq
+        name = row.name
+        address_raw = row.address
+
+        # 정규화
+        rank = normalize_rank(row.prize)
+        method = normalize_method(row.method)
+        lat = parse_coordinate(row.lat)
+        lng = parse_coordinate(row.lng)
+
+        # draws 수집
+        draws.add((round_no, lottery_type))
+        if coordinate_rows is not None:
+            coordinate_rows.append((source_id, lottery_type, round_no, address_raw, row.lat, row.lng))
+
+        # stores 수집 (같은 source_id면 가장 최신 정보로 덮어씀)
+        if source_id not in stores or stores[source_id]['round_no'] < round_no:
+            stores[source_id] = {
+                'source_id': source_id,
+                'name': name,
+                'address_raw': address_raw,
+                'address_norm': address_raw,  # 현재는 동일하게 사용
+                'lat': lat,
+                'lng': lng,
+                'round_no': round_no,  # 최신 정보 판단용 (DB에는 저장 안 함)
+            }
+
+        # winning_records 수집
+        source_row_hash = compute_source_row_hash(round_no, lottery_type, source_id, rank, source_seq)
+        winning_records.append({
+            'source_row_hash': source_row_hash,
+            'round_no': round_no,  # draw_id로 사용
+            'store_source_id': source_id,  # 나중에 store_id로 변환
+            'lottery_type': lottery_type,
+            'rank': rank,
+            'method': method,
+            'source_seq': source_seq,
+        })
+
+    # 추첨일은 적재 시점에 계산하여 won_at에 함께 기록
+    draw_dates = draw_date_map(draws)
+    for record in winning_records:
+        record['won_at'] = draw_dates[(record['round_no'], record['lottery_type'])]
 
     return sorted(draws), stores, winning_records
 
 
-def insert_draws(supabase, draws):
-    """draws 테이블에 회차 데이터를 삽입합니다."""
+def is_row_error(e: Exception) -> bool:
+    """PostgREST 오류 중 특정 행 때문에 난 오류(제약 위반/데이터 오류)인지 확인합니다."""
+    code = getattr(e, 'code', None)
+    return isinstance(code, str) and code[:2] in ROW_ERROR_SQLSTATE_CLASSES
+
+
+def upsert_with_bisect(supabase, table: str, batch: list, on_conflict: str):
+    """
+    배치를 upsert하고, 행 단위 오류로 실패하면 절반으로 나눠 재시도하여 실패한 행만 격리합니다.
+    인증/네트워크/스키마 오류는 나누지 않고 그대로 올립니다.
+
+    Returns:
+        (성공 행 수, [(실패 행, 예외)] 리스트)
+    """
+    try:
+        supabase.table(table).upsert(batch, on_conflict=on_conflict).execute()
+        return len(batch), []
+    except Exception as e:
+        if not is_row_error(e):
+            raise
+        if len(batch) == 1:
+            return 0, [(batch[0], e)]
+        mid = len(batch) // 2
+        left_ok, left_errors = upsert_with_bisect(supabase, table, batch[:mid], on_conflict)
+        right_ok, right_errors = upsert_with_bisect(supabase, table, batch[mid:], on_conflict)
+        return left_ok + right_ok, left_errors + right_errors
+
+
+def upsert_batches(supabase, table: str, rows: list, on_conflict: str,
+                   max_in_flight: int = 1, describe_row=None):
+    """
+    rows를 BATCH_SIZE 단위로 upsert합니다.
+
+    최대 max_in_flight개의 배치를 동시에 전송하며(클라이언트의 HTTP 커넥션 풀 공유),
+    그 이상은 앞선 배치가 끝날 때까지 제출하지 않습니다(backpressure).
+    진행 상황과 오류는 배치 순서대로 출력합니다.
+
+    Returns:
+        (성공 행 수, 실패 행 리스트)
+    """
+    batches = [rows[i:i+BATCH_SIZE] for i in range(0, len(rows), BATCH_SIZE)]
+    describe_row = describe_row or (lambda row: str(row)[:60])
+    done_rows = 0
+    ok_total = 0
+    failed_rows = []
+
+    def report(index, future):
+        nonlocal done_rows, ok_total
+        ok, errors = future.result()
+        ok_total += ok
+        failed_rows.extend(row for row, _ in errors)
+        done_rows += len(batches[index])
+        if errors:
+            print(f"  ⚠️ 배치 {index + 1}: {len(errors)}개 행 실패")
+            for row, e in errors:
+                print(f"    - 레코드 스킵 ({describe_row(row)}): {e}")
+        print(f"  ... {done_rows}/{len(rows)} 처리 완료")
+
+    with ThreadPoolExecutor(max_workers=max(1, max_in_flight)) as pool:
+        in_flight = deque()
+        for index, batch in enumerate(batches):
+            if len(in_flight) >= max_in_flight:
+                report(*in_flight.popleft())
+            in_flight.append((index, pool.submit(upsert_with_bisect, supabase, table, batch, on_conflict)))
+        while in_flight:
+            report(*in_flight.popleft())
+
+    return ok_total, failed_rows
+
+
+def insert_draws(supabase, draws, max_in_flight: int = 1, failed_rounds: dict = None) -> int:
+    """draws 테이블에 회차 데이터를 삽입합니다. 실패한 행 수를 반환합니다 (실패 회차는 failed_rounds에 기록)."""
     print(f"📌 draws 테이블에 {len(draws)}개 회차 삽입 중...")
 
-    batch_size = 500
-    draws_list = [{'round_no': r} for r in draws]
+    draw_dates = draw_date_map(draws)
+    draws_list = [
+        {'round_no': round_no, 'lottery_type': lottery_type, 'draw_date': draw_dates[(round_no, lottery_type)].isoformat()}
+        for round_no, lottery_type in draws
+    ]
+    _, failed = upsert_batches(supabase, 'draws', draws_list, 'round_no,lottery_type', max_in_flight)
+    for row in failed:
+        note_failed_round(failed_rounds, row['lottery_type'], row['round_no'])
 
-    for i in range(0, len(draws_list), batch_size):
-        batch = draws_list[i:i+batch_size]
-        supabase.table('draws').upsert(batch, on_conflict='round_no').execute()
-        print(f"  ... {min(i+batch_size, len(draws_list))}/{len(draws_list)} 완료")
+    print(f"{'⚠️ ' if failed else '✅'} draws 테이블 삽입 완료 (실패 {len(failed)}개)")
+    return len(failed)
 
-    print(f"✅ draws 테이블 삽입 완료")
 
+def insert_stores(supabase, stores, max_in_flight: int = 1) -> int:
+    """
+    stores 테이블에 판매점 데이터를 삽입합니다. 실패한 행 수를 반환합니다.
 
-def insert_stores(supabase, stores):
-    """stores 테이블에 판매점 데이터를 삽입합니다."""
+    좌표가 없는 판매점(누락/이상치이고 지오코딩 결과도 없음)은 lat/lng 컬럼 없이 따로 upsert하여
+    DB에 이미 있는 좌표(geocode_worker가 보정한 값 등)를 덮어쓰지 않습니다. 새 판매점은 NULL로 들어갑니다.
+    """
     print(f"📌 stores 테이블에 {len(stores)}개 판매점 삽입 중...")
 
-    batch_size = 500
-    store_list = []
+    with_coords, without_coords = [], []
     for store in stores.values():
         store_data = {
             'name': store['name'],
@@ -150,46 +278,122 @@ def insert_stores(supabase, stores):
             'address_norm': store['address_norm'],
             'source_id': store['source_id'],
         }
-        if store['lat'] is not None:
+        if store['lat'] is not None and store['lng'] is not None:
             store_data['lat'] = store['lat']
-        if store['lng'] is not None:
             store_data['lng'] = store['lng']
-        store_list.append(store_data)
-
-    for i in range(0, len(store_list), batch_size):
-        batch = store_list[i:i+batch_size]
-        supabase.table('stores').upsert(batch, on_conflict='source_id').execute()
-        print(f"  ... {min(i+batch_size, len(store_list))}/{len(store_list)} 완료")
-
-    print(f"✅ stores 테이블 삽입 완료")
-
-
-def get_store_id_map(supabase):
-    """source_id -> store.id 매핑을 가져옵니다."""
+            with_coords.append(store_data)
+        else:
+            without_coords.append(store_data)
+
+    failed = []
+    for store_list in (with_coords, without_coords):
+        if store_list:
+            _, batch_failed = upsert_batches(supabase, 'stores', store_list, 'source_id', max_in_flight,
+                                             describe_row=lambda row: f"source_id: {row['source_id']}")
+            failed.extend(batch_failed)
+
+    print(f"{'⚠️ ' if failed else '✅'} stores 테이블 삽입 완료 (실패 {len(failed)}개)")
+    return len(failed)
+
+
+def read_store_id_cache(supabase_url: str) -> dict:
+    """store_id_map.json에서 source_id -> store.id 매핑을 읽어옵니다 (다른 프로젝트 URL이면 무시)."""
+    if not STORE_ID_CACHE_FILE.exists():
+        return {}
+    with open(STORE_ID_CACHE_FILE, 'r', encoding='utf-8') as f:
+        cache = json.load(f)
+    if cache.get('supabase_url') != supabase_url:
+        return {}
+    return cache.get('store_ids', {})
+
+
+def write_store_id_cache(supabase_url: str, store_id_map: dict):
+    """source_id -> store.id 매핑을 store_id_map.json에 저장합니다."""
+    with open(STORE_ID_CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump({'supabase_url': supabase_url, 'store_ids': store_id_map}, f)
+
+
+def store_id_cache_matches(supabase, store_id_map: dict) -> bool:
+    """
+    캐시가 현재 stores 테이블과 맞는지 확인합니다 (쿼리 1회).
+
+    캐시의 최대 id 이하 판매점 수가 캐시 항목 수와 같고, 그 최대 id 행의 source_id가 캐시와 같아야 합니다.
+    TRUNCATE ... RESTART IDENTITY 후 다시 적재했거나 판매점이 삭제되면 맞지 않습니다.
+    """
+    cached_max_id = max(store_id_map.values())
+    response = supabase.table('stores')\
+        .select('id, source_id', count='exact')\
+        .lte('id', cached_max_id)\
+        .order('id', desc=True)\
+        .limit(1)\
+        .execute()
+    if response.count != len(store_id_map) or not response.data:
+        return False
+    row = response.data[0]
+    return row['id'] == cached_max_id and store_id_map.get(row['source_id']) == cached_max_id
+
+
+def get_store_id_map(supabase, source_ids=None):
+    """
+    source_id -> store.id 매핑을 가져옵니다.
+
+    로컬 캐시(store_id_map.json)를 읽은 뒤, 캐시의 최대 id보다 큰 판매점(= 마지막 조회 이후 추가된
+    판매점)만 조회하여 갱신합니다. stores.id는 BIGSERIAL이고 upsert 시 바뀌지 않으므로
+    기존 매핑은 그대로 유효합니다. 단, 테이블이 초기화되었으면(store_id_cache_matches) 캐시를 버립니다.
+    source_ids가 주어지면 그중 캐시에 없는 것만 추가로 조회합니다.
+    """
     print("📌 store_id 매핑 조회 중...")
-    store_id_map = {}
+    supabase_url, _ = get_supabase_config()
+    store_id_map = read_store_id_cache(supabase_url)
+    if store_id_map and not store_id_cache_matches(supabase, store_id_map):
+        print(f"⚠️  stores 테이블이 {STORE_ID_CACHE_FILE.name}와 다릅니다 (초기화/삭제) → 캐시를 버리고 다시 조회")
+        store_id_map = {}
+    cached_count = len(store_id_map)
+    max_id = max(store_id_map.values(), default=0)
     page_size = 1000
-    offset = 0
 
+    # 1. 캐시 이후 새로 생긴 판매점만 조회
     while True:
-        response = supabase.table('stores').select('id, source_id').range(offset, offset + page_size - 1).execute()
+        response = supabase.table('stores')\
+            .select('id, source_id')\
+            .gt('id', max_id)\
+            .order('id')\
+            .limit(page_size)\
+            .execute()
         if not response.data:
             break
         for row in response.data:
             store_id_map[row['source_id']] = row['id']
-        offset += page_size
+        max_id = response.data[-1]['id']
         if len(response.data) < page_size:
             break
 
-    print(f"  - {len(store_id_map)}개 매핑 조회 완료")
+    # 2. 그래도 없는 source_id는 직접 조회
+    if source_ids is not None:
+        missing = [sid for sid in set(source_ids) if sid not in store_id_map]
+        for i in range(0, len(missing), 200):
+            response = supabase.table('stores')\
+                .select('id, source_id')\
+                .in_('source_id', missing[i:i+200])\
+                .execute()
+            for row in response.data:
+                store_id_map[row['source_id']] = row['id']
+
+    write_store_id_cache(supabase_url, store_id_map)
+    print(f"  - {len(store_id_map)}개 매핑 (캐시 {cached_count}개, 신규 조회 {len(store_id_map) - cached_count}개)")
     return store_id_map
 
 
-def insert_winning_records(supabase, winning_records, store_id_map):
-    """winning_records 테이블에 당첨 기록을 삽입합니다."""
+def insert_winning_records(supabase, winning_records, store_id_map, max_in_flight: int = 1,
+                           failed_rounds: dict = None) -> int:
+    """
+    winning_records 테이블에 당첨 기록을 삽입합니다.
+
+    Returns:
+        실패 행 수 (store_id 매핑이 없어 건너뛴 기록 포함, 실패 회차는 failed_rounds에 기록)
+    """
     print(f"📌 winning_records 테이블에 {len(winning_records)}개 기록 삽입 중...")
 
-    batch_size = 500
     skipped = 0
     records_to_insert = []
 
@@ -197,6 +401,7 @@ def insert_winning_records(supabase, winning_records, store_id_map):
         store_id = store_id_map.get(record['store_source_id'])
         if store_id is None:
             skipped += 1
+            note_failed_round(failed_rounds, record['lottery_type'], record['round_no'])
             continue
 
         record_data = {
@@ -206,6 +411,7 @@ def insert_winning_records(supabase, winning_records, store_id_map):
             'lottery_type': record['lottery_type'],
             'rank': record['rank'],
             'method': record['method'],
+            'won_at': record['won_at'].isoformat(),
         }
         if record['source_seq'] is not None:
             record_data['source_seq'] = record['source_seq']
@@ -213,29 +419,46 @@ def insert_winning_records(supabase, winning_records, store_id_map):
 
     print(f"  - 삽입할 레코드: {len(records_to_insert)}개, 스킵: {skipped}개")
 
-    for i in range(0, len(records_to_insert), batch_size):
-        batch = records_to_insert[i:i+batch_size]
-        try:
-            supabase.table('winning_records').upsert(batch, on_conflict='source_row_hash').execute()
-        except Exception as e:
-            print(f"  ⚠️ 배치 {i//batch_size + 1} 오류: {e}")
-            # 개별 삽입 시도
-            for rec in batch:
-                try:
-                    supabase.table('winning_records').upsert([rec], on_conflict='source_row_hash').execute()
-                except Exception as e2:
-                    print(f"    - 레코드 스킵 (hash: {rec['source_row_hash'][:16]}...): {e2}")
-        print(f"  ... {min(i+batch_size, len(records_to_insert))}/{len(records_to_insert)} 처리 완료")
+    _, failed = upsert_batches(supabase, 'winning_records', records_to_insert, 'source_row_hash', max_in_flight,
+                               describe_row=lambda row: f"hash: {row['source_row_hash'][:16]}...")
+    for row in failed:
+        note_failed_round(failed_rounds, row['lottery_type'], row['draw_id'])
 
-    print(f"✅ winning_records 테이블 삽입 완료")
+    print(f"{'⚠️ ' if failed or skipped else '✅'} winning_records 테이블 삽입 완료 (실패 {len(failed)}개, 스킵 {skipped}개)")
+    return len(failed) + skipped
 
 
-def main():
-    """메인 함수"""
-    print("=" * 60)
-    print("CSV 데이터 → Supabase 적재 스크립트")
-    print("=" * 60)
+def validate_store_coordinates(stores, csv_path, geocode: str, new_rows: list = None):
+    """
+    좌표 검증 단계를 실행하고, 이상치 판매점만 geocode_cache/지오코딩으로 보정합니다.
+    new_rows(증분 적재의 새 행 좌표)가 있으면 CSV 전체 대신 새 행만 검증합니다.
+    """
+    from coordinate_validation import repair_store_coordinates
+
+    print("📌 좌표 검증 중..." + (f" (새 행 {len(new_rows)}개)" if new_rows is not None else ''))
+    if geocode == 'none':
+        counts = repair_store_coordinates(stores, csv_path, new_rows=new_rows)
+    else:
+        from geocode_worker import GeocodeCache, create_provider, get_database_url
+        import psycopg2
+        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+        conn = psycopg2.connect(get_database_url())
+        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        try:
+            with conn.cursor() as cursor:
+                counts = repair_store_coordinates(
+                    stores, csv_path, GeocodeCache(cursor), create_provider(geocode), new_rows=new_rows
+                )
+        finally:
+            conn.close()
+
+    for status, count in sorted(counts.items()):
+        print(f"  - {status}: {count}개")
+
 
+def create_supabase_client():
+    """Supabase 설정을 확인하고 클라이언트를 생성합니다."""
     # Supabase 설정 확인
     supabase_url, supabase_key = get_supabase_config()
     if not supabase_url or not supabase_key:
@@ -253,40 +476,221 @@ def main():
         print("설치: pip3 install supabase")
         sys.exit(1)
 
+    # Supabase 클라이언트 생성
+    print(f"\n🔗 Supabase 연결 중...")
+    supabase: Client = create_client(supabase_url, supabase_key)
+    print(f"  - URL: {supabase_url}")
+    return supabase
+
+
+def get_copy_database_url():
+    """COPY 모드용 DATABASE_URL과 psycopg2 설치 여부를 확인합니다."""
+    from staging_loader import get_database_url
+
+    database_url = get_database_url()
+    if not database_url:
+        print("❌ DATABASE_URL 환경변수를 찾을 수 없습니다.")
+        sys.exit(1)
+
+    try:
+        import psycopg2  # noqa: F401
+    except ImportError:
+        print("❌ psycopg2가 설치되지 않았습니다.")
+        print("설치: pip install psycopg2-binary")
+        sys.exit(1)
+
+    return database_url
+
+
+def fetch_db_watermarks(mode: str) -> dict:
+    """DB의 winning_records에서 복권 종류별 최고 회차를 조회합니다 (종류당 쿼리 1회)."""
+    if mode == 'copy':
+        from staging_loader import fetch_db_watermarks as fetch_via_sql
+        return fetch_via_sql(get_copy_database_url())
+
+    supabase = create_supabase_client()
+    watermarks = {}
+    for lottery_type in ('LOTTO', 'PENSION'):
+        response = supabase.table('winning_records')\
+            .select('draw_id')\
+            .eq('lottery_type', lottery_type)\
+            .order('draw_id', desc=True)\
+            .limit(1)\
+            .execute()
+        if response.data:
+            watermarks[lottery_type] = response.data[0]['draw_id']
+    return watermarks
+
+
+def fetch_db_fingerprint(mode: str) -> dict:
+    """대상 DB winning_records의 복권 종류별 [행 수, 최고 회차] (DB를 초기화하면 달라짐)."""
+    if mode == 'copy':
+        from staging_loader import fetch_db_fingerprint as fetch_via_sql
+        return fetch_via_sql(get_copy_database_url())
+
+    supabase = create_supabase_client()
+    fingerprint = {}
+    for lottery_type in ('LOTTO', 'PENSION'):
+        response = supabase.table('winning_records')\
+            .select('draw_id', count='exact')\
+            .eq('lottery_type', lottery_type)\
+            .order('draw_id', desc=True)\
+            .limit(1)\
+            .execute()
+        if response.data:
+            fingerprint[lottery_type] = [response.count, response.data[0]['draw_id']]
+    return fingerprint
+
+
+def load_cache_key(args, csv_path) -> str:
+    """
+    적재 단계 캐시 키. 입력 CSV/코드/옵션에 더해 대상 DB의 현재 상태(fetch_db_fingerprint)를 포함하므로
+    같은 URL의 DB를 초기화하거나 다른 곳에서 행이 바뀌면 캐시가 맞지 않아 다시 적재합니다.
+    """
+    target = get_supabase_config()[0] if args.mode == 'rest' else get_copy_database_url()
+    return stage_key(
+        'load',
+        [csv_path] + ([LOAD_STATE_FILE] if args.incremental else []),
+        LOAD_CODE_FILES,
+        {
+            'mode': args.mode,
+            'incremental': args.incremental,
+            'geocode': args.geocode,
+            'target': hashlib.sha256((target or '').encode('utf-8')).hexdigest(),
+            'db': fetch_db_fingerprint(args.mode),
+        },
+    )
+
+
+def load_with_copy(csv_path, stores, watermarks: dict = None):
+    """COPY + 스테이징 병합 모드로 적재합니다."""
+    from staging_loader import load_via_copy
+
+    database_url = get_copy_database_url()
+
+    print(f"\n🔗 데이터베이스 연결 중... (COPY 모드)")
+    print("\n" + "-" * 40)
+    print(f"📌 stg_winning_store_rows 스테이징 적재 및 병합 중...")
+    stats = load_via_copy(database_url, csv_path, stores, watermarks)
+    print(f"  - 스테이징 행: {stats['rows']}개 (중복 제외: {stats['duplicates']}개)")
+    print(f"  - draws 삽입/갱신: {stats['draws']}개")
+    print(f"  - stores 삽입/갱신: {stats['stores']}개")
+    print(f"  - winning_records 삽입/갱신: {stats['winning_records']}개")
+    print(f"  - 단계별 소요 시간(ms): {stats['timings_ms']}")
+
+
+def load_with_rest(draws, stores, winning_records, max_in_flight: int = 1, failed_rounds: dict = None) -> int:
+    """
+    Supabase REST 클라이언트로 500건 배치 upsert 적재합니다 (최대 max_in_flight개 배치 동시 전송).
+
+    Returns:
+        실패 행 수 합계 (draws + stores + winning_records). 복권 종류별 가장 낮은 실패 회차는 failed_rounds에 기록합니다.
+        판매점 실패는 해당 판매점의 당첨 기록이 스킵되므로 그 회차로 반영됩니다.
+    """
+    supabase = create_supabase_client()
+
+    # 1. draws 삽입
+    print("\n" + "-" * 40)
+    failed = insert_draws(supabase, draws, max_in_flight, failed_rounds)
+
+    # 2. stores 삽입
+    print("\n" + "-" * 40)
+    failed += insert_stores(supabase, stores, max_in_flight)
+
+    # 3. store_id 매핑 가져오기
+    print("\n" + "-" * 40)
+    store_id_map = get_store_id_map(supabase, stores.keys())
+
+    # 4. winning_records 삽입
+    print("\n" + "-" * 40)
+    failed += insert_winning_records(supabase, winning_records, store_id_map, max_in_flight, failed_rounds)
+    return failed
+
+
+@instrumented('load-csv')
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description='CSV 데이터 → Supabase 적재')
+    parser.add_argument('--mode', choices=['rest', 'copy'], default='rest',
+                        help='적재 방식 (rest: Supabase REST 배치 upsert, copy: COPY + 스테이징 병합, DATABASE_URL 필요)')
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help='rest 모드에서 동시에 전송할 배치 수 (기본값: 1 - 순차)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='load_state.json의 복권 종류별 워터마크 이후 회차만 적재')
+    parser.add_argument('--geocode', choices=['none', 'kakao', 'stub'], default='none',
+                        help='좌표 이상치 판매점 지오코딩 제공자 (기본값: none - 이상치 판매점은 DB 좌표 유지, 새 판매점은 좌표 없이 적재)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='단계 캐시를 무시하고 항상 적재 (DB를 초기화한 뒤 다시 적재할 때)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("CSV 데이터 → Supabase 적재 스크립트")
+    print("=" * 60)
+
     # CSV 파일 경로
     csv_path = Path(__file__).parent / 'all_lottery_stores.csv'
     if not csv_path.exists():
         print(f"❌ CSV 파일을 찾을 수 없습니다: {csv_path}")
         sys.exit(1)
 
+    # 같은 CSV를 같은 코드/옵션으로 적재한 뒤 DB 상태(종류별 행 수/최고 회차)가 그대로면 건너뜀 (재시도된 작업 등)
+    cache = StageCache()
+    if not args.no_cache and cache.enabled and cache.restore(load_cache_key(args, csv_path), [LOAD_STATE_FILE]):
+        print("\n♻️  입력 CSV/적재 코드/DB 상태가 마지막 적재와 같아 건너뜁니다 (--no-cache로 강제 적재).")
+        return
+
+    # 증분 적재 워터마크
+    watermarks = None
+    if args.incremental:
+        watermarks = read_load_state()
+        if watermarks is None:
+            print(f"\n📌 {LOAD_STATE_FILE.name} 없음 → DB에서 워터마크 조회")
+            watermarks = fetch_db_watermarks(args.mode)
+        print(f"\n📌 증분 적재 워터마크: {watermarks}")
+
     # CSV 데이터 로드
     print(f"\n📖 CSV 파일 읽는 중: {csv_path}")
-    draws, stores, winning_records = load_csv_data(csv_path)
-    print(f"  - 회차: {len(draws)}개 (범위: {min(draws)} ~ {max(draws)})")
+    coordinate_rows = [] if args.incremental else None
+    with job_stage('read_csv') as stage:
+        draws, stores, winning_records = load_csv_data(csv_path, watermarks, coordinate_rows)
+        stage.records = len(winning_records)
+    if not winning_records:
+        print("\n✅ 새로 적재할 당첨 기록이 없습니다.")
+        return
+    for lottery_type in sorted({t for _, t in draws}):
+        rounds = [r for r, t in draws if t == lottery_type]
+        print(f"  - {lottery_type} 회차: {len(rounds)}개 (범위: {min(rounds)} ~ {max(rounds)})")
     print(f"  - 판매점: {len(stores)}개")
     print(f"  - 당첨 기록: {len(winning_records)}개")
 
-    # Supabase 클라이언트 생성
-    print(f"\n🔗 Supabase 연결 중...")
-    supabase: Client = create_client(supabase_url, supabase_key)
-    print(f"  - URL: {supabase_url}")
+    # 좌표 검증/보정
+    print()
+    with job_stage('validate_coordinates') as stage:
+        validate_store_coordinates(stores, csv_path, args.geocode, coordinate_rows)
+        stage.records = len(stores)
 
     try:
-        # 1. draws 삽입
-        print("\n" + "-" * 40)
-        insert_draws(supabase, draws)
-
-        # 2. stores 삽입
-        print("\n" + "-" * 40)
-        insert_stores(supabase, stores)
-
-        # 3. store_id 매핑 가져오기
-        print("\n" + "-" * 40)
-        store_id_map = get_store_id_map(supabase)
-
-        # 4. winning_records 삽입
-        print("\n" + "-" * 40)
-        insert_winning_records(supabase, winning_records, store_id_map)
+        failed = 0
+        failed_rounds = {}
+        with job_stage(f'load_{args.mode}') as stage:
+            if args.mode == 'copy':
+                load_with_copy(csv_path, stores, watermarks)
+            else:
+                failed = load_with_rest(draws, stores, winning_records, args.concurrency, failed_rounds)
+            stage.records = len(winning_records) - failed
+
+        # 실패가 있는 복권 종류는 가장 낮은 실패 회차 바로 아래까지만 워터마크를 올림
+        write_load_state(advance_watermarks(watermarks, winning_records, failed_rounds))
+
+        if failed:
+            print("\n" + "=" * 60)
+            print(f"❌ {failed}개 행 적재 실패 (다시 적재할 회차: {failed_rounds}) - 원인을 확인한 뒤 다시 실행하세요.")
+            print("=" * 60)
+            sys.exit(1)
+
+        # 적재가 끝난 DB 상태로 키를 만들어 저장 (실패가 있으면 위에서 종료되어 저장하지 않음)
+        if cache.enabled:
+            cache.store(load_cache_key(args, csv_path), 'load', [LOAD_STATE_FILE])
 
         print("\n" + "=" * 60)
         print("✅ 모든 데이터 적재 완료!")
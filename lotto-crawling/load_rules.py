@@ -0,0 +1,45 @@
+"""
+CSV → DB 변환 규칙 (Docs/DB.md "적재 규칙")
+REST 적재(load_data_to_supabase.py)와 COPY 적재(staging_loader.py), CSV 검증/지도 산출물이 같은 규칙을 쓰도록
+값 정규화와 source_row_hash 계산을 한 곳에 둡니다. 다른 로컬 모듈을 가져오지 않습니다.
+"""
+import hashlib
+
+
+def normalize_method(method_raw: str) -> str:
+    """자동수동 값을 정규화합니다."""
+    method_map = {
+        '자동': 'AUTO',
+        '수동': 'MANUAL',
+        '반자동': 'SEMI',
+    }
+    return method_map.get(method_raw.strip(), 'UNKNOWN')
+
+
+def normalize_rank(rank_raw: str) -> int:
+    """등수 값을 정규화합니다."""
+    rank_map = {
+        '1등': 1,
+        '2등': 2,
+        '보너스': 0,
+    }
+    return rank_map.get(rank_raw.strip(), 1)
+
+
+def normalize_lottery_type(lottery_type_raw: str) -> str:
+    """복권종류 값을 정규화합니다."""
+    return 'LOTTO' if lottery_type_raw.strip().lower() == 'lotto' else 'PENSION'
+
+
+def compute_source_row_hash(round_no: int, lottery_type: str, store_source_id: str, rank: int, source_seq: int) -> str:
+    """source_row_hash를 계산합니다."""
+    hash_input = f"{round_no}|{lottery_type}|{store_source_id}|{rank}|{source_seq or 0}"
+    return hashlib.sha256(hash_input.encode()).hexdigest()
+
+
+def parse_coordinate(value_raw: str):
+    """좌표 문자열을 float로 변환합니다. 빈 값이나 숫자가 아니면 None을 반환합니다."""
+    try:
+        return float(value_raw) if value_raw else None
+    except ValueError:
+        return None
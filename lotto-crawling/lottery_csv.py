@@ -0,0 +1,167 @@
+"""
+당첨 판매점 CSV 공용 리더
+lotto_all_rounds.csv, pension_all_rounds.csv, all_lottery_stores.csv의 스키마(한글 헤더 13개)를 한 곳에 선언하고
+두 가지 읽기 경로를 제공합니다.
+
+- read_frame(): pandas 벡터화 읽기. 컬럼별 dtype을 지정하고(회차 int32, 번호 Int32, 등수/지역 등은 category)
+  pyarrow가 설치되어 있으면 pyarrow 엔진을 씁니다. 전화번호/판매점ID는 문자열이라 앞자리 0이 보존됩니다.
+- iter_rows(): 스트리밍 읽기. 행마다 dict를 만드는 csv.DictReader 대신 컬럼 위치로 꺼낸 StoreRow(namedtuple)를 돌려줍니다.
+
+공통 규칙:
+- 인코딩은 항상 utf-8-sig (크롤러가 쓰는 BOM이 있어도 없어도 같은 헤더)
+- 복권종류 컬럼이 없는 파일(lotto_all_rounds.csv 등)은 파일 이름으로 채웁니다 (pension_* → pension, 그 외 lotto).
+- 선택 컬럼(지역, 전화번호, 취급복권)이 없으면 빈 문자열로 채웁니다.
+"""
+import csv
+import importlib.util
+from collections import namedtuple
+from pathlib import Path
+
+import pandas as pd
+
+ENCODING = 'utf-8-sig'
+
+# 컬럼 이름 -> pandas dtype (read_frame에서 숫자/범주 변환 전 읽기 타입)
+COLUMNS = {
+    '회차': 'int32',
+    '판매점ID': str,
+    '번호': str,
+    '판매점명': str,
+    '등수': 'category',
+    '자동수동': 'category',
+    '지역': 'category',
+    '주소': str,
+    '전화번호': str,
+    '취급복권': 'category',
+    '위도': str,
+    '경도': str,
+    '복권종류': 'category',
+}
+
+REQUIRED_COLUMNS = ('회차', '판매점ID', '번호', '판매점명', '등수', '자동수동', '주소', '위도', '경도')
+OPTIONAL_COLUMNS = ('지역', '전화번호', '취급복권')
+
+# 스트리밍 레코드 (값은 앞뒤 공백 제거, round_no는 int, seq는 int 또는 None, lottery_type은 'LOTTO'/'PENSION')
+StoreRow = namedtuple('StoreRow', [
+    'round_no', 'source_id', 'seq', 'name', 'prize', 'method', 'region',
+    'address', 'phone', 'products', 'lat', 'lng', 'lottery_type',
+])
+
+_ROW_FIELDS = ('회차', '판매점ID', '번호', '판매점명', '등수', '자동수동', '지역', '주소', '전화번호', '취급복권', '위도', '경도')
+
+_HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+
+def default_lottery_type(path) -> str:
+    """복권종류 컬럼이 없는 파일의 기본 복권 종류 (pension_*.csv는 연금복권)."""
+    return 'pension' if Path(path).name.startswith('pension') else 'lotto'
+
+
+def read_header(path) -> list:
+    """CSV 헤더 (BOM 제거, 앞뒤 공백 제거)."""
+    with open(path, 'r', encoding=ENCODING, newline='') as f:
+        return [name.strip() for name in next(csv.reader(f), [])]
+
+
+def _check_columns(header: list, path):
+    missing = [name for name in REQUIRED_COLUMNS if name not in header]
+    if missing:
+        raise ValueError(f"{Path(path).name}: 필수 컬럼 누락 ({', '.join(missing)})")
+
+
+def read_frame(path, columns=None, lottery_type: str = None) -> pd.DataFrame:
+    """
+    CSV를 스키마 dtype으로 읽습니다.
+
+    Args:
+        path: CSV 경로
+        columns: 읽을 컬럼 (기본값: 전체). 복권종류는 항상 포함됩니다.
+        lottery_type: 복권종류 컬럼이 없을 때 채울 값 (기본값: 파일 이름으로 추정)
+
+    Returns:
+        한글 컬럼 이름 그대로의 DataFrame. 번호는 Int32(빈 값은 <NA>), 위도/경도는 원문 문자열입니다.
+    """
+    header = read_header(path)
+    _check_columns(header, path)
+    wanted = list(columns or COLUMNS)
+    if '복권종류' not in wanted:
+        wanted.append('복권종류')
+    usecols = [name for name in wanted if name in header]
+    dtype = {name: COLUMNS[name] for name in usecols}
+
+    options = dict(usecols=usecols, dtype=dtype, encoding=ENCODING, keep_default_na=False, na_values=[])
+    if _HAS_PYARROW:
+        try:
+            df = pd.read_csv(path, engine='pyarrow', **options)
+        except ValueError:
+            df = pd.read_csv(path, **options)
+    else:
+        df = pd.read_csv(path, **options)
+    df.columns = [name.strip() for name in df.columns]
+
+    if '복권종류' not in df.columns:
+        df['복권종류'] = pd.Categorical([lottery_type or default_lottery_type(path)] * len(df))
+    for name in OPTIONAL_COLUMNS:
+        if name in wanted and name not in df.columns:
+            df[name] = ''
+    if '번호' in df.columns:
+        df['번호'] = pd.to_numeric(df['번호'].str.strip(), errors='coerce').astype('Int32')
+    return df[[name for name in wanted if name in df.columns]]
+
+
+def iter_rows(path, lottery_type: str = None):
+    """
+    CSV 행을 StoreRow로 하나씩 돌려줍니다 (메모리 일정).
+
+    번호가 숫자가 아니면 seq는 None입니다. 회차가 숫자가 아니면 ValueError를 그대로 올립니다.
+    """
+    with open(path, 'r', encoding=ENCODING, newline='') as f:
+        reader = csv.reader(f)
+        header = [name.strip() for name in next(reader, [])]
+        _check_columns(header, path)
+        positions = {name: i for i, name in enumerate(header)}
+        fallback_type = (lottery_type or default_lottery_type(path)).upper()
+        type_index = positions.get('복권종류')
+        # 없는 선택 컬럼은 빈 문자열을 가리키도록 행 끝에 붙인 칸을 사용
+        blank = len(header)
+        indices = [positions.get(name, blank) for name in _ROW_FIELDS]
+        (i_round, i_id, i_seq, i_name, i_prize, i_method, i_region,
+         i_address, i_phone, i_products, i_lat, i_lng) = indices
+        make = StoreRow._make
+        width = blank + 1
+
+        for row in reader:
+            if not row:
+                continue
+            # 뒤쪽 칸이 빠진 행(빈 좌표 등)은 빈 문자열로 채우고, 헤더보다 긴 행도 빈 칸 위치는 ''로 고정
+            row.extend([''] * (width - len(row)))
+            row[blank] = ''
+            seq = row[i_seq].strip()
+            yield make((
+                int(row[i_round]),
+                row[i_id].strip(),
+                int(seq) if seq.isdigit() else None,
+                row[i_name].strip(),
+                row[i_prize].strip(),
+                row[i_method].strip(),
+                row[i_region].strip(),
+                row[i_address].strip(),
+                row[i_phone].strip(),
+                row[i_products].strip(),
+                row[i_lat].strip(),
+                row[i_lng].strip(),
+                row[type_index].strip().upper() if type_index is not None else fallback_type,
+            ))
+
+
+def max_round(path) -> int:
+    """CSV의 최대 회차 (회차 컬럼만 스캔, 행이 없으면 0)."""
+    with open(path, 'r', encoding=ENCODING, newline='') as f:
+        reader = csv.reader(f)
+        header = [name.strip() for name in next(reader, [])]
+        index = header.index('회차')
+        latest = 0
+        for row in reader:
+            if len(row) > index and row[index].strip():
+                latest = max(latest, int(row[index]))
+    return latest
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+지도 마커 클러스터 사전 생성 (ETL 단계)
+판매점 좌표와 당첨 횟수(stores + store_stats 또는 CSV)로 줌 레벨별 클러스터를 미리 만들어 JSON으로 내보냅니다.
+
+supercluster와 같은 방식의 계층 구조입니다.
+- 최대 줌에서는 판매점 하나가 하나의 점입니다.
+- 한 단계 낮은 줌에서는 윗 단계 점들을 웹 메르카토르 픽셀 격자(기본 60px)로 묶습니다.
+- 각 클러스터는 부모(한 단계 낮은 줌) 클러스터 번호를 가지므로 클릭 시 펼칠 자식을 바로 찾을 수 있습니다.
+
+클러스터 요약에는 판매점 수, 복권 종류/등수별 당첨 합계, 1등 합계(랭킹 탭과 같은 lotto1 + pension)가
+가장 큰 대표 판매점이 들어갑니다. 한 화면(약 1000x800px)에 격자 셀은 수백 개를 넘지 않습니다.
+
+사용법:
+    python marker_clusters.py --source csv --csv all_lottery_stores.csv
+    python marker_clusters.py --source db --output-dir map_clusters
+"""
+import argparse
+import json
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from profiling import profiled
+from spatial_index import WIN_COLUMNS, get_database_url, load_store_points_from_csv, load_store_points_from_db
+
+DEFAULT_MIN_ZOOM = 5
+DEFAULT_MAX_ZOOM = 16
+DEFAULT_RADIUS_PX = 60
+TILE_SIZE = 256
+
+DEFAULT_OUTPUT_DIR = 'map_clusters'
+
+WIN_NAMES = list(WIN_COLUMNS.values())
+
+CLUSTER_COLUMNS = ['id', 'lat', 'lng', 'store_count', *WIN_NAMES, 'top_store_id', 'parent']
+
+
+def mercator_pixels(lat, lng, zoom: int):
+    """위도/경도 배열을 해당 줌의 웹 메르카토르 픽셀 좌표로 변환합니다."""
+    scale = TILE_SIZE * (2 ** zoom)
+    x = (np.asarray(lng) + 180.0) / 360.0 * scale
+    sin_lat = np.sin(np.radians(lat))
+    y = (0.5 - np.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)) * scale
+    return x, y
+
+
+def first_prize_score(wins: dict) -> np.ndarray:
+    """랭킹 탭(Sidebar.tsx)과 같은 1등 합계 점수."""
+    return wins['lotto1'] + wins['pension']
+
+
+def build_clusters(store_ids, lat, lng, wins: dict, min_zoom: int = DEFAULT_MIN_ZOOM,
+                   max_zoom: int = DEFAULT_MAX_ZOOM, radius_px: int = DEFAULT_RADIUS_PX) -> dict:
+    """
+    줌 레벨별 클러스터를 만듭니다.
+
+    Returns:
+        zoom -> 컬럼 배열 딕셔너리 (CLUSTER_COLUMNS). parent는 zoom-1 단계의 id이며 최소 줌에서는 -1
+    """
+    lat = np.asarray(lat, dtype='float64')
+    lng = np.asarray(lng, dtype='float64')
+    located = ~(np.isnan(lat) | np.isnan(lng))
+
+    # 최대 줌: 판매점 하나가 하나의 점
+    level = {
+        'lat': lat[located],
+        'lng': lng[located],
+        'store_count': np.ones(located.sum(), dtype='int64'),
+        **{name: np.asarray(wins[name], dtype='int64')[located] for name in WIN_NAMES},
+        'top_store_id': np.asarray(store_ids)[located],
+    }
+    level['top_score'] = first_prize_score(level)
+    level['id'] = np.arange(len(level['lat']))
+    levels = {max_zoom: level}
+
+    for zoom in range(max_zoom - 1, min_zoom - 1, -1):
+        child = levels[zoom + 1]
+        x, y = mercator_pixels(child['lat'], child['lng'], zoom)
+        cells = np.stack([(x // radius_px).astype('int64'), (y // radius_px).astype('int64')], axis=1)
+        _, parent = np.unique(cells, axis=0, return_inverse=True)
+        parent = parent.reshape(-1)
+        count = parent.max() + 1 if len(parent) else 0
+        child['parent'] = parent
+
+        store_count = np.bincount(parent, weights=child['store_count'], minlength=count)
+        cluster = {
+            # 중심점은 포함된 판매점 수로 가중 평균
+            'lat': np.bincount(parent, weights=child['lat'] * child['store_count'], minlength=count) / store_count,
+            'lng': np.bincount(parent, weights=child['lng'] * child['store_count'], minlength=count) / store_count,
+            'store_count': store_count.astype('int64'),
+            **{name: np.bincount(parent, weights=child[name], minlength=count).astype('int64')
+               for name in WIN_NAMES},
+        }
+
+        # 대표 판매점: 자식 중 1등 합계가 가장 큰 판매점 (동점이면 판매점 수가 많은 자식 우선)
+        order = np.lexsort((-child['store_count'], -child['top_score'], parent))
+        first = order[np.r_[0, np.flatnonzero(np.diff(parent[order])) + 1]]
+        cluster['top_store_id'] = child['top_store_id'][first]
+        cluster['top_score'] = child['top_score'][first]
+        cluster['id'] = np.arange(count)
+        levels[zoom] = cluster
+
+    levels[min_zoom]['parent'] = np.full(len(levels[min_zoom]['id']), -1, dtype='int64')
+    return levels
+
+
+def cluster_rows(cluster: dict) -> list:
+    """클러스터 컬럼 배열을 JSON 직렬화용 행 리스트로 변환합니다 (좌표는 소수 6자리)."""
+    columns = []
+    for name in CLUSTER_COLUMNS:
+        values = cluster[name]
+        if name in ('lat', 'lng'):
+            columns.append(np.round(values, 6).tolist())
+        else:
+            columns.append(values.tolist())
+    return [list(row) for row in zip(*columns)]
+
+
+def export_clusters(levels: dict, output_dir: Path) -> dict:
+    """
+    줌 레벨별 클러스터를 z{zoom}.json으로 저장하고 index.json 매니페스트를 씁니다.
+
+    Returns:
+        zoom -> 클러스터 수 딕셔너리
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    counts = {}
+    for zoom, cluster in sorted(levels.items()):
+        payload = {'zoom': zoom, 'columns': CLUSTER_COLUMNS, 'rows': cluster_rows(cluster)}
+        with open(output_dir / f'z{zoom}.json', 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+        counts[zoom] = len(cluster['id'])
+
+    manifest = {
+        'min_zoom': min(levels),
+        'max_zoom': max(levels),
+        'columns': CLUSTER_COLUMNS,
+        'counts': {str(zoom): count for zoom, count in counts.items()},
+    }
+    with open(output_dir / 'index.json', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return counts
+
+
+@profiled('marker-clusters')
+def main():
+    parser = argparse.ArgumentParser(description='지도 마커 클러스터 생성')
+    parser.add_argument('--source', choices=['csv', 'db'], default='csv', help='판매점 데이터 출처 (기본값: csv)')
+    parser.add_argument('--csv', type=str, default='all_lottery_stores.csv', help='--source csv일 때 CSV 파일')
+    parser.add_argument('--output-dir', type=str, default=DEFAULT_OUTPUT_DIR,
+                        help=f'출력 디렉터리 (기본값: {DEFAULT_OUTPUT_DIR})')
+    parser.add_argument('--min-zoom', type=int, default=DEFAULT_MIN_ZOOM)
+    parser.add_argument('--max-zoom', type=int, default=DEFAULT_MAX_ZOOM)
+    parser.add_argument('--radius', type=int, default=DEFAULT_RADIUS_PX, help='클러스터 반경(px)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("지도 마커 클러스터 생성")
+    print("=" * 60)
+
+    if args.source == 'csv':
+        csv_path = Path(args.csv)
+        if not csv_path.is_absolute():
+            csv_path = Path(__file__).parent / csv_path
+        if not csv_path.exists():
+            print(f"❌ CSV 파일을 찾을 수 없습니다: {csv_path}")
+            sys.exit(1)
+        print(f"\n📂 CSV 읽는 중: {csv_path}")
+        points = load_store_points_from_csv(csv_path)
+    else:
+        database_url = get_database_url()
+        if not database_url:
+            print("❌ DATABASE_URL 환경변수를 찾을 수 없습니다.")
+            sys.exit(1)
+        try:
+            import psycopg2
+        except ImportError:
+            print("❌ psycopg2가 설치되지 않았습니다.")
+            sys.exit(1)
+        print("\n🔗 데이터베이스 연결 중...")
+        conn = psycopg2.connect(database_url)
+        try:
+            with conn.cursor() as cursor:
+                points = load_store_points_from_db(cursor)
+        finally:
+            conn.close()
+
+    levels = build_clusters(*points, min_zoom=args.min_zoom, max_zoom=args.max_zoom, radius_px=args.radius)
+
+    output_dir = Path(args.output_dir)
+    if not output_dir.is_absolute():
+        output_dir = Path(__file__).parent / output_dir
+    counts = export_clusters(levels, output_dir)
+
+    print("\n줌 레벨별 클러스터 수:")
+    for zoom, count in counts.items():
+        print(f"  - z{zoom}: {count:,}")
+    print(f"\n💾 저장: {output_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,28 @@
 import pandas as pd
 import re
 
+import lottery_csv
+from profiling import profiled
+from stage_cache import StageCache, stage_key
+
 def normalize_phone_number(phone_number):
     if pd.isna(phone_number):
         return None
     return re.sub(r'\D', '', str(phone_number))
 
+@profiled('normalize')
 def main():
+    # 같은 입력을 이미 정규화한 적이 있으면 캐시된 결과를 복원
+    cache = StageCache()
+    key = stage_key('normalize', ["all_lottery_stores.csv"], [__file__, lottery_csv.__file__])
+    if cache.restore(key, ["all_lottery_stores.csv"]):
+        print("Input unchanged, restored normalized all_lottery_stores.csv from stage cache")
+        return
+
     # Read the all_lottery_stores.csv file
     try:
-        df = pd.read_csv("all_lottery_stores.csv")
+        # 전화번호를 문자열로 읽어 앞자리 0이 숫자 변환으로 사라지지 않도록 함
+        df = lottery_csv.read_frame("all_lottery_stores.csv")
     except FileNotFoundError:
         print("Error: The file all_lottery_stores.csv was not found.")
         return
@@ -30,6 +43,8 @@ def main():
         df.to_csv("all_lottery_stores.csv", index=False)
     except Exception as e:
         print(f"Error writing CSV file: {e}")
+        return
+    cache.store(key, 'normalize', ["all_lottery_stores.csv"])
 
 if __name__ == "__main__":
     main()
@@ -11,7 +11,10 @@ import csv
 from datetime import datetime
 from typing import List, Dict
 from playwright.async_api import async_playwright, Page, Browser
-from bs4 import BeautifulSoup
+
+from crawl_telemetry import CrawlTelemetry
+from profiling import profiled
+from store_parser import parse_stores
 
 
 class PensionLotteryCrawler:
@@ -111,86 +114,9 @@ class PensionLotteryCrawler:
         Returns:
             판매점 정보 리스트
         """
-        # 페이지 HTML 가져오기
+        # 페이지 HTML 가져오기 (파싱은 프로세스 풀에서 실행)
         html = await self.page.content()
-        soup = BeautifulSoup(html, 'html.parser')
-
-        stores = []
-        store_boxes = soup.select('.store-box')
-
-        for store_box in store_boxes:
-            try:
-                # 기본 정보 추출
-                store_id = store_box.get('data-ltshpid', '')
-
-                # 판매점 이름
-                store_name_elem = store_box.select_one('.store-loc')
-                store_name = store_name_elem.text.strip() if store_name_elem else ''
-
-                # 필수 정보가 없으면 건너뛰기
-                if not store_id or not store_name:
-                    continue
-
-                # 번호
-                store_num_elem = store_box.select_one('.store-num')
-                store_num = store_num_elem.text.strip() if store_num_elem else ''
-
-                # 등수
-                rank_elem = store_box.select_one('.draw-rank')
-                rank = rank_elem.text.strip() if rank_elem else ''
-
-                # 자동/수동 (선택적)
-                opt_elem = store_box.select_one('.draw-opt')
-                opt = opt_elem.text.strip() if opt_elem else ''
-
-                # 주소
-                addr_elem = store_box.select_one('.store-addr')
-                address = addr_elem.text.strip() if addr_elem else ''
-
-                # 전화번호
-                tel_elem = store_box.select_one('.store-tel')
-                phone = tel_elem.text.strip() if tel_elem else ''
-
-                # 취급 복권 종류
-                lottery_types = []
-                for badge in store_box.select('.txt-bagge'):
-                    lottery_types.append(badge.text.strip())
-
-                # Hidden input에서 좌표 정보 추출
-                lat_input = store_box.select_one('input.shpLat')
-                lon_input = store_box.select_one('input.shpLot')
-
-                latitude = lat_input.get('value', '') if lat_input else ''
-                longitude = lon_input.get('value', '') if lon_input else ''
-
-                # 지역 정보 (tit-detail에서 추출)
-                region_elem = store_box.select_one('.tit-detail')
-                region = ''
-                if region_elem:
-                    region_text = region_elem.text.strip()
-                    # (숫자) 부분 제거
-                    region = region_text.split('(')[0].strip()
-
-                store_info = {
-                    '판매점ID': store_id,
-                    '번호': store_num,
-                    '판매점명': store_name,
-                    '등수': rank,
-                    '자동수동': opt,
-                    '지역': region,
-                    '주소': address,
-                    '전화번호': phone,
-                    '취급복권': ', '.join(lottery_types),
-                    '위도': latitude,
-                    '경도': longitude,
-                    '크롤링시간': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                }
-
-                stores.append(store_info)
-
-            except Exception as e:
-                print(f"⚠️  판매점 정보 추출 중 오류: {e}")
-                continue
+        stores = await parse_stores(html)
 
         print(f"✅ {len(stores)}개 판매점 정보 추출 완료")
         return stores
@@ -213,69 +139,7 @@ class PensionLotteryCrawler:
     async def get_stores_silent(self) -> List[Dict]:
         """로그 없이 판매점 정보 추출"""
         html = await self.page.content()
-        soup = BeautifulSoup(html, 'html.parser')
-
-        stores = []
-        store_boxes = soup.select('.store-box')
-
-        for store_box in store_boxes:
-            try:
-                store_id = store_box.get('data-ltshpid', '')
-                store_name_elem = store_box.select_one('.store-loc')
-                store_name = store_name_elem.text.strip() if store_name_elem else ''
-
-                if not store_id or not store_name:
-                    continue
-
-                store_num_elem = store_box.select_one('.store-num')
-                store_num = store_num_elem.text.strip() if store_num_elem else ''
-
-                rank_elem = store_box.select_one('.draw-rank')
-                rank = rank_elem.text.strip() if rank_elem else ''
-
-                opt_elem = store_box.select_one('.draw-opt')
-                opt = opt_elem.text.strip() if opt_elem else ''
-
-                addr_elem = store_box.select_one('.store-addr')
-                address = addr_elem.text.strip() if addr_elem else ''
-
-                tel_elem = store_box.select_one('.store-tel')
-                phone = tel_elem.text.strip() if tel_elem else ''
-
-                lottery_types = []
-                for badge in store_box.select('.txt-bagge'):
-                    lottery_types.append(badge.text.strip())
-
-                lat_input = store_box.select_one('input.shpLat')
-                lon_input = store_box.select_one('input.shpLot')
-                latitude = lat_input.get('value', '') if lat_input else ''
-                longitude = lon_input.get('value', '') if lon_input else ''
-
-                region_elem = store_box.select_one('.tit-detail')
-                region = ''
-                if region_elem:
-                    region_text = region_elem.text.strip()
-                    region = region_text.split('(')[0].strip()
-
-                store_info = {
-                    '판매점ID': store_id,
-                    '번호': store_num,
-                    '판매점명': store_name,
-                    '등수': rank,
-                    '자동수동': opt,
-                    '지역': region,
-                    '주소': address,
-                    '전화번호': phone,
-                    '취급복권': ', '.join(lottery_types),
-                    '위도': latitude,
-                    '경도': longitude,
-                    '크롤링시간': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                }
-                stores.append(store_info)
-            except:
-                continue
-
-        return stores
+        return await parse_stores(html)
 
     def save_to_csv(self, stores: List[Dict], filename: str = None):
         """
@@ -314,6 +178,7 @@ class ParallelPensionCrawler:
         """
         self.max_workers = max_workers
         self.url = "https://www.dhlottery.co.kr/wnprchsplcsrch/home"
+        self.failed_rounds = []
         self.lottery_code = "pt720"
 
     async def _create_browser_context(self, playwright):
@@ -326,73 +191,9 @@ class ParallelPensionCrawler:
         )
         return browser, context
 
-    def _extract_stores(self, soup: BeautifulSoup, round_num: str) -> List[Dict]:
-        """BeautifulSoup에서 판매점 정보 추출"""
-        stores = []
-        store_boxes = soup.select('.store-box')
-
-        for store_box in store_boxes:
-            try:
-                store_id = store_box.get('data-ltshpid', '')
-                store_name_elem = store_box.select_one('.store-loc')
-                store_name = store_name_elem.text.strip() if store_name_elem else ''
-
-                if not store_id or not store_name:
-                    continue
-
-                store_num_elem = store_box.select_one('.store-num')
-                store_num = store_num_elem.text.strip() if store_num_elem else ''
-
-                rank_elem = store_box.select_one('.draw-rank')
-                rank = rank_elem.text.strip() if rank_elem else ''
-
-                opt_elem = store_box.select_one('.draw-opt')
-                opt = opt_elem.text.strip() if opt_elem else ''
-
-                addr_elem = store_box.select_one('.store-addr')
-                address = addr_elem.text.strip() if addr_elem else ''
-
-                tel_elem = store_box.select_one('.store-tel')
-                phone = tel_elem.text.strip() if tel_elem else ''
-
-                lottery_types = []
-                for badge in store_box.select('.txt-bagge'):
-                    lottery_types.append(badge.text.strip())
-
-                lat_input = store_box.select_one('input.shpLat')
-                lon_input = store_box.select_one('input.shpLot')
-                latitude = lat_input.get('value', '') if lat_input else ''
-                longitude = lon_input.get('value', '') if lon_input else ''
-
-                region_elem = store_box.select_one('.tit-detail')
-                region = ''
-                if region_elem:
-                    region_text = region_elem.text.strip()
-                    region = region_text.split('(')[0].strip()
-
-                store_info = {
-                    '회차': round_num,
-                    '판매점ID': store_id,
-                    '번호': store_num,
-                    '판매점명': store_name,
-                    '등수': rank,
-                    '자동수동': opt,
-                    '지역': region,
-                    '주소': address,
-                    '전화번호': phone,
-                    '취급복권': ', '.join(lottery_types),
-                    '위도': latitude,
-                    '경도': longitude,
-                    '크롤링시간': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                }
-                stores.append(store_info)
-            except:
-                continue
-
-        return stores
-
     async def crawl_all_rounds(self, start_round: int = 1, end_round: int = None,
-                                save_interval: int = 100) -> List[Dict]:
+                                save_interval: int = 100, max_attempts: int = 2,
+                                metrics_output: str = None) -> List[Dict]:
         """
         전체 회차 크롤링 (단일 브라우저 순차 처리)
 
@@ -400,6 +201,8 @@ class ParallelPensionCrawler:
             start_round: 시작 회차 (기본값: 1)
             end_round: 종료 회차 (기본값: None = 최신 회차까지)
             save_interval: 중간 저장 간격 (기본값: 100회차마다)
+            max_attempts: 회차당 최대 시도 횟수 (기본값: 2 - 실패 시 1회 재시도)
+            metrics_output: 회차별 크롤링 지표 저장 경로 (.json 또는 Prometheus 텍스트, 기본값: 저장 안 함)
 
         Returns:
             전체 판매점 정보 리스트
@@ -488,51 +291,62 @@ class ParallelPensionCrawler:
 
             print(f"\n📊 크롤링 설정:")
             print(f"   - 회차 범위: {start_round}회 ~ {end_round}회 (총 {total_rounds}개)")
-            print(f"   - 예상 소요시간: 약 {(total_rounds * 2.5 + (total_rounds // 50) * 10) // 60}분")
 
             # 결과 저장용
             results = []
             failed_rounds = []
             start_time = datetime.now()
+            telemetry = CrawlTelemetry('PENSION', total_rounds)
 
             print("\n🔄 크롤링 진행 중...")
 
             for i, round_num in enumerate(all_rounds):
-                try:
-                    await page.select_option('select#srchLtEpsd', round_num)
-                    await page.evaluate('WnPrchsPlcSrchM.fn_selectWnShp()')
-                    await asyncio.sleep(2)  # 안정적인 2초 대기
-                    await page.wait_for_selector('.store-box', state='visible', timeout=15000)
+                with telemetry.round(round_num) as metrics:
+                    for attempt in range(max_attempts):
+                        try:
+                            with metrics.phase('navigation'):
+                                await page.select_option('select#srchLtEpsd', round_num)
+                                await page.evaluate('WnPrchsPlcSrchM.fn_selectWnShp()')
+                            with metrics.phase('sleep'):
+                                await asyncio.sleep(2)  # 안정적인 2초 대기
+                            with metrics.phase('wait'):
+                                await page.wait_for_selector('.store-box', state='visible', timeout=15000)
+                            with metrics.phase('content'):
+                                html = await page.content()
+                            with metrics.phase('parse'):
+                                stores = await parse_stores(html, round_num)
+
+                            metrics.bytes = len(html.encode('utf-8'))
+                            metrics.rows = len(stores)
+                            results.extend(stores)
+                            break
 
-                    html = await page.content()
-                    soup = BeautifulSoup(html, 'html.parser')
-                    stores = self._extract_stores(soup, round_num)
-                    results.extend(stores)
-
-                    # 진행 상황 출력
-                    if (i + 1) % 10 == 0 or i == 0:
-                        pct = (i + 1) / total_rounds * 100
-                        elapsed = (datetime.now() - start_time).total_seconds()
-                        eta = (elapsed / (i + 1)) * (total_rounds - i - 1)
-                        print(f"   진행: {i+1}/{total_rounds} ({pct:.1f}%) | "
-                              f"판매점: {len(results)}개 | 예상 남은 시간: {eta/60:.1f}분")
-
-                    # 중간 저장
-                    if save_interval and (i + 1) % save_interval == 0:
-                        temp_filename = f"pension_checkpoint_{i+1}.csv"
-                        self.save_to_csv(results, temp_filename)
-                        print(f"   💾 중간 저장: {temp_filename}")
+                        except Exception as e:
+                            if attempt + 1 < max_attempts:
+                                metrics.retries += 1
+                            else:
+                                metrics.error = str(e)
+                                failed_rounds.append(round_num)
+                                if len(failed_rounds) <= 5:
+                                    print(f"   ⚠️ {round_num}회 실패: {e}")
+                            with metrics.phase('sleep'):
+                                await asyncio.sleep(3)  # 실패 시 추가 대기
 
                     # 50회차마다 추가 휴식 (서버 부담 감소)
                     if (i + 1) % 50 == 0:
                         print(f"   ⏸️  잠시 휴식 중... (10초)")
-                        await asyncio.sleep(10)
+                        with metrics.phase('sleep'):
+                            await asyncio.sleep(10)
 
-                except Exception as e:
-                    failed_rounds.append(round_num)
-                    if len(failed_rounds) <= 5:
-                        print(f"   ⚠️ {round_num}회 실패: {e}")
-                    await asyncio.sleep(3)  # 실패 시 추가 대기
+                # 진행 상황 출력 (남은 시간은 최근 회차의 실제 처리 속도 기준)
+                if (i + 1) % 10 == 0 or i == 0:
+                    print(telemetry.progress_line(len(results)))
+
+                # 중간 저장
+                if save_interval and (i + 1) % save_interval == 0:
+                    temp_filename = f"pension_checkpoint_{i+1}.csv"
+                    self.save_to_csv(results, temp_filename)
+                    print(f"   💾 중간 저장: {temp_filename}")
 
             end_time = datetime.now()
             elapsed = (end_time - start_time).total_seconds()
@@ -545,6 +359,11 @@ class ParallelPensionCrawler:
 
             if failed_rounds:
                 print(f"   - 실패 회차 목록: {failed_rounds[:10]}{'...' if len(failed_rounds) > 10 else ''}")
+            self.failed_rounds = failed_rounds  # backfill 워커가 재시도 구간을 만들 때 사용
+
+            telemetry.print_summary()
+            if metrics_output:
+                telemetry.export(metrics_output)
 
             return results
 
@@ -570,6 +389,7 @@ class ParallelPensionCrawler:
         print(f"💾 파일 저장 완료: {filename}")
 
 
+@profiled('pension-crawler')
 async def main():
     """메인 실행 함수 - 사용 예제"""
 
@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+주간 갱신 파이프라인 실행기
+크롤링 → 병합 → 정규화 → 검증 → 적재 → 집계 → 최근 기간 이동 → 검증 단계를 의존성 그래프(DAG)로 선언하고,
+의존성이 끝난 단계부터 병렬로 실행합니다 (로또/연금복권 크롤링, store_stats/판매점명 이력/랭킹 큐브, 지도 산출물 등).
+
+단계 키: 명령어 + 스크립트와 스크립트가 가져오는 로컬 모듈 소스 + 입력 파일 내용 + 선행 단계 키/산출물의 SHA-256
+- DB 단계 키에는 대상 DB 상태(winning_records 종류별 행 수/최고 회차)도 들어가므로 DB를 초기화하면 다시 실행됩니다.
+  DB 단계가 끝나면 DB 상태를 다시 조회해 실행 후 값으로 키를 기록합니다.
+- 마지막 성공 시 키(pipeline_state.json)와 같고 산출물도 그대로면 건너뜁니다.
+  입력 CSV가 바뀌지 않았으면 적재 이후 DB 단계까지 모두 건너뛰므로, 새 회차가 없는 주에는 크롤링만 실행됩니다.
+- 같은 산출물을 다시 쓰는 단계(normalize가 recombine 결과를 제자리 수정)가 끝나면 앞 단계의 기록된 산출물 해시도
+  새 내용으로 갱신합니다 (마지막으로 쓴 단계 기준).
+- 크롤링 단계는 항상 실행되고, 결과 CSV 내용이 후속 단계의 키가 됩니다.
+- 최근 기간 이동(rollover)은 날짜가 키에 들어가 하루 한 번 실행되고, 뒤따르는 검증도 다시 실행됩니다.
+- 단계 간 데이터는 CSV/산출물 파일로 전달하며 각 단계는 별도 프로세스로 실행합니다 (로그: pipeline_logs/<시각>/).
+
+사용법:
+    python pipeline.py                       # 전체 실행 (변경 없는 단계 건너뜀)
+    python pipeline.py --dry-run             # 실행 계획만 출력
+    python pipeline.py --no-crawl --offline  # 기존 CSV로 오프라인 산출물만 갱신
+    python pipeline.py --targets verify      # verify와 선행 단계만
+    python pipeline.py --force --max-parallel 2
+"""
+import argparse
+import ast
+import hashlib
+import json
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime
+from functools import lru_cache
+from pathlib import Path
+
+from job_runs import instrumented, job_stage
+
+BASE_DIR = Path(__file__).parent
+STATE_FILE = BASE_DIR / 'pipeline_state.json'
+LOG_DIR = BASE_DIR / 'pipeline_logs'
+
+DEFAULT_MAX_PARALLEL = 4
+LOG_TAIL_LINES = 20
+
+
+class Stage:
+    """
+    파이프라인 단계 1개.
+
+    Args:
+        name: 단계 이름
+        command: 실행할 스크립트와 인자 (lotto-crawling 기준 경로)
+        deps: 선행 단계 이름
+        inputs / outputs: 키 계산과 건너뛰기 판단에 쓰는 파일 또는 디렉터리의 대표 파일
+        always: 입력과 무관하게 항상 실행 (크롤링)
+        daily: 오늘 날짜를 키에 포함 (입력이 같아도 날짜가 바뀌면 다시 실행)
+        db: DB에 쓰는 단계 (--offline이면 제외)
+        advisory: 실패해도 후속 단계를 막지 않음 (경고만)
+    """
+
+    __slots__ = ('name', 'command', 'deps', 'inputs', 'outputs', 'always', 'daily', 'db', 'advisory')
+
+    def __init__(self, name, command, deps=(), inputs=(), outputs=(), always=False, daily=False, db=False,
+                 advisory=False):
+        self.name = name
+        self.command = list(command)
+        self.deps = list(deps)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.always = always
+        self.daily = daily
+        self.db = db
+        self.advisory = advisory
+
+
+STAGES = [
+    Stage('crawl-lotto', ['auto_update.py'], outputs=['lotto_all_rounds.csv'], always=True),
+    Stage('crawl-pension', ['pension_auto_update.py'], outputs=['pension_all_rounds.csv'], always=True),
+    Stage('recombine', ['recombine_data.py'], deps=['crawl-lotto', 'crawl-pension'],
+          inputs=['lotto_all_rounds.csv', 'pension_all_rounds.csv'], outputs=['all_lottery_stores.csv']),
+    # 정규화는 all_lottery_stores.csv를 제자리에서 고치므로 입력 해시는 실행 후 값으로 기록
+    Stage('normalize', ['normalize_lottery_data.py'], deps=['recombine'],
+          inputs=['all_lottery_stores.csv'], outputs=['all_lottery_stores.csv']),
+    Stage('validate', ['csv_validator.py', 'all_lottery_stores.csv'], deps=['normalize'],
+          inputs=['all_lottery_stores.csv'], advisory=True),
+
+    # DB 적재 및 보정
+    # draw_date/won_at은 적재 시 draw_calendar로 기록 (별도 날짜 보정 단계 없음, verify에서 확인)
+    Stage('load', ['load_data_to_supabase.py', '--incremental'], deps=['validate'],
+          inputs=['all_lottery_stores.csv', 'draw_date_overrides.json'], db=True),
+    Stage('store-stats', ['populate_store_stats.py', '--mode', 'incremental'], deps=['load'], db=True),
+    Stage('store-name-history', ['store_name_history.py'], deps=['load'],
+          inputs=['all_lottery_stores.csv'], db=True),
+    Stage('ranking-cubes', ['ranking_cubes.py'], deps=['load'], db=True),
+    # 최근 1년 기준일(store_stats_meta.recent_cutoff)을 오늘로 옮김 - 새 회차가 없는 주에도 필요
+    Stage('rollover', ['populate_store_stats.py', '--mode', 'rollover'], deps=['store-stats'], daily=True, db=True),
+    Stage('verify', ['verify_data.py', '--strict'], deps=['rollover', 'store-name-history', 'ranking-cubes'],
+          db=True),
+
+    # 오프라인 지도 산출물 (정규화된 CSV 기준, DB 단계와 병렬)
+    Stage('store-catalog', ['store_catalog.py'], deps=['normalize'],
+          inputs=['all_lottery_stores.csv'], outputs=['store_catalog.lmcat']),
+    Stage('spatial-index', ['spatial_index.py', '--source', 'csv'], deps=['normalize'],
+          inputs=['all_lottery_stores.csv'], outputs=['store_grid_index.npz']),
+    Stage('map-clusters', ['marker_clusters.py', '--source', 'csv'], deps=['normalize'],
+          inputs=['all_lottery_stores.csv'], outputs=['map_clusters/index.json']),
+    Stage('map-export', ['tile_exporter.py', '--source', 'csv'], deps=['normalize'],
+          inputs=['all_lottery_stores.csv'], outputs=['map_export/manifest.json']),
+]
+
+
+def file_digest(path: Path) -> str:
+    """파일 내용 SHA-256 (없으면 'missing')."""
+    if not path.exists():
+        return 'missing'
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def module_closure(script: str) -> tuple:
+    """
+    스크립트와 스크립트가 (함수 안의 지연 import 포함) 가져오는 lotto-crawling 로컬 모듈 파일 목록.
+
+    import 이름과 같은 <이름>.py가 BASE_DIR에 있으면 로컬 모듈로 보고 재귀적으로 따라갑니다.
+    """
+    found, pending = set(), [script]
+    while pending:
+        name = pending.pop()
+        if name in found:
+            continue
+        found.add(name)
+        try:
+            tree = ast.parse((BASE_DIR / name).read_text(encoding='utf-8'))
+        except (OSError, SyntaxError):
+            continue
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                modules = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                modules = [node.module]
+            else:
+                continue
+            for module in modules:
+                path = f"{module.split('.')[0]}.py"
+                if (BASE_DIR / path).exists():
+                    pending.append(path)
+    return tuple(sorted(found))
+
+
+def fetch_db_state() -> str:
+    """DB 단계 키에 넣을 대상 DB 상태 (load_data_to_supabase.fetch_db_fingerprint, 조회 실패 시 'unavailable')."""
+    try:
+        from load_data_to_supabase import fetch_db_fingerprint
+        return json.dumps(fetch_db_fingerprint('rest'), sort_keys=True)
+    except SystemExit:
+        pass  # 설정/패키지 누락은 create_supabase_client가 이미 출력
+    except Exception as e:
+        print(f"  ⚠️  {e}")
+    print("  ⚠️  DB 상태 조회 실패 - DB 단계는 건너뛰지 않음")
+    return 'unavailable'
+
+
+def stage_key(stage: Stage, dep_digests: dict, db_state: str = None) -> str:
+    """명령어, 스크립트와 로컬 모듈 소스, 입력 파일, 선행 단계 결과(DB 단계는 DB 상태)로 단계 키를 계산합니다."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(stage.command).encode('utf-8'))
+    for path in module_closure(stage.command[0]):
+        digest.update(f'{path}={file_digest(BASE_DIR / path)}'.encode('utf-8'))
+    if stage.db:
+        digest.update(f'db={db_state}'.encode('utf-8'))
+    for name in stage.inputs:
+        digest.update(f'{name}={file_digest(BASE_DIR / name)}'.encode('utf-8'))
+    for dep in stage.deps:
+        digest.update(f'{dep}={dep_digests.get(dep, "")}'.encode('utf-8'))
+    if stage.daily:
+        digest.update(f'date={date.today().isoformat()}'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def output_digests(stage: Stage) -> dict:
+    return {name: file_digest(BASE_DIR / name) for name in stage.outputs}
+
+
+def read_state() -> dict:
+    if not STATE_FILE.exists():
+        return {}
+    with open(STATE_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_state(state: dict):
+    with open(STATE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+
+
+def select_stages(stages: list, targets=None, offline: bool = False) -> dict:
+    """실행 대상 단계 (targets와 그 선행 단계, --offline이면 DB 단계 제외)."""
+    by_name = {stage.name: stage for stage in stages}
+    unknown = [name for name in targets or [] if name not in by_name]
+    if unknown:
+        raise ValueError(f"알 수 없는 단계: {', '.join(unknown)}")
+
+    if targets:
+        selected, pending = set(), list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in selected:
+                selected.add(name)
+                pending.extend(by_name[name].deps)
+    else:
+        selected = set(by_name)
+    if offline:
+        selected = {name for name in selected if not by_name[name].db}
+    return {stage.name: stage for stage in stages if stage.name in selected}
+
+
+def topological_order(stages: dict) -> list:
+    order, done = [], set()
+
+    def visit(name, path=()):
+        if name in done or name not in stages:
+            return
+        if name in path:
+            raise ValueError(f"순환 의존성: {' → '.join(path + (name,))}")
+        for dep in stages[name].deps:
+            visit(dep, path + (name,))
+        done.add(name)
+        order.append(name)
+
+    for name in stages:
+        visit(name)
+    return order
+
+
+def critical_path(stages: dict, durations: dict) -> tuple:
+    """실측 소요 시간 기준 가장 긴 의존성 경로 (건너뛴 단계는 0초)."""
+    finish, previous = {}, {}
+    for name in topological_order(stages):
+        deps = [dep for dep in stages[name].deps if dep in stages]
+        best = max(deps, key=lambda dep: finish[dep], default=None)
+        finish[name] = (finish[best] if best else 0.0) + durations.get(name, 0.0)
+        previous[name] = best
+    if not finish:
+        return [], 0.0
+    name = max(finish, key=finish.get)
+    total, path = finish[name], []
+    while name:
+        path.append(name)
+        name = previous[name]
+    return path[::-1], total
+
+
+def run_command(stage: Stage, log_path: Path) -> tuple:
+    """단계를 별도 프로세스로 실행하고 (종료 코드, 소요 초)를 돌려줍니다."""
+    started = time.perf_counter()
+    with open(log_path, 'w', encoding='utf-8') as log:
+        result = subprocess.run([sys.executable, *stage.command], cwd=BASE_DIR,
+                                stdout=log, stderr=subprocess.STDOUT)
+    return result.returncode, time.perf_counter() - started
+
+
+def print_log_tail(log_path: Path, lines: int = LOG_TAIL_LINES):
+    with open(log_path, 'r', encoding='utf-8', errors='replace') as f:
+        tail = f.readlines()[-lines:]
+    for line in tail:
+        print(f"      │ {line.rstrip()}")
+
+
+class PipelineRun:
+    """DAG 스케줄러: 선행 단계가 끝난 단계를 최대 max_parallel개까지 동시에 실행합니다."""
+
+    def __init__(self, stages: dict, state: dict, force: bool = False, skip_crawl: bool = False,
+                 dry_run: bool = False, max_parallel: int = DEFAULT_MAX_PARALLEL, db_state: str = None):
+        self.stages = stages
+        self.state = state
+        self.force = force
+        self.skip_crawl = skip_crawl
+        self.dry_run = dry_run
+        self.max_parallel = max_parallel
+        self.results = {}      # 이름 -> 'ran' / 'skipped' / 'failed' / 'warned' / 'blocked'
+        self.durations = {}
+        self.digests = {}      # 이름 -> 후속 단계 키에 넣을 값
+        self.db_state = db_state
+        self.log_dir = LOG_DIR / datetime.now().strftime('%Y%m%d-%H%M%S')
+
+    def _dep_digest(self, stage: Stage, key: str) -> str:
+        """산출물이 있으면 산출물 해시, 없으면(DB 단계) 단계 키를 후속 단계에 넘깁니다."""
+        if stage.outputs:
+            return hashlib.sha256(json.dumps(output_digests(stage), sort_keys=True).encode()).hexdigest()
+        return key
+
+    def _should_skip(self, stage: Stage, key: str) -> bool:
+        if self.force:
+            return False
+        if stage.always:
+            return self.skip_crawl
+        record = self.state.get(stage.name)
+        return bool(record) and record['key'] == key and record.get('outputs') == output_digests(stage)
+
+    def _blocked(self, stage: Stage) -> bool:
+        return any(self.results.get(dep) in ('failed', 'blocked') for dep in stage.deps if dep in self.stages)
+
+    def _refresh_shared_outputs(self, stage: Stage):
+        """같은 산출물을 가진 앞 단계의 기록된 산출물 해시와 후속 단계용 값을 방금 쓴 내용으로 바꿉니다."""
+        current = output_digests(stage)
+        for name, other in self.stages.items():
+            shared = set(other.outputs) & set(current)
+            if name == stage.name or not shared or name not in self.digests:
+                continue
+            self.digests[name] = self._dep_digest(other, self.digests[name])
+            record = self.state.get(name)
+            if record:
+                record['outputs'] = {**record.get('outputs', {}), **{n: current[n] for n in shared}}
+
+    def _ready(self, name: str) -> bool:
+        return all(dep in self.results for dep in self.stages[name].deps if dep in self.stages)
+
+    def run(self):
+        pending = topological_order(self.stages)
+        running = {}
+        if not self.dry_run:
+            self.log_dir.mkdir(parents=True, exist_ok=True)
+
+        with ThreadPoolExecutor(max_workers=self.max_parallel) as executor:
+            while pending or running:
+                for name in [n for n in pending if self._ready(n)]:
+                    pending.remove(name)
+                    stage = self.stages[name]
+                    if self._blocked(stage):
+                        self.results[name] = 'blocked'
+                        print(f"  ⛔ {name}: 선행 단계 실패로 건너뜀")
+                        continue
+                    key = stage_key(stage, self.digests, self.db_state)
+                    if self._should_skip(stage, key):
+                        self.results[name] = 'skipped'
+                        self.digests[name] = self._dep_digest(stage, key)
+                        print(f"  ⏭️  {name}: 변경 없음")
+                        continue
+                    if self.dry_run:
+                        self.results[name] = 'ran'
+                        self.digests[name] = f'dry-run:{name}'
+                        print(f"  ▶️  {name}: 실행 예정 ({' '.join(stage.command)})")
+                        continue
+                    print(f"  ▶️  {name}: 시작")
+                    running[executor.submit(run_command, stage, self.log_dir / f'{name}.log')] = (name, key)
+
+                if not running:
+                    continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name, key = running.pop(future)
+                    self._finish(self.stages[name], key, *future.result())
+        return self.results
+
+    def _finish(self, stage: Stage, key: str, returncode: int, elapsed: float):
+        self.durations[stage.name] = elapsed
+        log_path = self.log_dir / f'{stage.name}.log'
+        missing = [name for name in stage.outputs if not (BASE_DIR / name).exists()]
+        if returncode == 0 and missing:
+            # 오류를 출력만 하고 0으로 끝나는 스크립트(recombine_data.py 등) 대비
+            print(f"  ❌ {stage.name}: 산출물 없음 ({', '.join(missing)})")
+            returncode = -1
+        if returncode != 0:
+            self.results[stage.name] = 'warned' if stage.advisory else 'failed'
+            icon = '⚠️ ' if stage.advisory else '❌'
+            print(f"  {icon} {stage.name}: 종료 코드 {returncode} ({elapsed:.1f}초, 로그: {log_path})")
+            print_log_tail(log_path)
+            if not stage.advisory:
+                return
+        else:
+            self.results[stage.name] = 'ran'
+            print(f"  ✅ {stage.name}: 완료 ({elapsed:.1f}초)")
+
+        if self.results[stage.name] == 'ran':
+            self._refresh_shared_outputs(stage)
+            if stage.db:
+                self.db_state = fetch_db_state()
+
+        # 제자리 수정 단계를 위해 입력 해시(와 DB 상태)는 실행 후 값으로 다시 계산해 기록
+        key = stage_key(stage, self.digests, self.db_state)
+        self.digests[stage.name] = self._dep_digest(stage, key)
+        if self.results[stage.name] == 'ran':
+            self.state[stage.name] = {
+                'key': key,
+                'outputs': output_digests(stage),
+                'finished_at': datetime.now().isoformat(timespec='seconds'),
+                'duration_s': round(elapsed, 1),
+            }
+            write_state(self.state)
+
+
+@instrumented('pipeline')
+def main():
+    parser = argparse.ArgumentParser(description='주간 갱신 파이프라인 실행')
+    parser.add_argument('--targets', nargs='+', default=None, help='실행할 단계 (선행 단계 포함, 기본값: 전체)')
+    parser.add_argument('--offline', action='store_true', help='DB 단계 제외 (CSV/지도 산출물만)')
+    parser.add_argument('--no-crawl', action='store_true', help='크롤링 단계 건너뛰고 기존 CSV 사용')
+    parser.add_argument('--force', action='store_true', help='변경 여부와 관계없이 모든 단계 실행')
+    parser.add_argument('--dry-run', action='store_true', help='실행 계획만 출력')
+    parser.add_argument('--max-parallel', type=int, default=DEFAULT_MAX_PARALLEL,
+                        help=f'동시에 실행할 최대 단계 수 (기본값: {DEFAULT_MAX_PARALLEL})')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("주간 갱신 파이프라인")
+    print("=" * 60)
+
+    try:
+        stages = select_stages(STAGES, args.targets, args.offline)
+        topological_order(stages)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    print(f"\n단계 {len(stages)}개 (최대 {args.max_parallel}개 병렬){' - 계획만 출력' if args.dry_run else ''}")
+    db_state = fetch_db_state() if any(stage.db for stage in stages.values()) else None
+    pipeline = PipelineRun(stages, read_state(), force=args.force, skip_crawl=args.no_crawl,
+                           dry_run=args.dry_run, max_parallel=args.max_parallel, db_state=db_state)
+    started = time.perf_counter()
+    with job_stage('pipeline') as stage:
+        results = pipeline.run()
+        stage.records = sum(1 for status in results.values() if status == 'ran')
+    elapsed = time.perf_counter() - started
+
+    if args.dry_run:
+        return
+
+    counts = {status: sum(1 for s in results.values() if s == status)
+              for status in ('ran', 'skipped', 'warned', 'failed', 'blocked')}
+    path, path_seconds = critical_path(stages, pipeline.durations)
+    print("\n" + "=" * 60)
+    print(f"⏱️  총 소요 시간: {elapsed:.1f}초 (단계 합계 {sum(pipeline.durations.values()):.1f}초)")
+    ran_path = [name for name in path if name in pipeline.durations]
+    print(f"   임계 경로: {' → '.join(ran_path) or '-'} ({path_seconds:.1f}초)")
+    print(f"   실행 {counts['ran']} | 건너뜀 {counts['skipped']} | 경고 {counts['warned']} | "
+          f"실패 {counts['failed']} | 중단 {counts['blocked']}")
+    print("=" * 60)
+
+    if counts['failed'] or counts['blocked']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
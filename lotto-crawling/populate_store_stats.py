@@ -2,15 +2,154 @@
 """
 store_stats 테이블에 집계 데이터를 생성하는 스크립트
 winning_records에서 판매점별 당첨 통계를 집계합니다.
+
+- rebuild: 섀도 테이블(store_stats_shadow)에 전체 집계를 만든 뒤 한 트랜잭션에서 이름을 바꿔 교체합니다.
+           교체 전까지 기존 store_stats가 그대로 조회되므로 빈 테이블이 노출되지 않습니다.
+- incremental: 지난 실행 이후 바뀐 당첨 기록(winning_records.updated_at 인덱스 범위 조회)만 읽어,
+               store_stats_applied_records에 기록해 둔 반영 값(store_id/복권 종류/등수/won_at)과 다르거나
+               없는 기록의 예전 값을 빼고 새 값을 더합니다 (ON CONFLICT (store_id) DO UPDATE).
+               같은 기록은 두 번 반영되지 않고, 나중에 추가된 기록과 won_at/등수/판매점 보정도 반영됩니다.
+               winning_records에서 삭제된 기록은 반영되지 않으므로 삭제 후에는 rebuild가 필요합니다.
+- rollover: 최근 기간 기준일을 오늘 기준으로 옮기고, 지난 실행 이후 기간 밖으로 나간 반영 기록만
+            (store_stats_applied_records.won_at 인덱스 범위 조회) 찾아 해당 판매점의 recent_* 카운터를 줄입니다.
+
+사용법:
+    python populate_store_stats.py                      # 전체 재집계 (섀도 테이블 교체)
+    python populate_store_stats.py --mode incremental   # 새 당첨 기록만 증분 반영
+    python populate_store_stats.py --mode rollover      # 최근 1년 기준일 이동 (매일 실행)
 """
+import argparse
 import os
 import sys
 from pathlib import Path
 from datetime import date, timedelta
 
+from job_runs import instrumented, job_stage
+
 # 최근 기간 정의 (1년)
 RECENT_PERIOD_DAYS = 365
 
+SHADOW_TABLE = 'store_stats_shadow'
+RETIRED_TABLE = 'store_stats_retired'
+
+# updated_at 워터마크보다 이만큼 앞에서부터 다시 읽음 (늦게 커밋된 트랜잭션의 now()가 워터마크보다 이를 수 있음).
+# 반영 값과 같은 기록은 건너뛰므로 겹쳐 읽어도 두 번 더하지 않습니다.
+CHANGE_SCAN_MARGIN = timedelta(minutes=10)
+
+STATS_STATE_DDL = """
+    CREATE TABLE IF NOT EXISTS store_stats_applied_records (
+        source_row_hash VARCHAR(64) PRIMARY KEY,
+        store_id BIGINT NOT NULL,
+        lottery_type VARCHAR(10) NOT NULL,
+        rank SMALLINT NOT NULL,
+        won_at DATE NULL,
+        applied_at TIMESTAMPTZ DEFAULT now()
+    );
+    CREATE INDEX IF NOT EXISTS idx_store_stats_applied_records_won_at
+        ON store_stats_applied_records(won_at);
+    CREATE TABLE IF NOT EXISTS store_stats_meta (
+        id SMALLINT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+        recent_cutoff DATE NOT NULL,
+        applied_through TIMESTAMPTZ NULL,
+        rebuilt_at TIMESTAMPTZ NULL,
+        updated_at TIMESTAMPTZ DEFAULT now()
+    );
+"""
+
+# 반영 기록에 남기는 값 (집계에 쓰는 컬럼)
+APPLIED_COLUMNS = 'source_row_hash, store_id, lottery_type, rank, won_at'
+
+STATS_COLUMNS = """
+    store_id,
+    total_lotto_first_prize,
+    total_lotto_second_prize,
+    total_pension_first_prize,
+    recent_lotto_first_prize,
+    recent_lotto_second_prize,
+    recent_pension_first_prize,
+    last_won_at,
+    last_updated_at
+"""
+
+# {source}에는 집계 대상(wr: store_id, lottery_type, rank, won_at, 선택적으로 sign)을 지정하는 FROM 절이,
+# {weight}에는 행마다 더할 값(전체 집계는 1, 증분은 +1/-1)이 들어갑니다.
+AGGREGATE_SELECT = """
+    SELECT
+        wr.store_id,
+        -- 전체 통계
+        COALESCE(SUM({weight}) FILTER (WHERE wr.lottery_type = 'LOTTO' AND wr.rank = 1), 0),
+        COALESCE(SUM({weight}) FILTER (WHERE wr.lottery_type = 'LOTTO' AND wr.rank = 2), 0),
+        COALESCE(SUM({weight}) FILTER (WHERE wr.lottery_type = 'PENSION' AND wr.rank = 1), 0),
+        -- 최근 통계
+        COALESCE(SUM({weight}) FILTER (WHERE wr.lottery_type = 'LOTTO' AND wr.rank = 1 AND wr.won_at >= %(cutoff)s), 0),
+        COALESCE(SUM({weight}) FILTER (WHERE wr.lottery_type = 'LOTTO' AND wr.rank = 2 AND wr.won_at >= %(cutoff)s), 0),
+        COALESCE(SUM({weight}) FILTER (WHERE wr.lottery_type = 'PENSION' AND wr.rank = 1 AND wr.won_at >= %(cutoff)s), 0),
+        -- 마지막 당첨일 (빼는 값은 제외, 예전 값이 빠진 판매점은 반영 후 다시 계산)
+        MAX(wr.won_at) FILTER (WHERE {weight} > 0),
+        now()
+    FROM {source}
+    GROUP BY wr.store_id
+"""
+
+# 워터마크 이후 바뀐 당첨 기록 중 반영 값과 다른(또는 아직 반영하지 않은) 기록과 예전 반영 값
+CHANGED_RECORDS_SQL = """
+    CREATE TEMP TABLE changed_stats_records ON COMMIT DROP AS
+    SELECT
+        wr.source_row_hash, wr.store_id, wr.lottery_type, wr.rank, wr.won_at,
+        a.source_row_hash IS NOT NULL AS was_applied,
+        a.store_id AS old_store_id, a.lottery_type AS old_lottery_type, a.rank AS old_rank, a.won_at AS old_won_at
+    FROM winning_records wr
+    LEFT JOIN store_stats_applied_records a ON a.source_row_hash = wr.source_row_hash
+    WHERE wr.updated_at >= %(since)s::timestamptz
+      AND (a.source_row_hash IS NULL
+           OR (a.store_id, a.lottery_type, a.rank, a.won_at)
+              IS DISTINCT FROM (wr.store_id, wr.lottery_type, wr.rank, wr.won_at));
+"""
+
+# 새 값은 +1, 예전 반영 값은 -1
+STATS_DELTAS_SOURCE = """(
+        SELECT store_id, lottery_type, rank, won_at, 1 AS sign FROM changed_stats_records
+        UNION ALL
+        SELECT old_store_id, old_lottery_type, old_rank, old_won_at, -1 FROM changed_stats_records WHERE was_applied
+    ) wr"""
+
+INCREMENTAL_UPSERT_SQL = f"""
+    INSERT INTO store_stats ({STATS_COLUMNS})
+    {AGGREGATE_SELECT.format(source=STATS_DELTAS_SOURCE, weight='wr.sign')}
+    ON CONFLICT (store_id) DO UPDATE SET
+        total_lotto_first_prize = store_stats.total_lotto_first_prize + EXCLUDED.total_lotto_first_prize,
+        total_lotto_second_prize = store_stats.total_lotto_second_prize + EXCLUDED.total_lotto_second_prize,
+        total_pension_first_prize = store_stats.total_pension_first_prize + EXCLUDED.total_pension_first_prize,
+        recent_lotto_first_prize = store_stats.recent_lotto_first_prize + EXCLUDED.recent_lotto_first_prize,
+        recent_lotto_second_prize = store_stats.recent_lotto_second_prize + EXCLUDED.recent_lotto_second_prize,
+        recent_pension_first_prize = store_stats.recent_pension_first_prize + EXCLUDED.recent_pension_first_prize,
+        last_won_at = GREATEST(store_stats.last_won_at, EXCLUDED.last_won_at),
+        last_updated_at = EXCLUDED.last_updated_at;
+"""
+
+# 예전 반영 값이 빠진 판매점: 기록이 남지 않았으면 삭제 (rebuild와 같게), 남았으면 last_won_at 다시 계산
+PRUNE_STATS_SQL = """
+    DELETE FROM store_stats ss
+    WHERE ss.store_id IN (SELECT old_store_id FROM changed_stats_records WHERE was_applied)
+      AND NOT EXISTS (SELECT 1 FROM winning_records wr WHERE wr.store_id = ss.store_id);
+"""
+REFRESH_LAST_WON_SQL = """
+    UPDATE store_stats ss
+    SET last_won_at = (SELECT MAX(wr.won_at) FROM winning_records wr WHERE wr.store_id = ss.store_id)
+    WHERE ss.store_id IN (SELECT old_store_id FROM changed_stats_records WHERE was_applied);
+"""
+
+MARK_APPLIED_SQL = f"""
+    INSERT INTO store_stats_applied_records ({APPLIED_COLUMNS})
+    SELECT {APPLIED_COLUMNS} FROM changed_stats_records
+    ON CONFLICT (source_row_hash) DO UPDATE SET
+        store_id = EXCLUDED.store_id,
+        lottery_type = EXCLUDED.lottery_type,
+        rank = EXCLUDED.rank,
+        won_at = EXCLUDED.won_at,
+        applied_at = now();
+"""
+
 
 def get_database_url():
     """환경변수 또는 .env.local에서 DATABASE_URL을 읽어옵니다."""
@@ -36,7 +175,207 @@ def get_database_url():
     return None
 
 
+def rebuild_store_stats(cursor, recent_cutoff: date) -> int:
+    """
+    섀도 테이블에 전체 집계를 만든 뒤 store_stats와 교체합니다.
+
+    호출한 쪽의 트랜잭션 안에서 실행해야 합니다. store_stats에는 마지막 이름 교체 순간에만
+    ACCESS EXCLUSIVE 잠금이 걸리고, 그 전까지 조회는 기존 테이블을 그대로 읽습니다.
+
+    Returns:
+        새 store_stats 레코드 수
+    """
+    cursor.execute(STATS_STATE_DDL)
+    cursor.execute("SELECT MAX(updated_at) FROM winning_records;")
+    applied_through = cursor.fetchone()[0]
+
+    # 반영 기록을 먼저 한 문장으로 복사하고 그 값으로 집계 (집계와 반영 기록이 같은 스냅샷)
+    cursor.execute("TRUNCATE store_stats_applied_records;")
+    cursor.execute(f"""
+        INSERT INTO store_stats_applied_records ({APPLIED_COLUMNS})
+        SELECT {APPLIED_COLUMNS} FROM winning_records;
+    """)
+
+    cursor.execute(f"DROP TABLE IF EXISTS {SHADOW_TABLE};")
+    cursor.execute(f"CREATE TABLE {SHADOW_TABLE} (LIKE store_stats INCLUDING ALL);")
+    cursor.execute(
+        f"INSERT INTO {SHADOW_TABLE} ({STATS_COLUMNS}) "
+        + AGGREGATE_SELECT.format(source="store_stats_applied_records wr", weight='1'),
+        {'cutoff': recent_cutoff},
+    )
+    row_count = cursor.rowcount
+    cursor.execute(f"""
+        ALTER TABLE {SHADOW_TABLE}
+            ADD CONSTRAINT {SHADOW_TABLE}_store_id_fkey FOREIGN KEY (store_id) REFERENCES stores(id);
+    """)
+
+    cursor.execute("""
+        INSERT INTO store_stats_meta (id, recent_cutoff, applied_through, rebuilt_at, updated_at)
+        VALUES (1, %s, %s, now(), now())
+        ON CONFLICT (id) DO UPDATE SET
+            recent_cutoff = EXCLUDED.recent_cutoff,
+            applied_through = EXCLUDED.applied_through,
+            rebuilt_at = EXCLUDED.rebuilt_at,
+            updated_at = EXCLUDED.updated_at;
+    """, (recent_cutoff, applied_through))
+
+    # 교체: 이름 변경은 카탈로그만 바꾸므로 잠금 구간이 짧음
+    cursor.execute("LOCK TABLE store_stats IN ACCESS EXCLUSIVE MODE;")
+    cursor.execute(f"ALTER TABLE store_stats RENAME TO {RETIRED_TABLE};")
+    cursor.execute(f"ALTER TABLE {SHADOW_TABLE} RENAME TO store_stats;")
+    cursor.execute(f"DROP TABLE {RETIRED_TABLE};")
+    cursor.execute(f"ALTER INDEX {SHADOW_TABLE}_pkey RENAME TO store_stats_pkey;")
+    cursor.execute(f"ALTER TABLE store_stats RENAME CONSTRAINT {SHADOW_TABLE}_store_id_fkey "
+                   f"TO store_stats_store_id_fkey;")
+    return row_count
+
+
+def apply_incremental_stats(cursor) -> dict:
+    """
+    지난 실행 이후 추가/변경된 당첨 기록만 store_stats에 반영합니다.
+
+    winning_records.updated_at이 워터마크(store_stats_meta.applied_through) - CHANGE_SCAN_MARGIN 이후인
+    기록만 읽고, 반영 기록과 값이 같은 기록은 건너뜁니다. 값이 바뀐 기록은 예전 값을 빼고 새 값을 더합니다.
+    recent_* 카운터는 store_stats_meta.recent_cutoff 기준으로 계산하므로 현재 집계와 기준이 같습니다.
+    호출한 쪽의 트랜잭션 안에서 실행해야 합니다 (메타 행 잠금으로 동시 실행을 직렬화).
+
+    Returns:
+        반영한 당첨 기록 수(그중 보정 수)와 갱신된 판매점 수 딕셔너리
+    """
+    cursor.execute(STATS_STATE_DDL)
+    cursor.execute("SELECT recent_cutoff, applied_through FROM store_stats_meta WHERE id = 1 FOR UPDATE;")
+    row = cursor.fetchone()
+    if row is None:
+        raise RuntimeError("store_stats_meta가 비어 있습니다. 먼저 --mode rebuild로 전체 집계를 생성하세요.")
+    recent_cutoff, applied_through = row
+
+    cursor.execute("SELECT MAX(updated_at) FROM winning_records;")
+    new_through = cursor.fetchone()[0]
+    since = applied_through - CHANGE_SCAN_MARGIN if applied_through else '-infinity'
+    cursor.execute(CHANGED_RECORDS_SQL, {'since': since})
+    cursor.execute("SELECT COUNT(*), COUNT(*) FILTER (WHERE was_applied) FROM changed_stats_records;")
+    record_count, corrected_count = cursor.fetchone()
+    result = {'records': record_count, 'corrected': corrected_count, 'stores': 0, 'recent_cutoff': recent_cutoff}
+
+    if record_count:
+        cursor.execute(INCREMENTAL_UPSERT_SQL, {'cutoff': recent_cutoff})
+        result['stores'] = cursor.rowcount
+        if corrected_count:
+            cursor.execute(PRUNE_STATS_SQL)
+            cursor.execute(REFRESH_LAST_WON_SQL)
+        cursor.execute(MARK_APPLIED_SQL)
+    cursor.execute("UPDATE store_stats_meta SET applied_through = COALESCE(%s, applied_through), "
+                   "updated_at = now() WHERE id = 1;", (new_through,))
+    return result
+
+
+# [lower, upper) 구간에 won_at이 있는 반영 기록만 (반영한 값 기준으로) 집계해 recent_* 카운터에 sign만큼 더합니다.
+ROLLOVER_SQL = """
+    UPDATE store_stats ss SET
+        recent_lotto_first_prize = ss.recent_lotto_first_prize + %(sign)s * crossed.lotto_1st,
+        recent_lotto_second_prize = ss.recent_lotto_second_prize + %(sign)s * crossed.lotto_2nd,
+        recent_pension_first_prize = ss.recent_pension_first_prize + %(sign)s * crossed.pension_1st,
+        last_updated_at = now()
+    FROM (
+        SELECT
+            a.store_id,
+            COUNT(*) FILTER (WHERE a.lottery_type = 'LOTTO' AND a.rank = 1) AS lotto_1st,
+            COUNT(*) FILTER (WHERE a.lottery_type = 'LOTTO' AND a.rank = 2) AS lotto_2nd,
+            COUNT(*) FILTER (WHERE a.lottery_type = 'PENSION' AND a.rank = 1) AS pension_1st
+        FROM store_stats_applied_records a
+        WHERE a.won_at >= %(lower)s AND a.won_at < %(upper)s
+        GROUP BY a.store_id
+    ) crossed
+    WHERE ss.store_id = crossed.store_id;
+"""
+
+
+def rollover_recent_window(cursor, new_cutoff: date) -> dict:
+    """
+    recent_* 카운터의 기준일을 new_cutoff로 옮깁니다.
+
+    지난 기준일과 새 기준일 사이에 won_at이 있는 기록만 조회하므로, 매일 실행하면 하루치 경계만 읽습니다.
+    아직 incremental로 반영하지 않은 기록은 건드리지 않습니다 (반영 시점에 새 기준일로 계산됨).
+    기준일이 과거로 이동한 경우(기간 변경 등)에는 다시 기간 안으로 들어온 기록을 더합니다.
+
+    Returns:
+        이전/새 기준일과 갱신된 판매점 수 딕셔너리
+    """
+    cursor.execute(STATS_STATE_DDL)
+    cursor.execute("SELECT recent_cutoff FROM store_stats_meta WHERE id = 1 FOR UPDATE;")
+    row = cursor.fetchone()
+    if row is None:
+        raise RuntimeError("store_stats_meta가 비어 있습니다. 먼저 --mode rebuild로 전체 집계를 생성하세요.")
+    old_cutoff = row[0]
+
+    result = {'old_cutoff': old_cutoff, 'new_cutoff': new_cutoff, 'stores': 0}
+    if new_cutoff == old_cutoff:
+        return result
+
+    if new_cutoff > old_cutoff:
+        params = {'sign': -1, 'lower': old_cutoff, 'upper': new_cutoff}
+    else:
+        params = {'sign': 1, 'lower': new_cutoff, 'upper': old_cutoff}
+    cursor.execute(ROLLOVER_SQL, params)
+    result['stores'] = cursor.rowcount
+
+    cursor.execute(
+        "UPDATE store_stats_meta SET recent_cutoff = %s, updated_at = now() WHERE id = 1;",
+        (new_cutoff,),
+    )
+    return result
+
+
+def print_verification(cursor):
+    """store_stats 합계와 상위 판매점을 출력합니다."""
+    print("\n" + "-" * 40)
+    print("검증:")
+
+    cursor.execute("SELECT COUNT(*) FROM store_stats;")
+    total_count = cursor.fetchone()[0]
+    print(f"  - store_stats 총 레코드: {total_count}개")
+
+    cursor.execute("""
+        SELECT
+            SUM(total_lotto_first_prize) AS lotto_1st,
+            SUM(total_lotto_second_prize) AS lotto_2nd,
+            SUM(total_pension_first_prize) AS pension_1st,
+            SUM(recent_lotto_first_prize) AS recent_lotto_1st,
+            SUM(recent_lotto_second_prize) AS recent_lotto_2nd,
+            SUM(recent_pension_first_prize) AS recent_pension_1st
+        FROM store_stats;
+    """)
+    row = cursor.fetchone()
+    print(f"\n  전체 통계:")
+    print(f"    - 로또 1등: {row[0]}건")
+    print(f"    - 로또 2등: {row[1]}건")
+    print(f"    - 연금복권 1등: {row[2]}건")
+    print(f"\n  최근 {RECENT_PERIOD_DAYS}일 통계:")
+    print(f"    - 로또 1등: {row[3]}건")
+    print(f"    - 로또 2등: {row[4]}건")
+    print(f"    - 연금복권 1등: {row[5]}건")
+
+    # Top 5 판매점
+    print("\n  로또 1등 Top 5 판매점:")
+    cursor.execute("""
+        SELECT ss.store_id, s.name, ss.total_lotto_first_prize, ss.total_lotto_second_prize
+        FROM store_stats ss
+        JOIN stores s ON ss.store_id = s.id
+        ORDER BY ss.total_lotto_first_prize DESC, ss.total_lotto_second_prize DESC
+        LIMIT 5;
+    """)
+    for i, row in enumerate(cursor.fetchall(), 1):
+        print(f"    {i}. {row[1]} (1등: {row[2]}회, 2등: {row[3]}회)")
+
+
+@instrumented('store-stats')
 def main():
+    parser = argparse.ArgumentParser(description='store_stats 집계')
+    parser.add_argument('--mode', choices=['rebuild', 'incremental', 'rollover'], default='rebuild',
+                        help='rebuild: 섀도 테이블 전체 재집계 후 교체, incremental: 새 당첨 기록만 반영, '
+                             'rollover: 최근 기간 기준일 이동 (기본값: rebuild)')
+    args = parser.parse_args()
+
     print("=" * 60)
     print("store_stats 테이블 집계 데이터 생성")
     print("=" * 60)
@@ -48,103 +387,53 @@ def main():
 
     try:
         import psycopg2
-        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
     except ImportError:
         print("❌ psycopg2가 설치되지 않았습니다.")
         sys.exit(1)
 
     print(f"\n🔗 데이터베이스 연결 중...")
     conn = psycopg2.connect(database_url)
-    conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
     cursor = conn.cursor()
 
     try:
         # 최근 기준일 계산
         recent_cutoff = date.today() - timedelta(days=RECENT_PERIOD_DAYS)
-        print(f"  - 최근 기준일: {recent_cutoff} (최근 {RECENT_PERIOD_DAYS}일)")
-
-        # Step 1: 기존 데이터 삭제
-        print("\n" + "-" * 40)
-        print("Step 1: 기존 store_stats 데이터 삭제")
-        cursor.execute("DELETE FROM store_stats;")
-        print("  ✅ 삭제 완료")
-
-        # Step 2: 집계 데이터 생성 및 삽입
-        print("\n" + "-" * 40)
-        print("Step 2: 집계 데이터 생성 및 삽입")
-
-        # 집계 쿼리
-        aggregate_sql = """
-            INSERT INTO store_stats (
-                store_id,
-                total_lotto_first_prize,
-                total_lotto_second_prize,
-                total_pension_first_prize,
-                recent_lotto_first_prize,
-                recent_lotto_second_prize,
-                recent_pension_first_prize,
-                last_won_at,
-                last_updated_at
-            )
-            SELECT
-                store_id,
-                -- 전체 통계
-                COUNT(*) FILTER (WHERE lottery_type = 'LOTTO' AND rank = 1) AS total_lotto_first_prize,
-                COUNT(*) FILTER (WHERE lottery_type = 'LOTTO' AND rank = 2) AS total_lotto_second_prize,
-                COUNT(*) FILTER (WHERE lottery_type = 'PENSION' AND rank = 1) AS total_pension_first_prize,
-                -- 최근 통계
-                COUNT(*) FILTER (WHERE lottery_type = 'LOTTO' AND rank = 1 AND won_at >= %s) AS recent_lotto_first_prize,
-                COUNT(*) FILTER (WHERE lottery_type = 'LOTTO' AND rank = 2 AND won_at >= %s) AS recent_lotto_second_prize,
-                COUNT(*) FILTER (WHERE lottery_type = 'PENSION' AND rank = 1 AND won_at >= %s) AS recent_pension_first_prize,
-                -- 마지막 당첨일
-                MAX(won_at) AS last_won_at,
-                now() AS last_updated_at
-            FROM winning_records
-            GROUP BY store_id;
-        """
-
-        cursor.execute(aggregate_sql, (recent_cutoff, recent_cutoff, recent_cutoff))
-        print(f"  ✅ 집계 데이터 삽입 완료")
-
-        # Step 3: 검증
-        print("\n" + "-" * 40)
-        print("검증:")
-
-        cursor.execute("SELECT COUNT(*) FROM store_stats;")
-        total_count = cursor.fetchone()[0]
-        print(f"  - store_stats 총 레코드: {total_count}개")
-
-        cursor.execute("""
-            SELECT
-                SUM(total_lotto_first_prize) AS lotto_1st,
-                SUM(total_lotto_second_prize) AS lotto_2nd,
-                SUM(total_pension_first_prize) AS pension_1st,
-                SUM(recent_lotto_first_prize) AS recent_lotto_1st,
-                SUM(recent_lotto_second_prize) AS recent_lotto_2nd,
-                SUM(recent_pension_first_prize) AS recent_pension_1st
-            FROM store_stats;
-        """)
-        row = cursor.fetchone()
-        print(f"\n  전체 통계:")
-        print(f"    - 로또 1등: {row[0]}건")
-        print(f"    - 로또 2등: {row[1]}건")
-        print(f"    - 연금복권 1등: {row[2]}건")
-        print(f"\n  최근 {RECENT_PERIOD_DAYS}일 통계:")
-        print(f"    - 로또 1등: {row[3]}건")
-        print(f"    - 로또 2등: {row[4]}건")
-        print(f"    - 연금복권 1등: {row[5]}건")
-
-        # Top 5 판매점
-        print("\n  로또 1등 Top 5 판매점:")
-        cursor.execute("""
-            SELECT ss.store_id, s.name, ss.total_lotto_first_prize, ss.total_lotto_second_prize
-            FROM store_stats ss
-            JOIN stores s ON ss.store_id = s.id
-            ORDER BY ss.total_lotto_first_prize DESC, ss.total_lotto_second_prize DESC
-            LIMIT 5;
-        """)
-        for i, row in enumerate(cursor.fetchall(), 1):
-            print(f"    {i}. {row[1]} (1등: {row[2]}회, 2등: {row[3]}회)")
+
+        if args.mode == 'rebuild':
+            print(f"  - 최근 기준일: {recent_cutoff} (최근 {RECENT_PERIOD_DAYS}일)")
+
+            print("\n" + "-" * 40)
+            print(f"섀도 테이블({SHADOW_TABLE})에 집계 후 교체")
+            with job_stage('rebuild') as stage, conn:
+                row_count = rebuild_store_stats(cursor, recent_cutoff)
+                stage.records = row_count
+            print(f"  ✅ {row_count}개 판매점 집계, store_stats 교체 완료")
+        elif args.mode == 'rollover':
+            print("\n" + "-" * 40)
+            print("최근 기간 기준일 이동")
+            with job_stage('rollover') as stage, conn:
+                result = rollover_recent_window(cursor, recent_cutoff)
+                stage.records = result['stores']
+            print(f"  - 기준일: {result['old_cutoff']} → {result['new_cutoff']}")
+            if result['old_cutoff'] == result['new_cutoff']:
+                print("  ✅ 기준일이 이미 최신입니다.")
+            else:
+                print(f"  ✅ {result['stores']}개 판매점의 최근 통계 갱신")
+        else:
+            print("\n" + "-" * 40)
+            print("새 당첨 기록 증분 반영")
+            with job_stage('incremental') as stage, conn:
+                result = apply_incremental_stats(cursor)
+                stage.records = result['stores']
+            print(f"  - 최근 기준일: {result['recent_cutoff']}")
+            if result['records'] == 0:
+                print("  ✅ 반영할 새 당첨 기록이 없습니다.")
+            else:
+                print(f"  ✅ {result['records']}개 당첨 기록 반영 (보정 {result['corrected']}개), "
+                      f"{result['stores']}개 판매점 갱신")
+
+        with job_stage('verification'):
+            print_verification(cursor)
 
         print("\n" + "=" * 60)
         print("✅ store_stats 집계 완료!")
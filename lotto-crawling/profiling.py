@@ -0,0 +1,230 @@
+"""
+실행 프로파일링 훅
+파이프라인 스크립트 실행 전체를 프로파일링해 타임스탬프 디렉터리에 결과를 남깁니다.
+
+켜는 방법 (모든 진입 스크립트 공통):
+    python load_data_to_supabase.py --profile             # cProfile
+    python crawl_all_rounds.py --profile=sample           # 샘플링 (5ms 간격 스택 수집, 오버헤드 작음)
+    LOTTOMAP_PROFILE=1 python populate_store_stats.py     # 환경변수 (1/cprofile/sample)
+    LOTTOMAP_PROFILE_DIR=/tmp/profiles ...                # 출력 위치 (기본값: lotto-crawling/profiles)
+
+--profile은 argparse보다 먼저 sys.argv에서 제거하므로 각 스크립트 인자와 충돌하지 않습니다.
+환경변수는 하위 프로세스에도 전달되므로 파이프라인 전체를 한 번에 프로파일링할 수 있습니다.
+
+결과 (profiles/<작업>-<YYYYmmdd-HHMMSS>/):
+- cprofile.pstats / samples.collapsed: 원본 (snakeviz, flamegraph.pl, speedscope로 열기)
+- tracemalloc.snapshot: 종료 시점 할당 스냅샷 (tracemalloc.Snapshot.load)
+- summary.txt: 상위 함수(누적/자체 시간)와 할당 위치(종료 시점, 시작 대비 증가분), 최대 메모리
+"""
+import cProfile
+import functools
+import inspect
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+PROFILE_ENV = 'LOTTOMAP_PROFILE'
+PROFILE_DIR_ENV = 'LOTTOMAP_PROFILE_DIR'
+DEFAULT_PROFILE_DIR = Path(__file__).parent / 'profiles'
+
+PROFILE_MODES = ('cprofile', 'sample')
+SAMPLE_INTERVAL = 0.005
+TOP_FUNCTIONS = 25
+TOP_ALLOCATIONS = 20
+
+# 실행 중 프로파일 중첩 방지 (instrumented 안에서 profiled 함수를 또 호출하는 경우)
+_active = threading.local()
+
+
+def profile_mode():
+    """--profile[=mode] 인자 또는 LOTTOMAP_PROFILE 환경변수로 프로파일 모드를 정합니다 (없으면 None)."""
+    mode = None
+    for arg in list(sys.argv[1:]):
+        if arg == '--profile' or arg.startswith('--profile='):
+            sys.argv.remove(arg)
+            mode = arg.partition('=')[2] or 'cprofile'
+
+    if mode is None:
+        value = os.getenv(PROFILE_ENV, '').strip().lower()
+        if value in ('', '0', 'false', 'off', 'no'):
+            return None
+        mode = 'cprofile' if value in ('1', 'true', 'on', 'yes') else value
+
+    if mode not in PROFILE_MODES:
+        print(f"⚠️  알 수 없는 프로파일 모드 '{mode}' → cprofile 사용 ({', '.join(PROFILE_MODES)})", file=sys.stderr)
+        mode = 'cprofile'
+    return mode
+
+
+class StackSampler:
+    """대상 스레드의 스택을 주기적으로 수집하는 샘플링 프로파일러 (표준 라이브러리만 사용)."""
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{Path(code.co_filename).name}:{code.co_name}:{code.co_firstlineno}')
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def write_collapsed(self, path: Path):
+        """flamegraph.pl / speedscope에서 읽는 collapsed stack 형식."""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{';'.join(stack)} {count}\n")
+
+    def summary(self, top: int = TOP_FUNCTIONS) -> str:
+        total = sum(self.stacks.values())
+        if not total:
+            return '샘플 없음\n'
+        own, inclusive = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for name in set(stack):
+                inclusive[name] += count
+
+        lines = [f'샘플 {total:,}개 (간격 {self.interval * 1000:.0f}ms)', '', '[자체 시간 상위]']
+        lines += [f'{count / total * 100:6.1f}%  {name}' for name, count in own.most_common(top)]
+        lines += ['', '[누적 시간 상위]']
+        lines += [f'{count / total * 100:6.1f}%  {name}' for name, count in inclusive.most_common(top)]
+        return '\n'.join(lines) + '\n'
+
+
+def cprofile_summary(profiler: cProfile.Profile, top: int = TOP_FUNCTIONS) -> str:
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream).strip_dirs()
+    stream.write('[누적 시간 상위]\n')
+    stats.sort_stats('cumulative').print_stats(top)
+    stream.write('\n[자체 시간 상위]\n')
+    stats.sort_stats('tottime').print_stats(top)
+    return stream.getvalue()
+
+
+def allocation_summary(start: tracemalloc.Snapshot, end: tracemalloc.Snapshot, peak: int,
+                       top: int = TOP_ALLOCATIONS) -> str:
+    filters = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        tracemalloc.Filter(False, '<unknown>'),
+    ]
+    start, end = start.filter_traces(filters), end.filter_traces(filters)
+    lines = [f'최대 메모리(추적): {peak / 1024 / 1024:.1f}MB', '', '[종료 시점 할당 위치 상위]']
+    lines += [str(stat) for stat in end.statistics('lineno')[:top]]
+    lines += ['', '[시작 대비 증가 상위]']
+    lines += [str(stat) for stat in end.compare_to(start, 'lineno')[:top]]
+    return '\n'.join(lines) + '\n'
+
+
+def profile_output_dir(job_name: str) -> Path:
+    base = Path(os.getenv(PROFILE_DIR_ENV) or DEFAULT_PROFILE_DIR)
+    output_dir = base / f"{job_name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+    try:
+        output_dir.mkdir(parents=True)
+    except FileExistsError:
+        # 같은 초에 끝난 같은 작업 (backfill 워커 프로세스 등)은 PID로 구분
+        output_dir = output_dir.with_name(f'{output_dir.name}-{os.getpid()}')
+        output_dir.mkdir(parents=True, exist_ok=True)
+    return output_dir
+
+
+@contextmanager
+def profile_run(job_name: str, mode: str = None):
+    """
+    블록 실행을 프로파일링합니다. mode를 생략하면 --profile / LOTTOMAP_PROFILE을 따르고, 둘 다 없으면 아무것도 하지 않습니다.
+    예외(SystemExit 포함)로 끝나도 결과를 저장합니다.
+    """
+    mode = mode or profile_mode()
+    if mode is None or getattr(_active, 'running', False):
+        yield
+        return
+
+    _active.running = True
+    tracemalloc_was_on = tracemalloc.is_tracing()
+    if not tracemalloc_was_on:
+        tracemalloc.start()
+    start_snapshot = tracemalloc.take_snapshot()
+
+    profiler = sampler = None
+    if mode == 'sample':
+        sampler = StackSampler(threading.get_ident())
+        sampler.start()
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    started = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        if profiler:
+            profiler.disable()
+        if sampler:
+            sampler.stop()
+        end_snapshot = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        if not tracemalloc_was_on:
+            tracemalloc.stop()
+        _active.running = False
+
+        output_dir = profile_output_dir(job_name)
+        if profiler:
+            profiler.dump_stats(output_dir / 'cprofile.pstats')
+            hot = cprofile_summary(profiler)
+        else:
+            sampler.write_collapsed(output_dir / 'samples.collapsed')
+            hot = sampler.summary()
+        end_snapshot.dump(str(output_dir / 'tracemalloc.snapshot'))
+        allocations = allocation_summary(start_snapshot, end_snapshot, peak)
+
+        with open(output_dir / 'summary.txt', 'w', encoding='utf-8') as f:
+            f.write(f'작업: {job_name}\n모드: {mode}\n소요 시간: {elapsed:.2f}초\n인자: {sys.argv[1:]}\n\n')
+            f.write(hot)
+            f.write('\n')
+            f.write(allocations)
+        print(f"\n📊 프로파일 저장 ({mode}, {elapsed:.1f}초, 최대 메모리 {peak / 1024 / 1024:.1f}MB): {output_dir}",
+              file=sys.stderr)
+
+
+def profiled(job_name: str):
+    """함수 실행 전체를 profile_run으로 감싸는 데코레이터 (async 함수 지원)."""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with profile_run(job_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profile_run(job_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
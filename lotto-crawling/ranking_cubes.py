@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+랭킹 큐브 집계 스크립트
+winning_records를 (복권 종류 × 등수 × 방법 × 기간 × 지역 단위) 셀로 미리 집계하고,
+셀마다 정렬된 상위 N개 판매점 목록을 저장합니다.
+
+- 방법(method): AUTO/MANUAL/SEMI/UNKNOWN + 전체('ALL')
+- 기간(time_window): 전체('ALL'), 최근 1년/3년/5년 ('1Y', '3Y', '5Y')
+- 지역 단위(region_level): 전국('ALL', region_key='전체'), 시/도('SIDO'), 시/군/구('SIGUNGU')
+  지역 키는 프론트엔드(Sidebar.tsx)와 같이 주소의 첫 번째/두 번째 토큰을 사용합니다.
+  시/군/구 키는 동명 지역 구분을 위해 '서울 중구'처럼 시/도를 앞에 붙입니다.
+
+랭킹 조회는 ranking_top_stores의 기본키 범위 조회 한 번으로 끝납니다 (fetch_ranking).
+
+사용법:
+    python ranking_cubes.py                 # 셀당 상위 100개
+    python ranking_cubes.py --top-n 300
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+from datetime import date, timedelta
+
+from job_runs import instrumented, job_stage
+
+# 기간 이름 -> 일 수 (None은 전체 기간)
+TIME_WINDOWS = {
+    'ALL': None,
+    '1Y': 365,
+    '3Y': 365 * 3,
+    '5Y': 365 * 5,
+}
+
+DEFAULT_TOP_N = 100
+
+REGION_ALL_KEY = '전체'
+
+RANKING_DDL = """
+    CREATE TABLE IF NOT EXISTS ranking_cells (
+        lottery_type VARCHAR(10) NOT NULL,
+        rank SMALLINT NOT NULL,
+        method VARCHAR(10) NOT NULL,
+        time_window VARCHAR(4) NOT NULL,
+        region_level VARCHAR(10) NOT NULL,
+        region_key TEXT NOT NULL,
+        store_count INT NOT NULL,
+        win_count INT NOT NULL,
+        built_at TIMESTAMPTZ DEFAULT now(),
+        PRIMARY KEY (lottery_type, rank, method, time_window, region_level, region_key)
+    );
+    CREATE TABLE IF NOT EXISTS ranking_top_stores (
+        lottery_type VARCHAR(10) NOT NULL,
+        rank SMALLINT NOT NULL,
+        method VARCHAR(10) NOT NULL,
+        time_window VARCHAR(4) NOT NULL,
+        region_level VARCHAR(10) NOT NULL,
+        region_key TEXT NOT NULL,
+        position SMALLINT NOT NULL,
+        store_id BIGINT NOT NULL REFERENCES stores(id),
+        win_count INT NOT NULL,
+        last_won_at DATE NULL,
+        PRIMARY KEY (lottery_type, rank, method, time_window, region_level, region_key, position)
+    );
+"""
+
+CELL_KEY_COLUMNS = 'lottery_type, rank, method, time_window, region_level, region_key'
+
+# 판매점 단위 집계 + 셀 내 순위. 방법 전체('ALL')는 GROUPING SETS로 한 번에 계산합니다.
+STORE_COUNTS_SQL = f"""
+    CREATE TEMP TABLE ranking_store_counts ON COMMIT DROP AS
+    WITH base AS (
+        SELECT
+            wr.store_id,
+            wr.lottery_type,
+            wr.rank,
+            wr.method,
+            wr.won_at,
+            split_part(s.address_norm, ' ', 1) AS sido,
+            split_part(s.address_norm, ' ', 1) || ' ' || split_part(s.address_norm, ' ', 2) AS sigungu
+        FROM winning_records wr
+        JOIN stores s ON s.id = wr.store_id
+    ),
+    windowed AS (
+        SELECT b.*, w.time_window
+        FROM base b
+        JOIN unnest(%(window_names)s::text[], %(window_since)s::date[]) AS w(time_window, since)
+          ON w.since IS NULL OR b.won_at >= w.since
+    ),
+    regioned AS (
+        SELECT wd.*, r.region_level, r.region_key
+        FROM windowed wd
+        CROSS JOIN LATERAL (VALUES
+            ('ALL', '{REGION_ALL_KEY}'),
+            ('SIDO', wd.sido),
+            ('SIGUNGU', wd.sigungu)
+        ) AS r(region_level, region_key)
+    ),
+    counts AS (
+        SELECT
+            lottery_type, rank, COALESCE(method, 'ALL') AS method, time_window,
+            region_level, region_key, store_id,
+            COUNT(*) AS win_count,
+            MAX(won_at) AS last_won_at
+        FROM regioned
+        GROUP BY GROUPING SETS (
+            (lottery_type, rank, method, time_window, region_level, region_key, store_id),
+            (lottery_type, rank, time_window, region_level, region_key, store_id)
+        )
+    )
+    SELECT
+        counts.*,
+        ROW_NUMBER() OVER (
+            PARTITION BY {CELL_KEY_COLUMNS}
+            ORDER BY win_count DESC, last_won_at DESC NULLS LAST, store_id
+        ) AS position
+    FROM counts;
+"""
+
+INSERT_CELLS_SQL = f"""
+    INSERT INTO ranking_cells ({CELL_KEY_COLUMNS}, store_count, win_count)
+    SELECT {CELL_KEY_COLUMNS}, COUNT(*), SUM(win_count)
+    FROM ranking_store_counts
+    GROUP BY {CELL_KEY_COLUMNS};
+"""
+
+INSERT_TOP_SQL = f"""
+    INSERT INTO ranking_top_stores ({CELL_KEY_COLUMNS}, position, store_id, win_count, last_won_at)
+    SELECT {CELL_KEY_COLUMNS}, position, store_id, win_count, last_won_at
+    FROM ranking_store_counts
+    WHERE position <= %(top_n)s;
+"""
+
+
+def get_database_url():
+    """환경변수 또는 .env.local에서 DATABASE_URL을 읽어옵니다."""
+    database_url = os.getenv('DATABASE_URL') or os.getenv('SUPABASE_DB_URL')
+    if database_url:
+        return database_url
+
+    env_file = Path(__file__).parent.parent / '.env.local'
+    if env_file.exists():
+        try:
+            with open(env_file, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith('#') and '=' in line:
+                        key, value = line.split('=', 1)
+                        key = key.strip()
+                        value = value.strip().strip('"').strip("'")
+                        if key in ('DATABASE_URL', 'SUPABASE_DB_URL'):
+                            return value
+        except PermissionError:
+            pass
+
+    return None
+
+
+def window_cutoffs(as_of: date, windows: dict = TIME_WINDOWS) -> dict:
+    """기간 이름 -> 시작일 (전체 기간은 None) 딕셔너리를 만듭니다."""
+    return {
+        name: (as_of - timedelta(days=days) if days is not None else None)
+        for name, days in windows.items()
+    }
+
+
+def build_ranking_cubes(cursor, as_of: date = None, windows: dict = TIME_WINDOWS,
+                        top_n: int = DEFAULT_TOP_N) -> dict:
+    """
+    랭킹 셀과 셀별 상위 N개 목록을 다시 만듭니다.
+
+    호출한 쪽의 트랜잭션 안에서 실행해야 합니다. DELETE와 INSERT가 한 트랜잭션에서
+    커밋되므로 조회 쪽은 커밋 전까지 이전 랭킹을 그대로 읽습니다.
+
+    Returns:
+        셀 수와 상위 목록 행 수 딕셔너리
+    """
+    cutoffs = window_cutoffs(as_of or date.today(), windows)
+
+    cursor.execute(RANKING_DDL)
+    cursor.execute(STORE_COUNTS_SQL, {
+        'window_names': list(cutoffs.keys()),
+        'window_since': list(cutoffs.values()),
+    })
+
+    cursor.execute("DELETE FROM ranking_cells;")
+    cursor.execute("DELETE FROM ranking_top_stores;")
+    cursor.execute(INSERT_CELLS_SQL)
+    cell_count = cursor.rowcount
+    cursor.execute(INSERT_TOP_SQL, {'top_n': top_n})
+    top_count = cursor.rowcount
+    return {'cells': cell_count, 'top_rows': top_count, 'cutoffs': cutoffs}
+
+
+def fetch_ranking(cursor, lottery_type: str, rank: int, method: str = 'ALL', time_window: str = 'ALL',
+                  region_level: str = 'ALL', region_key: str = REGION_ALL_KEY, limit: int = 20) -> list:
+    """
+    미리 집계된 랭킹 셀에서 상위 판매점을 조회합니다 (기본키 범위 조회).
+
+    Returns:
+        (순위, store_id, 판매점명, 주소, 당첨 횟수, 마지막 당첨일) 튜플 리스트
+    """
+    cursor.execute("""
+        SELECT t.position, t.store_id, s.name, s.address_raw, t.win_count, t.last_won_at
+        FROM ranking_top_stores t
+        JOIN stores s ON s.id = t.store_id
+        WHERE t.lottery_type = %s AND t.rank = %s AND t.method = %s AND t.time_window = %s
+          AND t.region_level = %s AND t.region_key = %s AND t.position <= %s
+        ORDER BY t.position;
+    """, (lottery_type, rank, method, time_window, region_level, region_key, limit))
+    return cursor.fetchall()
+
+
+@instrumented('ranking-cubes')
+def main():
+    parser = argparse.ArgumentParser(description='랭킹 큐브 집계')
+    parser.add_argument('--top-n', type=int, default=DEFAULT_TOP_N,
+                        help=f'셀별로 저장할 상위 판매점 수 (기본값: {DEFAULT_TOP_N})')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("랭킹 큐브 집계")
+    print("=" * 60)
+
+    database_url = get_database_url()
+    if not database_url:
+        print("❌ DATABASE_URL 환경변수를 찾을 수 없습니다.")
+        sys.exit(1)
+
+    try:
+        import psycopg2
+    except ImportError:
+        print("❌ psycopg2가 설치되지 않았습니다.")
+        sys.exit(1)
+
+    print("\n🔗 데이터베이스 연결 중...")
+    conn = psycopg2.connect(database_url)
+    cursor = conn.cursor()
+
+    try:
+        with job_stage('build') as stage, conn:
+            result = build_ranking_cubes(cursor, top_n=args.top_n)
+            stage.records = result['top_rows']
+
+        print("\n기간별 시작일:")
+        for name, since in result['cutoffs'].items():
+            print(f"  - {name}: {since or '전체'}")
+        print(f"\n  ✅ 셀 {result['cells']:,}개, 상위 목록 {result['top_rows']:,}행 저장")
+
+        print("\n" + "-" * 40)
+        print("검증:")
+        cursor.execute("""
+            SELECT region_level, COUNT(*), SUM(store_count)
+            FROM ranking_cells
+            WHERE time_window = 'ALL' AND method = 'ALL'
+            GROUP BY region_level
+            ORDER BY region_level;
+        """)
+        for level, cells, stores in cursor.fetchall():
+            print(f"  - {level}: 셀 {cells:,}개, 판매점 {stores:,}개")
+
+        print("\n  로또 1등 전국 Top 5:")
+        for position, _, name, address, wins, last_won_at in fetch_ranking(cursor, 'LOTTO', 1, limit=5):
+            print(f"    {position}. {name} ({wins}회, 최근 {last_won_at}) - {address[:30]}")
+
+        print("\n" + "=" * 60)
+        print("✅ 랭킹 큐브 집계 완료!")
+        print("=" * 60)
+
+    except Exception as e:
+        print(f"\n❌ 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
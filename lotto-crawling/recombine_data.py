@@ -1,20 +1,34 @@
 import pandas as pd
 
+import lottery_csv
+from profiling import profiled
+from stage_cache import StageCache, stage_key
+
+@profiled('recombine')
 def combine_lottery_data():
     lotto_file = 'lotto_all_rounds.csv'
     pension_file = 'pension_all_rounds.csv'
     output_file = 'all_lottery_stores.csv'
 
+    # 입력 CSV와 이 스크립트가 그대로면 이전 결과를 복원
+    cache = StageCache()
+    key = stage_key('recombine', [lotto_file, pension_file], [__file__, lottery_csv.__file__])
+    if cache.restore(key, [output_file]):
+        print(f"Inputs unchanged, restored {output_file} from stage cache")
+        return
+
     try:
-        lotto_df = pd.read_csv(lotto_file)
+        # 스키마 dtype으로 읽어 번호는 정수, 전화번호/좌표는 원문 문자열 그대로 유지
+        lotto_df = lottery_csv.read_frame(lotto_file)
         lotto_df['복권종류'] = 'lotto'
-        pension_df = pd.read_csv(pension_file)
+        pension_df = lottery_csv.read_frame(pension_file)
         pension_df['복권종류'] = 'pension'
         
         # Assuming the columns are compatible for concatenation
         combined_df = pd.concat([lotto_df, pension_df], ignore_index=True)
         
         combined_df.to_csv(output_file, index=False)
+        cache.store(key, 'recombine', [output_file])
         print(f"Successfully combined {lotto_file} and {pension_file} into {output_file}")
     except FileNotFoundError as e:
         print(f"Error: {e}")
@@ -6,6 +6,7 @@
 
 import asyncio
 from lotto_crawler import LottoStoreCrawler
+from profiling import profiled
 
 
 async def simple_crawl():
@@ -170,6 +171,7 @@ async def crawl_all_rounds_quick():
         print(f"\n📊 총 {len(all_stores)}개 판매점 정보 수집 완료!")
 
 
+@profiled('simple-example')
 def main():
     """
     메인 함수 - 실행할 예제를 선택하세요
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+판매점 공간 인덱스
+지도 화면(bbox) 조회와 가까운 판매점(kNN) 조회를 위한 두 가지 경로를 제공합니다.
+
+1) DB: stores에 point(lng, lat) GiST 표현식 인덱스(idx_stores_geo_point)를 두고
+   fetch_stores_in_bbox / fetch_nearest_stores로 조회합니다 (PostGIS 불필요).
+2) 오프라인: StoreGridIndex는 판매점을 고정 크기 격자 셀 순서로 정렬한 배열 인덱스입니다.
+   셀 시작 위치(offsets)만 있으면 bbox의 각 격자 행이 연속 구간이 되므로,
+   후보 구간을 잘라 정확한 범위/필터 검사만 하면 됩니다. .npz로 저장/로드합니다.
+
+사용법:
+    python spatial_index.py --source csv --csv all_lottery_stores.csv   # CSV로 인덱스 생성
+    python spatial_index.py --source db                                 # stores + store_stats로 생성
+    python spatial_index.py --source csv --benchmark                    # 무작위 화면 조회 시간 측정
+"""
+import argparse
+import math
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from profiling import profiled
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+# 격자 셀 크기 (도). 0.02도 ≈ 위도 2.2km
+DEFAULT_CELL_DEG = 0.02
+
+DEFAULT_INDEX_FILE = 'store_grid_index.npz'
+
+# (복권 종류, 등수) -> 당첨 횟수 배열 이름 (types.ts의 WinStats와 동일)
+WIN_COLUMNS = {
+    ('LOTTO', 1): 'lotto1',
+    ('LOTTO', 2): 'lotto2',
+    ('PENSION', 1): 'pension',
+}
+
+# 좌표가 있는 판매점만 인덱스를 사용하도록 부분 인덱스의 조건을 쿼리에도 그대로 둡니다.
+BBOX_SQL = """
+    SELECT s.id, s.name, s.address_raw, s.lat, s.lng,
+           COALESCE(ss.total_lotto_first_prize, 0),
+           COALESCE(ss.total_lotto_second_prize, 0),
+           COALESCE(ss.total_pension_first_prize, 0)
+    FROM stores s
+    LEFT JOIN store_stats ss ON ss.store_id = s.id
+    WHERE s.lat IS NOT NULL AND s.lng IS NOT NULL
+      AND point(s.lng, s.lat) <@ box(point(%(west)s, %(south)s), point(%(east)s, %(north)s))
+      {win_filter}
+    LIMIT %(limit)s;
+"""
+
+# <-> 는 도 단위 평면 거리이므로 넉넉히 후보를 뽑은 뒤 대원 거리로 다시 정렬합니다.
+NEAREST_SQL = """
+    SELECT id, name, address_raw, lat, lng, distance_km
+    FROM (
+        SELECT s.id, s.name, s.address_raw, s.lat, s.lng,
+               2 * 6371.0 * asin(sqrt(
+                   power(sin(radians(s.lat - %(lat)s) / 2), 2)
+                   + cos(radians(%(lat)s)) * cos(radians(s.lat))
+                     * power(sin(radians(s.lng - %(lng)s) / 2), 2)
+               )) AS distance_km
+        FROM stores s
+        WHERE s.lat IS NOT NULL AND s.lng IS NOT NULL
+        ORDER BY point(s.lng, s.lat) <-> point(%(lng)s, %(lat)s)
+        LIMIT %(candidates)s
+    ) nearest
+    ORDER BY distance_km
+    LIMIT %(k)s;
+"""
+
+DB_WIN_FILTERS = {
+    'lotto1': 'ss.total_lotto_first_prize > 0',
+    'lotto2': 'ss.total_lotto_second_prize > 0',
+    'pension': 'ss.total_pension_first_prize > 0',
+}
+
+
+def get_database_url():
+    """환경변수 또는 .env.local에서 DATABASE_URL을 읽어옵니다."""
+    database_url = os.getenv('DATABASE_URL') or os.getenv('SUPABASE_DB_URL')
+    if database_url:
+        return database_url
+
+    env_file = Path(__file__).parent.parent / '.env.local'
+    if env_file.exists():
+        try:
+            with open(env_file, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith('#') and '=' in line:
+                        key, value = line.split('=', 1)
+                        key = key.strip()
+                        value = value.strip().strip('"').strip("'")
+                        if key in ('DATABASE_URL', 'SUPABASE_DB_URL'):
+                            return value
+        except PermissionError:
+            pass
+
+    return None
+
+
+def win_columns_for(lottery_types=None, rank: int = None) -> list:
+    """복권 종류/등수 필터에 해당하는 당첨 횟수 배열 이름 목록을 반환합니다."""
+    return [
+        column for (lottery_type, column_rank), column in WIN_COLUMNS.items()
+        if (not lottery_types or lottery_type in lottery_types) and (rank is None or column_rank == rank)
+    ]
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """두 좌표(배열) 사이의 대원 거리(km)를 계산합니다."""
+    lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+class StoreGridIndex:
+    """
+    격자 셀 순서로 정렬된 판매점 배열 인덱스
+
+    Attributes:
+        store_ids: 판매점 ID 배열 (정렬된 순서)
+        lat, lng: float64 좌표 배열
+        wins: 당첨 횟수 배열 딕셔너리 (WIN_COLUMNS의 값이 키)
+        cell_start: 셀 번호 -> 시작 위치 (길이 = 셀 수 + 1)
+    """
+
+    def __init__(self, store_ids, lat, lng, wins: dict, cell_deg: float = DEFAULT_CELL_DEG):
+        lat = np.asarray(lat, dtype='float64')
+        lng = np.asarray(lng, dtype='float64')
+        located = ~(np.isnan(lat) | np.isnan(lng))
+
+        self.cell_deg = float(cell_deg)
+        self.origin_lat = float(lat[located].min()) if located.any() else 0.0
+        self.origin_lng = float(lng[located].min()) if located.any() else 0.0
+        self.n_rows = int((lat[located].max() - self.origin_lat) // cell_deg) + 1 if located.any() else 1
+        self.n_cols = int((lng[located].max() - self.origin_lng) // cell_deg) + 1 if located.any() else 1
+
+        cell_ids = self._cell_ids(lat[located], lng[located])
+        order = np.argsort(cell_ids, kind='stable')
+
+        self.store_ids = np.asarray(store_ids)[located][order]
+        self.lat = lat[located][order]
+        self.lng = lng[located][order]
+        self.wins = {name: np.asarray(values, dtype='int32')[located][order] for name, values in wins.items()}
+        self.cell_start = np.searchsorted(cell_ids[order], np.arange(self.n_rows * self.n_cols + 1))
+
+    def __len__(self):
+        return len(self.store_ids)
+
+    def _rows(self, lat):
+        return np.clip(((np.asarray(lat) - self.origin_lat) // self.cell_deg).astype('int64'), 0, self.n_rows - 1)
+
+    def _cols(self, lng):
+        return np.clip(((np.asarray(lng) - self.origin_lng) // self.cell_deg).astype('int64'), 0, self.n_cols - 1)
+
+    def _cell_ids(self, lat, lng):
+        return self._rows(lat) * self.n_cols + self._cols(lng)
+
+    def _candidates(self, row0: int, row1: int, col0: int, col1: int) -> np.ndarray:
+        """격자 사각형 안의 판매점 위치 (행마다 연속 구간)."""
+        row_ids = np.arange(row0, row1 + 1) * self.n_cols
+        starts = self.cell_start[row_ids + col0]
+        ends = self.cell_start[row_ids + col1 + 1]
+        if len(starts) == 1:
+            return np.arange(starts[0], ends[0])
+        return np.concatenate([np.arange(s, e) for s, e in zip(starts, ends) if e > s] or [np.empty(0, 'int64')])
+
+    def _win_mask(self, positions: np.ndarray, lottery_types=None, rank: int = None) -> np.ndarray:
+        if not lottery_types and rank is None:
+            return np.ones(len(positions), dtype=bool)
+        mask = np.zeros(len(positions), dtype=bool)
+        for column in win_columns_for(lottery_types, rank):
+            mask |= self.wins[column][positions] > 0
+        return mask
+
+    def query_bbox(self, south: float, west: float, north: float, east: float,
+                   lottery_types=None, rank: int = None) -> np.ndarray:
+        """
+        지도 화면 범위 안의 판매점 위치 배열을 반환합니다.
+
+        Args:
+            south, west, north, east: 화면 범위 (카카오지도 bounds의 sw/ne)
+            lottery_types: 당첨 이력이 있어야 하는 복권 종류 (예: {'LOTTO'})
+            rank: 당첨 이력이 있어야 하는 등수 (예: 1)
+        """
+        if north < self.origin_lat or east < self.origin_lng:
+            return np.empty(0, dtype='int64')
+        row0, row1 = self._rows(south), self._rows(north)
+        col0, col1 = self._cols(west), self._cols(east)
+        positions = self._candidates(int(row0), int(row1), int(col0), int(col1))
+
+        lat, lng = self.lat[positions], self.lng[positions]
+        inside = (lat >= south) & (lat <= north) & (lng >= west) & (lng <= east)
+        positions = positions[inside]
+        return positions[self._win_mask(positions, lottery_types, rank)]
+
+    def nearest(self, lat: float, lng: float, k: int = 10, lottery_types=None, rank: int = None) -> list:
+        """
+        가까운 판매점 k개를 (store_id, 거리 km) 리스트로 반환합니다.
+
+        격자 링을 넓혀 가며 후보를 모으고, k번째 거리보다 먼 셀이 남지 않을 때까지 확장합니다.
+        """
+        if len(self) == 0 or k <= 0:
+            return []
+        row, col = int(self._rows(lat)), int(self._cols(lng))
+        # 셀 한 칸이 보장하는 최소 거리 (경도 방향은 위도에 따라 줄어듦)
+        max_lat = max(abs(self.origin_lat), abs(self.origin_lat + self.n_rows * self.cell_deg))
+        cell_km = self.cell_deg * KM_PER_DEGREE * math.cos(math.radians(max_lat))
+        max_ring = max(self.n_rows, self.n_cols)
+
+        ring = 1
+        while True:
+            positions = self._candidates(max(row - ring, 0), min(row + ring, self.n_rows - 1),
+                                         max(col - ring, 0), min(col + ring, self.n_cols - 1))
+            positions = positions[self._win_mask(positions, lottery_types, rank)]
+            if len(positions) >= k or ring >= max_ring:
+                if len(positions) == 0:
+                    return []
+                distances = haversine_km(lat, lng, self.lat[positions], self.lng[positions])
+                top = np.argsort(distances, kind='stable')[:k]
+                # 링 바깥에 더 가까운 판매점이 있을 수 없으면 종료
+                if ring >= max_ring or distances[top[-1]] <= ring * cell_km:
+                    return [(self.store_ids[positions[i]].item(), float(distances[i])) for i in top]
+                ring = max(ring + 1, int(math.ceil(distances[top[-1]] / cell_km)))
+            else:
+                ring *= 2
+
+    def save(self, path):
+        """인덱스를 .npz 파일로 저장합니다 (pickle 없이 로드 가능)."""
+        np.savez(
+            path,
+            store_ids=self.store_ids,
+            lat=self.lat,
+            lng=self.lng,
+            cell_start=self.cell_start,
+            grid=np.array([self.origin_lat, self.origin_lng, self.cell_deg, self.n_rows, self.n_cols]),
+            **{f'wins_{name}': values for name, values in self.wins.items()},
+        )
+
+    @classmethod
+    def load(cls, path) -> 'StoreGridIndex':
+        """save()로 저장한 인덱스를 읽어옵니다 (정렬/셀 계산 없이 배열만 복원)."""
+        with np.load(path, allow_pickle=False) as data:
+            index = cls.__new__(cls)
+            index.store_ids = data['store_ids']
+            index.lat = data['lat']
+            index.lng = data['lng']
+            index.cell_start = data['cell_start']
+            origin_lat, origin_lng, cell_deg, n_rows, n_cols = data['grid']
+            index.origin_lat, index.origin_lng, index.cell_deg = float(origin_lat), float(origin_lng), float(cell_deg)
+            index.n_rows, index.n_cols = int(n_rows), int(n_cols)
+            index.wins = {key[len('wins_'):]: data[key] for key in data.files if key.startswith('wins_')}
+        return index
+
+
+def load_store_points_from_csv(csv_path):
+    """
+    CSV에서 판매점 좌표(검증/보정 후 최신 회차)와 복권 종류/등수별 당첨 횟수를 읽습니다.
+
+    Returns:
+        (store_ids, lat, lng, wins) 튜플
+    """
+    from coordinate_validation import (
+        SUSPECT_STATUSES, latest_store_coordinates, read_coordinate_frame, validate_coordinates,
+    )
+    from load_rules import normalize_rank
+    from lottery_csv import read_frame
+
+    latest = latest_store_coordinates(validate_coordinates(read_coordinate_frame(csv_path)))
+    latest = latest[~latest['coord_status'].isin(SUSPECT_STATUSES)]
+
+    df = read_frame(csv_path, columns=['판매점ID', '등수'])
+    source_ids = df['판매점ID'].str.strip()
+    lottery_types = df['복권종류'].astype(str).str.strip().str.upper()
+    ranks = df['등수'].map(normalize_rank).astype('int64')  # 범주형이라 고유 값만 변환
+
+    wins = {}
+    for (lottery_type, rank), column in WIN_COLUMNS.items():
+        matched = source_ids[(lottery_types == lottery_type) & (ranks == rank)]
+        wins[column] = matched.value_counts().reindex(latest.index, fill_value=0).to_numpy()
+
+    return (latest.index.to_numpy(dtype=str), latest['lat'].to_numpy(dtype='float64'),
+            latest['lng'].to_numpy(dtype='float64'), wins)
+
+
+def load_store_points_from_db(cursor):
+    """
+    stores + store_stats에서 판매점 좌표와 당첨 횟수를 읽습니다.
+
+    Returns:
+        (store_ids, lat, lng, wins) 튜플
+    """
+    cursor.execute("""
+        SELECT s.id, s.lat, s.lng,
+               COALESCE(ss.total_lotto_first_prize, 0),
+               COALESCE(ss.total_lotto_second_prize, 0),
+               COALESCE(ss.total_pension_first_prize, 0)
+        FROM stores s
+        LEFT JOIN store_stats ss ON ss.store_id = s.id
+        WHERE s.lat IS NOT NULL AND s.lng IS NOT NULL AND s.is_active;
+    """)
+    rows = cursor.fetchall()
+    columns = list(zip(*rows)) if rows else [[]] * 6
+    wins = {
+        'lotto1': np.asarray(columns[3], dtype='int32'),
+        'lotto2': np.asarray(columns[4], dtype='int32'),
+        'pension': np.asarray(columns[5], dtype='int32'),
+    }
+    return (np.asarray(columns[0], dtype='int64'), np.asarray(columns[1], dtype='float64'),
+            np.asarray(columns[2], dtype='float64'), wins)
+
+
+def fetch_stores_in_bbox(cursor, south: float, west: float, north: float, east: float,
+                         lottery_types=None, rank: int = None, limit: int = 2000) -> list:
+    """DB의 GiST 인덱스로 화면 범위 안의 판매점을 조회합니다 (/api/stores?bbox= 용)."""
+    win_filter = ''
+    if lottery_types or rank is not None:
+        columns = win_columns_for(lottery_types, rank)
+        if not columns:
+            return []
+        win_filter = f"AND ({' OR '.join(DB_WIN_FILTERS[c] for c in columns)})"
+    cursor.execute(BBOX_SQL.format(win_filter=win_filter), {
+        'south': south, 'west': west, 'north': north, 'east': east, 'limit': limit,
+    })
+    return cursor.fetchall()
+
+
+def fetch_nearest_stores(cursor, lat: float, lng: float, k: int = 10) -> list:
+    """DB의 GiST 인덱스(<-> 거리 정렬)로 가까운 판매점 k개를 조회합니다."""
+    cursor.execute(NEAREST_SQL, {'lat': lat, 'lng': lng, 'k': k, 'candidates': max(k * 4, 20)})
+    return cursor.fetchall()
+
+
+def run_benchmark(index: StoreGridIndex, queries: int = 1000, seed: int = 0):
+    """무작위 화면(약 10km 범위) 조회와 kNN 조회의 평균 시간을 출력합니다."""
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(index), size=queries)
+    centers_lat, centers_lng = index.lat[picks], index.lng[picks]
+
+    started = time.perf_counter()
+    found = 0
+    for lat, lng in zip(centers_lat, centers_lng):
+        found += len(index.query_bbox(lat - 0.05, lng - 0.06, lat + 0.05, lng + 0.06, {'LOTTO'}, 1))
+    bbox_ms = (time.perf_counter() - started) * 1000 / queries
+
+    started = time.perf_counter()
+    for lat, lng in zip(centers_lat, centers_lng):
+        index.nearest(lat, lng, k=10)
+    knn_ms = (time.perf_counter() - started) * 1000 / queries
+
+    print(f"  - bbox + 로또 1등 필터: 평균 {bbox_ms:.3f}ms (평균 {found / queries:.1f}개)")
+    print(f"  - kNN (k=10): 평균 {knn_ms:.3f}ms")
+
+
+@profiled('spatial-index')
+def main():
+    parser = argparse.ArgumentParser(description='판매점 공간 인덱스 생성')
+    parser.add_argument('--source', choices=['csv', 'db'], default='csv', help='판매점 데이터 출처 (기본값: csv)')
+    parser.add_argument('--csv', type=str, default='all_lottery_stores.csv', help='--source csv일 때 CSV 파일')
+    parser.add_argument('--output', type=str, default=DEFAULT_INDEX_FILE,
+                        help=f'인덱스 파일 경로 (기본값: {DEFAULT_INDEX_FILE})')
+    parser.add_argument('--cell-deg', type=float, default=DEFAULT_CELL_DEG,
+                        help=f'격자 셀 크기(도) (기본값: {DEFAULT_CELL_DEG})')
+    parser.add_argument('--benchmark', action='store_true', help='생성 후 조회 시간 측정')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("판매점 공간 인덱스 생성")
+    print("=" * 60)
+
+    if args.source == 'csv':
+        csv_path = Path(args.csv)
+        if not csv_path.is_absolute():
+            csv_path = Path(__file__).parent / csv_path
+        if not csv_path.exists():
+            print(f"❌ CSV 파일을 찾을 수 없습니다: {csv_path}")
+            sys.exit(1)
+        print(f"\n📂 CSV 읽는 중: {csv_path}")
+        points = load_store_points_from_csv(csv_path)
+    else:
+        database_url = get_database_url()
+        if not database_url:
+            print("❌ DATABASE_URL 환경변수를 찾을 수 없습니다.")
+            sys.exit(1)
+        try:
+            import psycopg2
+        except ImportError:
+            print("❌ psycopg2가 설치되지 않았습니다.")
+            sys.exit(1)
+        print("\n🔗 데이터베이스 연결 중...")
+        conn = psycopg2.connect(database_url)
+        try:
+            with conn.cursor() as cursor:
+                points = load_store_points_from_db(cursor)
+        finally:
+            conn.close()
+
+    started = time.perf_counter()
+    index = StoreGridIndex(*points, cell_deg=args.cell_deg)
+    build_ms = (time.perf_counter() - started) * 1000
+    print(f"  ✅ 판매점 {len(index):,}개, 격자 {index.n_rows}x{index.n_cols} ({build_ms:.1f}ms)")
+
+    output_path = Path(args.output)
+    if not output_path.is_absolute():
+        output_path = Path(__file__).parent / output_path
+    index.save(output_path)
+    print(f"  💾 저장: {output_path}")
+
+    if args.benchmark and len(index):
+        print("\n⏱️  조회 시간 측정:")
+        run_benchmark(index)
+
+
+if __name__ == '__main__':
+    main()
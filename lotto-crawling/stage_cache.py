@@ -0,0 +1,203 @@
+"""
+단계 결과 캐시 (content-addressed)
+입력 파일 내용, 단계 코드, 실행 인자로 만든 키가 같으면 이전 산출물을 복원하고 단계를 건너뜁니다.
+재시도된 CI 작업이나 같은 입력으로 다시 실행할 때 재계산 비용이 거의 없습니다.
+
+- 키: SHA-256(단계 이름 + 입력 파일 내용 + 코드 파일 내용 + 인자)
+- 저장: .stage_cache/<키 앞 2자리>/<키>/ 에 산출물 복사본과 manifest.json
+- 크기 제한: LOTTOMAP_STAGE_CACHE_MB (기본값: 512MB), 초과 시 가장 오래 쓰지 않은 항목부터 삭제 (LRU)
+- LOTTOMAP_STAGE_CACHE=off 이면 캐시를 쓰지 않습니다.
+
+사용 예:
+    cache = StageCache()
+    key = stage_key('recombine', [lotto_csv, pension_csv], [__file__])
+    if not cache.restore(key, [output_csv]):
+        ...  # 실제 처리
+        cache.store(key, 'recombine', [output_csv])
+
+    python stage_cache.py            # 캐시 항목/크기 조회
+    python stage_cache.py --clear    # 캐시 비우기
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from profiling import profiled
+
+CACHE_ENV = 'LOTTOMAP_STAGE_CACHE'
+CACHE_DIR_ENV = 'LOTTOMAP_STAGE_CACHE_DIR'
+CACHE_SIZE_ENV = 'LOTTOMAP_STAGE_CACHE_MB'
+
+DEFAULT_CACHE_DIR = Path(__file__).parent / '.stage_cache'
+DEFAULT_MAX_MB = 512
+MANIFEST = 'manifest.json'
+
+
+def _update_with_file(digest, path: Path):
+    if not path.exists():
+        digest.update(b'<missing>')
+        return
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+
+
+def stage_key(stage: str, inputs, code, params=None) -> str:
+    """
+    단계 캐시 키를 계산합니다.
+
+    Args:
+        stage: 단계 이름
+        inputs: 입력 파일 경로 목록 (없는 파일도 키에 반영)
+        code: 단계 코드 버전으로 쓸 소스 파일 목록 (보통 스크립트 자신과 직접 쓰는 모듈)
+        params: 결과에 영향을 주는 인자 (JSON 직렬화 가능한 값)
+    """
+    digest = hashlib.sha256()
+    digest.update(stage.encode('utf-8'))
+    for label, paths in (('input', inputs), ('code', code)):
+        for path in paths:
+            path = Path(path)
+            digest.update(f'\0{label}:{path.name}\0'.encode('utf-8'))
+            _update_with_file(digest, path)
+    digest.update(json.dumps(params, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def cache_enabled() -> bool:
+    return os.getenv(CACHE_ENV, '').strip().lower() not in ('0', 'off', 'false', 'no')
+
+
+class StageCache:
+    """크기 제한이 있는 로컬 단계 결과 캐시."""
+
+    def __init__(self, cache_dir=None, max_bytes: int = None):
+        self.cache_dir = Path(cache_dir or os.getenv(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR)
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv(CACHE_SIZE_ENV) or DEFAULT_MAX_MB) * 1024 * 1024)
+        self.max_bytes = max_bytes
+        self.enabled = cache_enabled()
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / key
+
+    def restore(self, key: str, outputs) -> bool:
+        """키에 맞는 산출물을 원래 위치로 복원합니다. 없거나 손상됐으면 False."""
+        if not self.enabled:
+            return False
+        entry = self._entry_dir(key)
+        manifest_path = entry / MANIFEST
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            files = manifest['outputs']
+            if [item['name'] for item in files] != [Path(p).name for p in outputs]:
+                return False
+            for index, (item, target) in enumerate(zip(files, outputs)):
+                blob = entry / str(index)
+                if blob.stat().st_size != item['size']:
+                    raise OSError(f'크기 불일치: {blob}')
+                target = Path(target)
+                tmp = target.with_name(f'.{target.name}.{uuid.uuid4().hex[:8]}.tmp')
+                shutil.copyfile(blob, tmp)
+                os.replace(tmp, target)
+            os.utime(manifest_path)  # LRU 사용 시각 갱신
+            return True
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️  캐시 항목 손상, 삭제합니다 ({key[:12]}): {e}")
+            shutil.rmtree(entry, ignore_errors=True)
+            return False
+
+    def store(self, key: str, stage: str, outputs):
+        """산출물을 캐시에 복사합니다. 제한보다 큰 결과는 저장하지 않습니다."""
+        if not self.enabled:
+            return
+        outputs = [Path(p) for p in outputs]
+        if not all(p.exists() for p in outputs):
+            return
+        size = sum(p.stat().st_size for p in outputs)
+        if size > self.max_bytes:
+            print(f"⚠️  {stage} 산출물({size / 1024 / 1024:.1f}MB)이 캐시 한도보다 커서 저장하지 않습니다.")
+            return
+
+        entry = self._entry_dir(key)
+        staging = entry.with_name(f'.{key}.{uuid.uuid4().hex[:8]}')
+        staging.mkdir(parents=True, exist_ok=True)
+        try:
+            files = []
+            for index, path in enumerate(outputs):
+                shutil.copyfile(path, staging / str(index))
+                files.append({'name': path.name, 'size': path.stat().st_size})
+            with open(staging / MANIFEST, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'stage': stage,
+                    'outputs': files,
+                    'size': size,
+                    'created_at': datetime.now().isoformat(timespec='seconds'),
+                }, f, ensure_ascii=False, indent=2)
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(staging, entry)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        self.evict()
+
+    def entries(self) -> list:
+        """(마지막 사용 시각, 크기, 항목 디렉터리, manifest) 목록 (오래된 순)."""
+        result = []
+        for manifest_path in self.cache_dir.glob(f'*/*/{MANIFEST}'):
+            try:
+                with open(manifest_path, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+                result.append((manifest_path.stat().st_mtime, manifest['size'], manifest_path.parent, manifest))
+            except (OSError, ValueError, KeyError):
+                continue
+        return sorted(result, key=lambda item: item[0])
+
+    def evict(self) -> int:
+        """전체 크기가 한도 이하가 될 때까지 가장 오래 쓰지 않은 항목을 지웁니다. 지운 항목 수를 반환합니다."""
+        entries = self.entries()
+        total = sum(size for _, size, _, _ in entries)
+        removed = 0
+        for _, size, entry, _ in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+@profiled('stage-cache')
+def main():
+    parser = argparse.ArgumentParser(description='단계 결과 캐시 조회/정리')
+    parser.add_argument('--clear', action='store_true', help='캐시 전체 삭제')
+    args = parser.parse_args()
+
+    cache = StageCache()
+    if args.clear:
+        cache.clear()
+        print(f"🗑️  캐시 삭제: {cache.cache_dir}")
+        return
+
+    entries = cache.entries()
+    total = sum(size for _, size, _, _ in entries)
+    print(f"📂 {cache.cache_dir}: {len(entries)}개 항목, "
+          f"{total / 1024 / 1024:.1f}MB / {cache.max_bytes / 1024 / 1024:.0f}MB")
+    for used, size, entry, manifest in reversed(entries):
+        names = ', '.join(item['name'] for item in manifest['outputs'])
+        print(f"  - {manifest['stage']:<12} {entry.name[:12]}  {size / 1024:,.0f}KB  "
+              f"마지막 사용 {time.strftime('%Y-%m-%d %H:%M', time.localtime(used))}  ({names})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,311 @@
+"""
+COPY 기반 벌크 적재기
+CSV 행을 COPY로 stg_winning_store_rows 스테이징 테이블에 스트리밍한 뒤,
+하나의 트랜잭션 안에서 draws, stores, winning_records로 집합 연산(INSERT ... ON CONFLICT) 병합합니다.
+
+load_data_to_supabase.py --mode copy 로 실행합니다. 로컬 Postgres에서도 동일하게 동작합니다:
+    psql postgresql://localhost/lottomap -f ../supabase_schema.sql
+    DATABASE_URL=postgresql://localhost/lottomap python load_data_to_supabase.py --mode copy
+
+일회용 로컬 DB로 적재/병합 행 수를 확인하려면 check_staging_loader.py를 실행합니다.
+"""
+import csv
+import io
+import os
+import time
+from pathlib import Path
+
+from draw_calendar import draw_date
+from load_rules import compute_source_row_hash, normalize_lottery_type, normalize_rank
+from lottery_csv import iter_rows
+
+STAGING_TABLE = 'stg_winning_store_rows'
+
+STAGING_DDL = f"""
+    CREATE UNLOGGED TABLE IF NOT EXISTS {STAGING_TABLE} (
+        lottery_type TEXT NOT NULL,
+        round_no INT NOT NULL,
+        draw_date DATE NULL,
+        store_source_id TEXT NOT NULL,
+        source_seq INT NULL,
+        store_name TEXT NOT NULL,
+        prize_raw TEXT NOT NULL,
+        rank SMALLINT NOT NULL,
+        method_raw TEXT NULL,
+        address_raw TEXT NOT NULL,
+        region_raw TEXT NULL,
+        phone_raw TEXT NULL,
+        products_raw TEXT NULL,
+        lat DOUBLE PRECISION NULL,
+        lng DOUBLE PRECISION NULL,
+        coord_status TEXT NULL,
+        loaded_at TIMESTAMPTZ DEFAULT now(),
+        source_row_hash VARCHAR(64) UNIQUE
+    );
+"""
+
+STAGING_COLUMNS = (
+    'lottery_type', 'round_no', 'draw_date', 'store_source_id', 'source_seq', 'store_name',
+    'prize_raw', 'rank', 'method_raw', 'address_raw', 'region_raw', 'phone_raw',
+    'products_raw', 'lat', 'lng', 'coord_status', 'source_row_hash',
+)
+
+MERGE_DRAWS_SQL = f"""
+    INSERT INTO draws (round_no, lottery_type, draw_date)
+    SELECT DISTINCT round_no, lottery_type, draw_date
+    FROM {STAGING_TABLE}
+    ON CONFLICT (round_no, lottery_type) DO UPDATE SET
+        draw_date = EXCLUDED.draw_date,
+        updated_at = now()
+    WHERE draws.draw_date IS DISTINCT FROM EXCLUDED.draw_date;
+"""
+
+# 판매점별 최신 회차 행을 기준으로 upsert (load_csv_data와 동일한 규칙)
+MERGE_STORES_SQL = f"""
+    INSERT INTO stores (name, address_raw, address_norm, lat, lng, source_id)
+    SELECT DISTINCT ON (store_source_id)
+        store_name, address_raw, address_raw, lat, lng, store_source_id
+    FROM {STAGING_TABLE}
+    ORDER BY store_source_id, round_no DESC
+    ON CONFLICT (source_id) DO UPDATE SET
+        name = EXCLUDED.name,
+        address_raw = EXCLUDED.address_raw,
+        address_norm = EXCLUDED.address_norm,
+        lat = COALESCE(EXCLUDED.lat, stores.lat),
+        lng = COALESCE(EXCLUDED.lng, stores.lng),
+        updated_at = now()
+    WHERE (stores.name, stores.address_raw, stores.lat, stores.lng)
+          IS DISTINCT FROM
+          (EXCLUDED.name, EXCLUDED.address_raw,
+           COALESCE(EXCLUDED.lat, stores.lat), COALESCE(EXCLUDED.lng, stores.lng));
+"""
+
+# store_id는 source_id 조인으로 서버에서 해석
+MERGE_WINNING_RECORDS_SQL = f"""
+    INSERT INTO winning_records (source_row_hash, draw_id, store_id, lottery_type, rank, method, source_seq, won_at)
+    SELECT
+        stg.source_row_hash,
+        stg.round_no,
+        s.id,
+        stg.lottery_type,
+        stg.rank,
+        CASE btrim(coalesce(stg.method_raw, ''))
+            WHEN '자동' THEN 'AUTO'
+            WHEN '수동' THEN 'MANUAL'
+            WHEN '반자동' THEN 'SEMI'
+            ELSE 'UNKNOWN'
+        END,
+        stg.source_seq,
+        stg.draw_date
+    FROM {STAGING_TABLE} stg
+    JOIN stores s ON s.source_id = stg.store_source_id
+    ON CONFLICT (source_row_hash) DO UPDATE SET
+        store_id = EXCLUDED.store_id,
+        method = EXCLUDED.method,
+        won_at = EXCLUDED.won_at
+    WHERE (winning_records.store_id, winning_records.method, winning_records.won_at)
+          IS DISTINCT FROM (EXCLUDED.store_id, EXCLUDED.method, EXCLUDED.won_at);
+"""
+
+
+def get_database_url():
+    """환경변수 또는 .env.local에서 DATABASE_URL을 읽어옵니다."""
+    database_url = os.getenv('DATABASE_URL') or os.getenv('SUPABASE_DB_URL')
+    if database_url:
+        return database_url
+
+    env_file = Path(__file__).parent.parent / '.env.local'
+    if env_file.exists():
+        try:
+            with open(env_file, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith('#') and '=' in line:
+                        key, value = line.split('=', 1)
+                        key = key.strip()
+                        value = value.strip().strip('"').strip("'")
+                        if key in ('DATABASE_URL', 'SUPABASE_DB_URL'):
+                            return value
+        except PermissionError:
+            pass
+
+    return None
+
+
+class RowStream(io.TextIOBase):
+    """행 이터레이터를 COPY용 CSV 텍스트 스트림으로 변환합니다 (전체를 메모리에 만들지 않음)."""
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator='\n')
+        self._pending = ''
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self._pending) < size:
+            chunk = self._next_chunk()
+            if not chunk:
+                break
+            self._pending += chunk
+        if size < 0:
+            data, self._pending = self._pending, ''
+        else:
+            data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+    def _next_chunk(self, rows_per_chunk: int = 1000) -> str:
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        for _ in range(rows_per_chunk):
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._writer.writerow(row)
+        return self._buffer.getvalue()
+
+
+def _nullable(value):
+    """COPY CSV 형식에서 NULL은 따옴표 없는 빈 값으로 표현됩니다."""
+    return '' if value is None else value
+
+
+def iter_staging_rows(csv_path, stores: dict, stats: dict, watermarks: dict = None):
+    """
+    CSV 행을 스테이징 테이블 컬럼 순서의 튜플로 변환합니다.
+
+    좌표는 검증/보정된 stores 딕셔너리의 값을 사용하고, 같은 source_row_hash가
+    반복되면 첫 행만 사용합니다. watermarks가 주어지면 복권 종류별로 해당 회차 이하는 건너뜁니다.
+    """
+    seen_hashes = set()
+    draw_dates = {}
+    for row in iter_rows(csv_path):
+        round_no = row.round_no
+        lottery_type = normalize_lottery_type(row.lottery_type)
+        if watermarks and round_no <= watermarks.get(lottery_type, 0):
+            continue
+
+        source_id = row.source_id
+        source_seq = row.seq
+        prize_raw = row.prize
+        rank = normalize_rank(prize_raw)
+
+        source_row_hash = compute_source_row_hash(round_no, lottery_type, source_id, rank, source_seq)
+        if source_row_hash in seen_hashes:
+            stats['duplicates'] += 1
+            continue
+        seen_hashes.add(source_row_hash)
+
+        draw_key = (round_no, lottery_type)
+        if draw_key not in draw_dates:
+            draw_dates[draw_key] = draw_date(lottery_type, round_no).isoformat()
+
+        store = stores.get(source_id, {})
+        stats['rows'] += 1
+        yield (
+            lottery_type,
+            round_no,
+            draw_dates[draw_key],
+            source_id,
+            _nullable(source_seq),
+            row.name,
+            prize_raw,
+            rank,
+            row.method,
+            row.address,
+            row.region,
+            row.phone,
+            row.products,
+            _nullable(store.get('lat')),
+            _nullable(store.get('lng')),
+            _nullable(store.get('coord_status')),
+            source_row_hash,
+        )
+
+
+def fetch_db_watermarks(database_url: str) -> dict:
+    """winning_records에서 복권 종류별 최고 회차를 조회합니다."""
+    import psycopg2
+
+    conn = psycopg2.connect(database_url)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT lottery_type, MAX(draw_id)
+                FROM winning_records
+                GROUP BY lottery_type;
+            """)
+            return {row[0]: row[1] for row in cursor.fetchall()}
+    finally:
+        conn.close()
+
+
+def fetch_db_fingerprint(database_url: str) -> dict:
+    """winning_records의 복권 종류별 [행 수, 최고 회차]를 조회합니다 (적재 캐시의 대상 DB 상태 확인용)."""
+    import psycopg2
+
+    conn = psycopg2.connect(database_url)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT lottery_type, COUNT(*), MAX(draw_id)
+                FROM winning_records
+                GROUP BY lottery_type;
+            """)
+            return {row[0]: [row[1], row[2]] for row in cursor.fetchall()}
+    finally:
+        conn.close()
+
+
+def load_via_copy(database_url: str, csv_path, stores: dict, watermarks: dict = None) -> dict:
+    """
+    COPY + 집합 병합으로 CSV 전체를 적재합니다 (단일 트랜잭션).
+
+    Args:
+        database_url: Postgres 접속 URL
+        csv_path: all_lottery_stores.csv 경로
+        stores: load_csv_data/좌표 검증을 거친 source_id -> store_data 딕셔너리
+        watermarks: 복권 종류별 적재 완료 회차 (증분 적재 시)
+
+    Returns:
+        단계별 처리 건수와 소요 시간(ms) 딕셔너리
+    """
+    import psycopg2
+
+    stats = {'rows': 0, 'duplicates': 0, 'timings_ms': {}}
+
+    def timed(stage, fn):
+        started = time.perf_counter()
+        result = fn()
+        stats['timings_ms'][stage] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+    conn = psycopg2.connect(database_url)
+    try:
+        with conn:
+            with conn.cursor() as cursor:
+                cursor.execute(STAGING_DDL)
+                cursor.execute(f"TRUNCATE {STAGING_TABLE};")
+
+                copy_sql = (f"COPY {STAGING_TABLE} ({', '.join(STAGING_COLUMNS)}) "
+                            f"FROM STDIN WITH (FORMAT csv, FORCE_NOT_NULL (store_name, prize_raw, address_raw))")
+                timed('copy', lambda: cursor.copy_expert(
+                    copy_sql, RowStream(iter_staging_rows(csv_path, stores, stats, watermarks))
+                ))
+                cursor.execute(f"ANALYZE {STAGING_TABLE};")
+
+                def merge(sql):
+                    cursor.execute(sql)
+                    return cursor.rowcount
+
+                stats['draws'] = timed('merge_draws', lambda: merge(MERGE_DRAWS_SQL))
+                stats['stores'] = timed('merge_stores', lambda: merge(MERGE_STORES_SQL))
+                stats['winning_records'] = timed('merge_winning_records', lambda: merge(MERGE_WINNING_RECORDS_SQL))
+                cursor.execute(f"TRUNCATE {STAGING_TABLE};")
+    finally:
+        conn.close()
+
+    return stats
+
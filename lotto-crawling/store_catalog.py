@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+판매점 카탈로그 스냅샷 (바이너리, mmap 가능)
+CSV의 당첨 행마다 반복되는 판매점명/주소/취급복권 문자열을 한 번만 저장하고,
+판매점 한 행당 고정 크기 배열(좌표 float64, 당첨 횟수 int32, 문자열 번호 int32)로 만듭니다.
+판매점별 당첨 이력은 회차/종류/등수/방법 배열과 시작 위치(offsets) 표로 저장합니다.
+
+파일 형식 (.lmcat):
+    MAGIC(8바이트) | 헤더 길이(uint32, little-endian) | 헤더 JSON | 배열들 (각 8바이트 정렬)
+    헤더에는 배열 이름별 dtype, shape, offset과 메타데이터가 들어갑니다.
+
+StoreCatalog.open()은 파일을 mmap으로 열고 np.frombuffer로 배열을 만들기 때문에
+복사 없이 필요한 부분만 페이지 단위로 읽습니다.
+
+사용법:
+    python store_catalog.py --csv all_lottery_stores.csv              # store_catalog.lmcat 생성
+    python store_catalog.py --csv all_lottery_stores.csv --show 5      # 생성 후 상위 5개 출력
+"""
+import argparse
+import json
+import mmap
+import struct
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from lottery_csv import read_frame
+from profiling import profiled
+
+MAGIC = b'LMCAT\x00\x00\x01'
+ALIGNMENT = 8
+
+DEFAULT_CATALOG_FILE = 'store_catalog.lmcat'
+
+LOTTERY_TYPE_CODES = ['LOTTO', 'PENSION']
+METHOD_CODES = ['UNKNOWN', 'AUTO', 'MANUAL', 'SEMI']
+COORD_STATUS_CODES = ['OK', 'SWAPPED', 'MISSING', 'OUT_OF_RANGE', 'JUMP']
+
+# 판매점 단위 문자열 컬럼 (문자열 표 번호로 저장)
+STRING_COLUMNS = ('source_id', 'name', 'address', 'region', 'phone', 'products')
+
+
+def intern_strings(columns: dict):
+    """
+    여러 문자열 컬럼을 하나의 문자열 표로 합칩니다.
+
+    Returns:
+        (UTF-8 바이트 배열, 시작 위치 배열(int64, 길이 = 문자열 수 + 1), 컬럼 이름 -> int32 번호 배열)
+    """
+    combined = pd.concat([pd.Series(values, dtype=object) for values in columns.values()], ignore_index=True)
+    codes, uniques = pd.factorize(combined.fillna(''), sort=False)
+    encoded = [s.encode('utf-8') for s in uniques]
+    offsets = np.zeros(len(encoded) + 1, dtype='int64')
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    blob = np.frombuffer(b''.join(encoded), dtype='uint8')
+
+    indices = {}
+    start = 0
+    for name, values in columns.items():
+        indices[name] = codes[start:start + len(values)].astype('int32')
+        start += len(values)
+    return blob, offsets, indices
+
+
+def build_catalog_arrays(csv_path) -> dict:
+    """
+    CSV에서 카탈로그 배열을 만듭니다.
+
+    판매점 정보는 최신 회차 행(load_csv_data와 동일), 좌표는 coordinate_validation 결과를 사용합니다.
+    판매점은 source_id 순으로 정렬되고, 이력은 판매점 → 복권 종류 → 회차 순입니다.
+    """
+    from coordinate_validation import latest_store_coordinates, read_coordinate_frame, validate_coordinates
+    from load_rules import normalize_method, normalize_rank
+
+    df = read_frame(csv_path)
+
+    rows = pd.DataFrame({
+        'source_id': df['판매점ID'].str.strip(),
+        'round': df['회차'].astype('int32'),
+        'type': np.where(df['복권종류'].astype(str).str.strip().str.lower() == 'lotto', 0, 1).astype('uint8'),
+        'rank': df['등수'].map(normalize_rank).astype('int8'),
+        'method': df['자동수동'].map(normalize_method).map(METHOD_CODES.index).astype('uint8'),
+        'seq': df['번호'].fillna(-1).astype('int32'),
+    })
+
+    latest = df.assign(source_id=rows['source_id'], round=rows['round'])
+    latest = latest.sort_values('round', kind='mergesort').drop_duplicates('source_id', keep='last')
+    latest = latest.sort_values('source_id', kind='mergesort').set_index('source_id')
+    store_index = pd.Index(latest.index)
+
+    coords = latest_store_coordinates(validate_coordinates(read_coordinate_frame(csv_path)))
+    coords = coords.reindex(store_index)
+
+    # 이력: 판매점 순번으로 정렬하고 시작 위치 표를 만듦
+    rows['store'] = store_index.get_indexer(rows['source_id'])
+    rows = rows.sort_values(['store', 'type', 'round', 'seq'], kind='mergesort')
+    history_offsets = np.zeros(len(store_index) + 1, dtype='int64')
+    np.cumsum(np.bincount(rows['store'].to_numpy(), minlength=len(store_index)), out=history_offsets[1:])
+
+    def count(type_code, rank):
+        matched = rows.loc[(rows['type'] == type_code) & (rows['rank'] == rank), 'store'].to_numpy()
+        return np.bincount(matched, minlength=len(store_index)).astype('int32')
+
+    strings, string_offsets, indices = intern_strings({
+        'source_id': store_index.to_numpy(dtype=object),
+        'name': latest['판매점명'].str.strip().to_numpy(dtype=object),
+        'address': latest['주소'].str.strip().to_numpy(dtype=object),
+        'region': latest['지역'].str.strip().to_numpy(dtype=object),
+        'phone': latest['전화번호'].str.strip().to_numpy(dtype=object),
+        'products': latest['취급복권'].str.strip().to_numpy(dtype=object),
+    })
+
+    arrays = {
+        'lat': coords['lat'].to_numpy(dtype='float64'),
+        'lng': coords['lng'].to_numpy(dtype='float64'),
+        'coord_status': coords['coord_status'].map(COORD_STATUS_CODES.index).to_numpy(dtype='uint8'),
+        'lotto1': count(0, 1),
+        'lotto2': count(0, 2),
+        'pension': count(1, 1),
+        'last_round': latest['round'].to_numpy(dtype='int32'),
+        'history_offsets': history_offsets,
+        'history_round': rows['round'].to_numpy(),
+        'history_type': rows['type'].to_numpy(),
+        'history_rank': rows['rank'].to_numpy(),
+        'history_method': rows['method'].to_numpy(),
+        'history_seq': rows['seq'].to_numpy(),
+        'strings': strings,
+        'string_offsets': string_offsets,
+    }
+    arrays.update({f'{name}_idx': values for name, values in indices.items()})
+    return arrays
+
+
+def write_catalog(path, arrays: dict, meta: dict = None):
+    """배열들을 .lmcat 파일 하나로 저장합니다 (임시 파일에 쓴 뒤 교체)."""
+    layout = {}
+    offset = 0
+    for name, values in arrays.items():
+        values = np.ascontiguousarray(values)
+        offset = (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+        layout[name] = {'dtype': values.dtype.newbyteorder('<').str, 'shape': list(values.shape), 'offset': offset}
+        offset += values.nbytes
+
+    header = json.dumps({'arrays': layout, 'meta': meta or {}}, ensure_ascii=False).encode('utf-8')
+    # 배열 영역 시작을 정렬 경계에 맞춤
+    prefix_length = len(MAGIC) + 4 + len(header)
+    header += b' ' * ((-prefix_length) % ALIGNMENT)
+
+    path = Path(path)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<I', len(header)))
+        f.write(header)
+        base = f.tell()
+        for name, values in arrays.items():
+            f.write(b'\x00' * (base + layout[name]['offset'] - f.tell()))
+            f.write(np.ascontiguousarray(values).astype(layout[name]['dtype'], copy=False).tobytes())
+    tmp_path.replace(path)
+
+
+class StoreCatalog:
+    """
+    .lmcat 카탈로그 읽기 (mmap)
+
+    배열은 읽기 전용 numpy 뷰로 노출됩니다 (예: catalog.lat, catalog.lotto1).
+    """
+
+    def __init__(self, buffer, arrays: dict, meta: dict, closer=None):
+        self._buffer = buffer
+        self._arrays = arrays
+        self.meta = meta
+        self._closer = closer
+        self._source_index = None
+
+    @classmethod
+    def open(cls, path) -> 'StoreCatalog':
+        f = open(path, 'rb')
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        finally:
+            f.close()
+        if buffer[:len(MAGIC)] != MAGIC:
+            buffer.close()
+            raise ValueError(f"카탈로그 파일 형식이 아닙니다: {path}")
+        (header_length,) = struct.unpack_from('<I', buffer, len(MAGIC))
+        header_start = len(MAGIC) + 4
+        header = json.loads(bytes(buffer[header_start:header_start + header_length]).decode('utf-8'))
+        base = header_start + header_length
+
+        arrays = {}
+        for name, spec in header['arrays'].items():
+            dtype = np.dtype(spec['dtype'])
+            count = int(np.prod(spec['shape'])) if spec['shape'] else 1
+            arrays[name] = np.frombuffer(buffer, dtype=dtype, count=count,
+                                         offset=base + spec['offset']).reshape(spec['shape'])
+        return cls(buffer, arrays, header['meta'], closer=buffer.close)
+
+    def close(self):
+        self._arrays = {}
+        if self._closer is not None:
+            try:
+                self._closer()
+            except BufferError:
+                # 호출한 쪽이 아직 배열 뷰를 들고 있으면 mmap은 GC 시점에 닫힘
+                pass
+            self._closer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getattr__(self, name):
+        arrays = self.__dict__.get('_arrays', {})
+        if name in arrays:
+            return arrays[name]
+        raise AttributeError(name)
+
+    def __len__(self):
+        return len(self._arrays['lat'])
+
+    def string(self, index: int) -> str:
+        """문자열 표의 index번째 문자열."""
+        start, end = self.string_offsets[index], self.string_offsets[index + 1]
+        return bytes(self.strings[start:end]).decode('utf-8')
+
+    def column(self, name: str, positions=None) -> list:
+        """문자열 컬럼(STRING_COLUMNS)의 값 목록."""
+        indices = self._arrays[f'{name}_idx']
+        if positions is not None:
+            indices = indices[positions]
+        return [self.string(i) for i in indices]
+
+    def find(self, source_id: str) -> int:
+        """source_id의 행 번호 (없으면 -1). 판매점이 source_id 순으로 정렬되어 있어 이분 탐색합니다."""
+        if self._source_index is None:
+            self._source_index = self.column('source_id')
+        lo, hi = 0, len(self._source_index)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._source_index[mid] < source_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < len(self._source_index) and self._source_index[lo] == source_id else -1
+
+    def store(self, position: int) -> dict:
+        """판매점 한 행을 딕셔너리로 반환합니다."""
+        record = {name: self.string(self._arrays[f'{name}_idx'][position]) for name in STRING_COLUMNS}
+        lat, lng = float(self.lat[position]), float(self.lng[position])
+        record.update({
+            'lat': None if np.isnan(lat) else lat,
+            'lng': None if np.isnan(lng) else lng,
+            'coord_status': COORD_STATUS_CODES[self.coord_status[position]],
+            'lotto1': int(self.lotto1[position]),
+            'lotto2': int(self.lotto2[position]),
+            'pension': int(self.pension[position]),
+            'last_round': int(self.last_round[position]),
+        })
+        return record
+
+    def history(self, position: int) -> list:
+        """판매점의 당첨 이력 (복권 종류, 회차 순)."""
+        start, end = self.history_offsets[position], self.history_offsets[position + 1]
+        return [
+            {
+                'lottery_type': LOTTERY_TYPE_CODES[t],
+                'round_no': int(r),
+                'rank': int(k),
+                'method': METHOD_CODES[m],
+                'source_seq': None if s < 0 else int(s),
+            }
+            for r, t, k, m, s in zip(self.history_round[start:end], self.history_type[start:end],
+                                     self.history_rank[start:end], self.history_method[start:end],
+                                     self.history_seq[start:end])
+        ]
+
+
+@profiled('store-catalog')
+def main():
+    parser = argparse.ArgumentParser(description='판매점 카탈로그 스냅샷 생성')
+    parser.add_argument('--csv', type=str, default='all_lottery_stores.csv', help='원본 CSV 파일')
+    parser.add_argument('--output', type=str, default=DEFAULT_CATALOG_FILE,
+                        help=f'카탈로그 파일 경로 (기본값: {DEFAULT_CATALOG_FILE})')
+    parser.add_argument('--show', type=int, default=0, help='생성 후 로또 1등 상위 N개 출력')
+    args = parser.parse_args()
+
+    csv_path = Path(args.csv)
+    if not csv_path.is_absolute():
+        csv_path = Path(__file__).parent / csv_path
+    if not csv_path.exists():
+        print(f"❌ CSV 파일을 찾을 수 없습니다: {csv_path}")
+        sys.exit(1)
+    output_path = Path(args.output)
+    if not output_path.is_absolute():
+        output_path = Path(__file__).parent / output_path
+
+    print("=" * 60)
+    print("판매점 카탈로그 스냅샷 생성")
+    print("=" * 60)
+
+    started = time.perf_counter()
+    arrays = build_catalog_arrays(csv_path)
+    write_catalog(output_path, arrays, meta={
+        'source': csv_path.name,
+        'built_at': datetime.now().isoformat(timespec='seconds'),
+    })
+    build_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with StoreCatalog.open(output_path) as catalog:
+        open_ms = (time.perf_counter() - started) * 1000
+        print(f"\n  ✅ 판매점 {len(catalog):,}개, 당첨 이력 {len(catalog.history_round):,}건, "
+              f"문자열 {len(catalog.string_offsets) - 1:,}개")
+        print(f"  - 파일 크기: {output_path.stat().st_size / 1024:,.1f}KB "
+              f"(CSV {csv_path.stat().st_size / 1024:,.1f}KB)")
+        print(f"  - 생성 {build_ms:.0f}ms, 열기 {open_ms:.2f}ms")
+        print(f"  💾 저장: {output_path}")
+
+        if args.show:
+            print(f"\n로또 1등 Top {args.show}:")
+            order = np.lexsort((-catalog.lotto2, -catalog.lotto1))[:args.show]
+            for rank, position in enumerate(order, 1):
+                store = catalog.store(position)
+                print(f"  {rank}. {store['name']} (1등 {store['lotto1']}회, 2등 {store['lotto2']}회) - {store['address'][:30]}")
+
+
+if __name__ == '__main__':
+    main()
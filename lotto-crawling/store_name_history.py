@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+판매점명 변경 이력 기록 스크립트
+CSV의 판매점별 당첨 행을 추첨일 순으로 훑어 이름이 바뀐 회차를 store_name_history에 기록합니다.
+
+- 이름 비교는 원문 기준이고, 정규화한 이름(공백/괄호/기호 제거, 영문 소문자)이 같으면
+  형식 차이로 보고 is_significant_change = false로 기록합니다.
+- (store_id, drw_no, lottery_type, new_name)이 이미 있는 행은 다시 넣지 않으므로 재실행해도 안전합니다.
+- stores.id가 필요하므로 적재(load_data_to_supabase.py) 이후에 실행합니다.
+
+사용법:
+    python store_name_history.py                              # all_lottery_stores.csv 기준
+    python store_name_history.py --csv lotto_all_rounds.csv
+    python store_name_history.py --dry-run                    # DB 없이 변경 건수만 출력
+"""
+import argparse
+import os
+import re
+import sys
+import unicodedata
+from pathlib import Path
+
+from draw_calendar import draw_date_map
+from job_runs import instrumented, job_stage
+from lottery_csv import iter_rows
+
+DEFAULT_CSV = Path(__file__).parent / 'all_lottery_stores.csv'
+
+# 공백, 괄호, 구분 기호는 형식 차이로 봅니다
+_NAME_NOISE = re.compile(r"[\s()\[\]{}<>·.,'\"_\-/&+]+")
+
+INSERT_HISTORY_SQL = """
+    INSERT INTO store_name_history (
+        store_id, old_name, new_name, old_name_normalized, new_name_normalized,
+        drw_no, lottery_type, is_significant_change
+    )
+    SELECT s.id, c.old_name, c.new_name, c.old_norm, c.new_norm, c.drw_no, c.lottery_type, c.significant
+    FROM unnest(%(source_ids)s::text[], %(old_names)s::text[], %(new_names)s::text[],
+                %(old_norms)s::text[], %(new_norms)s::text[], %(rounds)s::int[],
+                %(types)s::text[], %(significant)s::boolean[])
+         AS c(source_id, old_name, new_name, old_norm, new_norm, drw_no, lottery_type, significant)
+    JOIN stores s ON s.source_id = c.source_id
+    WHERE NOT EXISTS (
+        SELECT 1 FROM store_name_history h
+        WHERE h.store_id = s.id AND h.drw_no = c.drw_no
+          AND h.lottery_type = c.lottery_type AND h.new_name = c.new_name
+    );
+"""
+
+
+def get_database_url():
+    """환경변수 또는 .env.local에서 DATABASE_URL을 읽어옵니다."""
+    database_url = os.getenv('DATABASE_URL') or os.getenv('SUPABASE_DB_URL')
+    if database_url:
+        return database_url
+
+    env_file = Path(__file__).parent.parent / '.env.local'
+    if env_file.exists():
+        try:
+            with open(env_file, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith('#') and '=' in line:
+                        key, value = line.split('=', 1)
+                        key = key.strip()
+                        value = value.strip().strip('"').strip("'")
+                        if key in ('DATABASE_URL', 'SUPABASE_DB_URL'):
+                            return value
+        except PermissionError:
+            pass
+
+    return None
+
+
+def normalize_store_name(name: str) -> str:
+    """비교용 판매점명 (NFKC, 공백/괄호/기호 제거, 영문 소문자)."""
+    return _NAME_NOISE.sub('', unicodedata.normalize('NFKC', name)).lower()
+
+
+def collect_name_changes(csv_path) -> list:
+    """
+    판매점별로 당첨 행을 추첨일 순으로 정렬해 이름이 바뀐 지점을 찾습니다.
+
+    Returns:
+        (source_id, old_name, new_name, drw_no, lottery_type) 목록 (drw_no는 새 이름이 처음 나온 회차)
+    """
+    sightings = {}  # source_id -> {(lottery_type, round_no): name}
+    for row in iter_rows(csv_path):
+        name = row.name.strip()
+        if row.source_id and name:
+            sightings.setdefault(row.source_id, {})[(row.lottery_type.upper(), row.round_no)] = name
+
+    draw_dates = draw_date_map({(round_no, lottery_type)
+                                for names in sightings.values() for lottery_type, round_no in names})
+    changes = []
+    for source_id, names in sightings.items():
+        ordered = sorted(names.items(), key=lambda item: (draw_dates[(item[0][1], item[0][0])], item[0]))
+        previous = None
+        for (lottery_type, round_no), name in ordered:
+            if previous is not None and name != previous:
+                changes.append((source_id, previous, name, round_no, lottery_type))
+            previous = name
+    return changes
+
+
+def insert_name_changes(cursor, changes: list) -> int:
+    """변경 이력을 store_name_history에 넣고 새로 들어간 행 수를 돌려줍니다."""
+    if not changes:
+        return 0
+    old_norms = [normalize_store_name(old) for _, old, _, _, _ in changes]
+    new_norms = [normalize_store_name(new) for _, _, new, _, _ in changes]
+    cursor.execute(INSERT_HISTORY_SQL, {
+        'source_ids': [c[0] for c in changes],
+        'old_names': [c[1] for c in changes],
+        'new_names': [c[2] for c in changes],
+        'old_norms': old_norms,
+        'new_norms': new_norms,
+        'rounds': [c[3] for c in changes],
+        'types': [c[4] for c in changes],
+        'significant': [old != new for old, new in zip(old_norms, new_norms)],
+    })
+    return cursor.rowcount
+
+
+@instrumented('store-name-history')
+def main():
+    parser = argparse.ArgumentParser(description='판매점명 변경 이력 기록')
+    parser.add_argument('--csv', type=Path, default=DEFAULT_CSV,
+                        help=f'입력 CSV (기본값: {DEFAULT_CSV.name})')
+    parser.add_argument('--dry-run', action='store_true', help='DB에 쓰지 않고 변경 건수만 출력')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("판매점명 변경 이력 기록")
+    print("=" * 60)
+
+    if not args.csv.exists():
+        print(f"❌ CSV 파일을 찾을 수 없습니다: {args.csv}")
+        sys.exit(1)
+
+    with job_stage('collect') as stage:
+        changes = collect_name_changes(args.csv)
+        stage.records = len(changes)
+    significant = sum(1 for _, old, new, _, _ in changes
+                      if normalize_store_name(old) != normalize_store_name(new))
+    print(f"\n📊 이름 변경 {len(changes):,}건 (의미있는 변경 {significant:,}건)")
+    for source_id, old, new, round_no, lottery_type in changes[:5]:
+        print(f"  - {source_id} {lottery_type} {round_no}회: {old} → {new}")
+
+    if args.dry_run:
+        return
+
+    database_url = get_database_url()
+    if not database_url:
+        print("❌ DATABASE_URL 환경변수를 찾을 수 없습니다.")
+        sys.exit(1)
+
+    try:
+        import psycopg2
+    except ImportError:
+        print("❌ psycopg2가 설치되지 않았습니다.")
+        sys.exit(1)
+
+    print(f"\n🔗 데이터베이스 연결 중...")
+    conn = psycopg2.connect(database_url)
+    try:
+        with job_stage('insert') as stage, conn, conn.cursor() as cursor:
+            stage.records = insert_name_changes(cursor, changes)
+        print(f"  ✅ 새 이력 {stage.records:,}건 기록 (기존 이력은 건너뜀)")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
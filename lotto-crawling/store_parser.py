@@ -0,0 +1,138 @@
+"""
+당첨 판매점 HTML 파싱 (프로세스 풀)
+크롤러마다 복사되어 있던 .store-box 추출 로직을 한 곳에 모으고, 파싱을 별도 프로세스에서 실행합니다.
+
+BeautifulSoup 파싱은 순수 Python이라 asyncio 루프 안에서 돌리면 큰 페이지를 파싱하는 동안
+다른 워커의 페이지 이동/대기가 모두 멈춥니다. parse_stores()는 HTML을 UTF-8 바이트로 넘겨
+프로세스 풀에서 파싱하고, 판매점마다 값 튜플(compact record)만 돌려받아 dict로 바꿉니다.
+그동안 루프는 다른 페이지 작업을 계속합니다.
+
+- 워커 수: LOTTOMAP_PARSE_WORKERS (기본값: CPU 수, 최대 4). 0이면 풀 없이 현재 프로세스에서 파싱
+- 풀은 처음 파싱할 때 spawn 방식으로 만듭니다 (Playwright 스레드가 도는 프로세스를 fork하지 않도록).
+- 풀 프로세스가 죽으면 풀을 다시 만들고 해당 페이지는 현재 프로세스에서 파싱합니다.
+"""
+import asyncio
+import atexit
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+from bs4 import BeautifulSoup
+
+PARSE_WORKERS_ENV = 'LOTTOMAP_PARSE_WORKERS'
+MAX_DEFAULT_WORKERS = 4
+
+# compact record 순서 (크롤러 dict의 '회차' 다음 컬럼들, 크롤링시간 제외)
+STORE_FIELDS = ('판매점ID', '번호', '판매점명', '등수', '자동수동', '지역', '주소', '전화번호', '취급복권', '위도', '경도')
+
+_pool = None
+
+
+def _text(store_box, selector: str) -> str:
+    elem = store_box.select_one(selector)
+    return elem.text.strip() if elem else ''
+
+
+def extract_store_records(soup: BeautifulSoup) -> list:
+    """soup의 .store-box마다 STORE_FIELDS 순서의 튜플을 만듭니다 (ID/이름 없는 항목은 건너뜀)."""
+    records = []
+    for store_box in soup.select('.store-box'):
+        try:
+            store_id = store_box.get('data-ltshpid', '')
+            store_name = _text(store_box, '.store-loc')
+            if not store_id or not store_name:
+                continue
+
+            lat_input = store_box.select_one('input.shpLat')
+            lon_input = store_box.select_one('input.shpLot')
+
+            # 지역은 .tit-detail의 "(숫자)" 앞부분
+            region = _text(store_box, '.tit-detail').split('(')[0].strip()
+
+            records.append((
+                store_id,
+                _text(store_box, '.store-num'),
+                store_name,
+                _text(store_box, '.draw-rank'),
+                _text(store_box, '.draw-opt'),
+                region,
+                _text(store_box, '.store-addr'),
+                _text(store_box, '.store-tel'),
+                ', '.join(badge.text.strip() for badge in store_box.select('.txt-bagge')),
+                lat_input.get('value', '') if lat_input else '',
+                lon_input.get('value', '') if lon_input else '',
+            ))
+        except Exception:
+            continue
+    return records
+
+
+def parse_store_html(html: bytes) -> list:
+    """풀 프로세스에서 실행되는 파싱 함수 (HTML 바이트 → compact record 목록)."""
+    return extract_store_records(BeautifulSoup(html, 'html.parser', from_encoding='utf-8'))
+
+
+def to_store_dicts(records, round_num: str = None) -> list:
+    """compact record를 크롤러 CSV 행 dict로 바꿉니다 (round_num이 있으면 '회차'를 첫 컬럼으로)."""
+    crawled_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    stores = []
+    for record in records:
+        store = {'회차': round_num} if round_num is not None else {}
+        store.update(zip(STORE_FIELDS, record))
+        store['크롤링시간'] = crawled_at
+        stores.append(store)
+    return stores
+
+
+def parse_workers() -> int:
+    value = os.getenv(PARSE_WORKERS_ENV, '').strip()
+    if value:
+        return max(0, int(value))
+    return max(1, min(MAX_DEFAULT_WORKERS, os.cpu_count() or 1))
+
+
+def get_parse_pool():
+    """파싱 프로세스 풀 (LOTTOMAP_PARSE_WORKERS=0이면 None)."""
+    global _pool
+    if _pool is None:
+        workers = parse_workers()
+        if workers == 0:
+            return None
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        atexit.register(shutdown_parse_pool)
+    return _pool
+
+
+def shutdown_parse_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+
+
+async def parse_stores(html: str, round_num: str = None) -> list:
+    """
+    페이지 HTML에서 판매점 목록을 추출합니다 (파싱은 프로세스 풀에서 실행).
+
+    Args:
+        html: page.content() 결과
+        round_num: 회차 (있으면 각 행에 '회차' 컬럼 추가)
+
+    Returns:
+        판매점 정보 dict 리스트 (기존 _extract_stores와 같은 컬럼 순서)
+    """
+    global _pool
+    data = html.encode('utf-8')
+    pool = get_parse_pool()
+    if pool is None:
+        records = parse_store_html(data)
+    else:
+        try:
+            records = await asyncio.get_running_loop().run_in_executor(pool, parse_store_html, data)
+        except BrokenProcessPool:
+            print("⚠️  파싱 프로세스 풀 오류 - 풀을 다시 만들고 현재 프로세스에서 파싱합니다.")
+            _pool = None
+            records = parse_store_html(data)
+    return to_store_dicts(records, round_num)
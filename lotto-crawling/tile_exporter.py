@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+지도 프론트엔드용 정적 타일 내보내기
+stores, store_stats와 최근 winning_records(또는 CSV)로 z/x/y 타일 JSON과 지역별 랭킹 샤드를 만듭니다.
+CDN이나 정적 호스팅에 그대로 올려 브라우저가 화면에 필요한 타일만 받도록 합니다.
+
+- 상세 줌(--tile-zoom, 기본 12) 타일: types.ts의 Store 형태 (wins, 최근 history, primaryCategory 포함)
+- 그보다 낮은 줌 타일: marker_clusters.py의 클러스터 점
+- 랭킹 샤드: 시/도별 판매점 목록을 1등 합계 순으로 정렬 (시/군/구 필터는 샤드 안에서 처리)
+- 파일명에 내용 해시를 붙이므로(예: tiles/12/3490/1587.1a2b3c4d5e6f.json) 오래 캐시해도 안전합니다.
+  manifest.json만 짧게 캐시하면 됩니다.
+- 각 파일 옆에 .gz(항상)와 .br(brotli 패키지가 있을 때) 사전 압축본을 둡니다.
+- manifest.json을 쓴 뒤 새 manifest와 직전 manifest 어디에도 없는 파일(압축본 포함)은 지웁니다.
+  직전 세대를 남겨 두므로 이전 manifest를 캐시한 브라우저도 한 번의 갱신 주기 동안은 타일을 받을 수 있습니다.
+
+사용법:
+    python tile_exporter.py --source csv --csv all_lottery_stores.csv
+    python tile_exporter.py --source db --output-dir map_export --history-days 365
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from lottery_csv import read_frame
+from marker_clusters import CLUSTER_COLUMNS, TILE_SIZE, build_clusters, cluster_rows, mercator_pixels
+from profiling import profiled
+from spatial_index import get_database_url
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_OUTPUT_DIR = 'map_export'
+DEFAULT_MIN_ZOOM = 5
+DEFAULT_TILE_ZOOM = 12
+DEFAULT_HISTORY_DAYS = 365
+DEFAULT_HISTORY_LIMIT = 20
+
+HASH_LENGTH = 12
+
+# winning_records.method -> types.ts LottoMethod 값
+METHOD_LABELS = {'AUTO': '자동', 'MANUAL': '수동', 'SEMI': '반자동'}
+
+RANKING_COLUMNS = ['id', 'name', 'address', 'district', 'lotto1', 'lotto2', 'pension']
+
+# write_hashed가 쓰는 하위 디렉터리 (정리 대상)
+HASHED_DIRS = ('tiles', 'rankings')
+COMPRESSED_SUFFIXES = ('.gz', '.br')
+
+
+def load_export_data_from_csv(csv_path, history_since: date):
+    """
+    CSV에서 판매점 정보와 최근 당첨 이력을 읽습니다.
+
+    Returns:
+        (stores DataFrame, history DataFrame) 튜플
+        stores: id, name, address, lat, lng, lotto1, lotto2, pension
+        history: store_id, id, type, round, rank, method, date (won_at 내림차순)
+    """
+    from coordinate_validation import (
+        SUSPECT_STATUSES, latest_store_coordinates, read_coordinate_frame, validate_coordinates,
+    )
+    from draw_calendar import draw_dates
+    from load_rules import normalize_rank
+
+    df = read_frame(csv_path, columns=['회차', '판매점ID', '번호', '판매점명', '등수', '자동수동', '주소'])
+    rows = pd.DataFrame({
+        'store_id': df['판매점ID'].str.strip(),
+        'name': df['판매점명'].str.strip(),
+        'address': df['주소'].str.strip(),
+        'type': np.where(df['복권종류'].astype(str).str.strip().str.lower() == 'lotto', 'LOTTO', 'PENSION'),
+        'round': df['회차'].astype('int64'),
+        'rank': df['등수'].map(normalize_rank).astype('int64'),
+        'method': df['자동수동'].astype(str).str.strip(),
+        'seq': df['번호'].astype('string').fillna(''),
+    })
+    rows['won_at'] = draw_dates(rows['type'].to_numpy(), rows['round'].to_numpy())
+
+    # 판매점 정보는 최신 회차 행 기준 (load_csv_data와 동일), 좌표는 검증/보정 결과 사용
+    latest = rows.sort_values('round', kind='mergesort').drop_duplicates('store_id', keep='last')
+    coords = latest_store_coordinates(validate_coordinates(read_coordinate_frame(csv_path)))
+    coords = coords[~coords['coord_status'].isin(SUSPECT_STATUSES)]
+    stores = latest.set_index('store_id')[['name', 'address']].join(coords[['lat', 'lng']], how='inner')
+
+    for (lottery_type, rank), column in (('LOTTO', 1), 'lotto1'), (('LOTTO', 2), 'lotto2'), (('PENSION', 1), 'pension'):
+        matched = rows.loc[(rows['type'] == lottery_type) & (rows['rank'] == rank), 'store_id']
+        stores[column] = matched.value_counts().reindex(stores.index, fill_value=0).astype('int64')
+    stores = stores.rename_axis('id').reset_index()
+
+    recent = rows[rows['won_at'] >= np.datetime64(history_since, 'D')]
+    history = pd.DataFrame({
+        'store_id': recent['store_id'],
+        'id': recent['type'].str[0].str.lower() + '-' + recent['round'].astype(str) + '-' + recent['seq'],
+        'type': recent['type'],
+        'round': recent['round'],
+        'rank': recent['rank'],
+        'method': recent['method'],
+        'date': recent['won_at'],
+    })
+    return stores, history.sort_values('date', ascending=False, kind='mergesort')
+
+
+def load_export_data_from_db(cursor, history_since: date):
+    """
+    stores + store_stats와 최근 winning_records를 읽습니다 (load_export_data_from_csv와 같은 형태).
+    """
+    cursor.execute("""
+        SELECT s.id::text, s.name, s.address_raw, s.lat, s.lng,
+               COALESCE(ss.total_lotto_first_prize, 0),
+               COALESCE(ss.total_lotto_second_prize, 0),
+               COALESCE(ss.total_pension_first_prize, 0)
+        FROM stores s
+        LEFT JOIN store_stats ss ON ss.store_id = s.id
+        WHERE s.lat IS NOT NULL AND s.lng IS NOT NULL AND s.is_active;
+    """)
+    stores = pd.DataFrame(cursor.fetchall(),
+                          columns=['id', 'name', 'address', 'lat', 'lng', 'lotto1', 'lotto2', 'pension'])
+
+    cursor.execute("""
+        SELECT wr.store_id::text, left(wr.source_row_hash, 12), wr.lottery_type, wr.draw_id, wr.rank,
+               wr.method, wr.won_at
+        FROM winning_records wr
+        WHERE wr.won_at >= %s
+        ORDER BY wr.won_at DESC, wr.draw_id DESC;
+    """, (history_since,))
+    history = pd.DataFrame(cursor.fetchall(),
+                           columns=['store_id', 'id', 'type', 'round', 'rank', 'method', 'date'])
+    history['method'] = history['method'].map(METHOD_LABELS).fillna('')
+    history['date'] = pd.to_datetime(history['date']).to_numpy(dtype='datetime64[D]')
+    return stores, history
+
+
+def write_hashed(output_dir: Path, stem: str, payload) -> str:
+    """
+    payload를 내용 해시가 붙은 파일명으로 저장하고 사전 압축본을 함께 씁니다.
+
+    같은 내용이면 같은 파일명이 되므로 이미 있으면 다시 쓰지 않습니다.
+
+    Returns:
+        output_dir 기준 상대 경로 (예: 'tiles/12/3490/1587.1a2b3c4d5e6f.json')
+    """
+    data = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    relative = f"{stem}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}.json"
+    path = output_dir / relative
+    if path.exists():
+        return relative
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    # mtime=0으로 고정해 같은 입력이면 압축 결과도 바이트 단위로 같게 유지
+    path.with_name(path.name + '.gz').write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        path.with_name(path.name + '.br').write_bytes(brotli.compress(data))
+    return relative
+
+
+def manifest_files(manifest: dict) -> set:
+    """manifest가 가리키는 파일(사전 압축본 포함)의 output_dir 기준 상대 경로 집합."""
+    files = set()
+    for relative in [*manifest.get('tiles', {}).values(), *manifest.get('rankings', {}).values()]:
+        files.add(relative)
+        files.update(relative + suffix for suffix in COMPRESSED_SUFFIXES)
+    return files
+
+
+def read_manifest(output_dir: Path) -> dict:
+    path = output_dir / 'manifest.json'
+    if not path.exists():
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def prune_unreferenced(output_dir: Path, keep: set) -> int:
+    """
+    tiles/, rankings/ 아래에서 keep에 없는 파일을 지우고 빈 디렉터리를 정리합니다.
+
+    Returns:
+        지운 파일 수
+    """
+    removed = 0
+    for name in HASHED_DIRS:
+        root = output_dir / name
+        if not root.exists():
+            continue
+        for path in sorted(root.rglob('*'), reverse=True):
+            if path.is_dir():
+                if not any(path.iterdir()):
+                    path.rmdir()
+            elif path.relative_to(output_dir).as_posix() not in keep:
+                path.unlink()
+                removed += 1
+    return removed
+
+
+def tile_coordinates(lat, lng, zoom: int):
+    """위도/경도 배열의 z/x/y 타일 번호를 계산합니다."""
+    x, y = mercator_pixels(lat, lng, zoom)
+    return (x // TILE_SIZE).astype('int64'), (y // TILE_SIZE).astype('int64')
+
+
+def store_records(stores: pd.DataFrame, history: pd.DataFrame, history_limit: int) -> list:
+    """판매점 행을 types.ts의 Store 형태 딕셔너리로 변환합니다."""
+    grouped = {}
+    for record in history.itertuples(index=False):
+        records = grouped.setdefault(record.store_id, [])
+        if len(records) >= history_limit:
+            continue
+        entry = {
+            'id': record.id,
+            'type': record.type,
+            'round': int(record.round),
+            'rank': int(record.rank),
+            'date': pd.Timestamp(record.date).strftime('%Y.%m.%d'),
+        }
+        if record.type == 'LOTTO' and record.method:
+            entry['method'] = record.method
+        records.append(entry)
+
+    result = []
+    for store in stores.itertuples(index=False):
+        result.append({
+            'id': store.id,
+            'name': store.name,
+            'address': store.address,
+            'lat': round(float(store.lat), 6),
+            'lng': round(float(store.lng), 6),
+            'wins': {'lotto1': int(store.lotto1), 'lotto2': int(store.lotto2), 'pension': int(store.pension)},
+            'history': grouped.get(store.id, []),
+            'primaryCategory': 'PENSION' if store.pension > store.lotto1 + store.lotto2 else 'LOTTO',
+        })
+    return result
+
+
+def export_tiles(stores: pd.DataFrame, history: pd.DataFrame, output_dir: Path,
+                 min_zoom: int = DEFAULT_MIN_ZOOM, tile_zoom: int = DEFAULT_TILE_ZOOM,
+                 history_limit: int = DEFAULT_HISTORY_LIMIT) -> dict:
+    """
+    클러스터 타일(min_zoom..tile_zoom-1)과 판매점 타일(tile_zoom)을 씁니다.
+
+    Returns:
+        'z/x/y' -> 상대 경로 딕셔너리
+    """
+    tiles = {}
+    wins = {name: stores[name].to_numpy() for name in ('lotto1', 'lotto2', 'pension')}
+    levels = build_clusters(stores['id'].to_numpy(), stores['lat'].to_numpy(), stores['lng'].to_numpy(), wins,
+                            min_zoom=min_zoom, max_zoom=tile_zoom)
+
+    for zoom in range(min_zoom, tile_zoom):
+        cluster = levels[zoom]
+        rows = cluster_rows(cluster)
+        xs, ys = tile_coordinates(cluster['lat'], cluster['lng'], zoom)
+        by_tile = {}
+        for row, x, y in zip(rows, xs.tolist(), ys.tolist()):
+            by_tile.setdefault((x, y), []).append(row)
+        for (x, y), tile_rows in by_tile.items():
+            key = f"{zoom}/{x}/{y}"
+            tiles[key] = write_hashed(output_dir, f"tiles/{key}",
+                                      {'z': zoom, 'x': x, 'y': y, 'columns': CLUSTER_COLUMNS, 'rows': tile_rows})
+
+    records = store_records(stores, history, history_limit)
+    xs, ys = tile_coordinates(stores['lat'].to_numpy(), stores['lng'].to_numpy(), tile_zoom)
+    by_tile = {}
+    for record, x, y in zip(records, xs.tolist(), ys.tolist()):
+        by_tile.setdefault((x, y), []).append(record)
+    for (x, y), tile_stores in by_tile.items():
+        key = f"{tile_zoom}/{x}/{y}"
+        tiles[key] = write_hashed(output_dir, f"tiles/{key}",
+                                  {'z': tile_zoom, 'x': x, 'y': y, 'stores': tile_stores})
+    return tiles
+
+
+def export_region_rankings(stores: pd.DataFrame, output_dir: Path) -> dict:
+    """
+    시/도별 랭킹 샤드를 씁니다. 정렬은 랭킹 탭과 같은 1등 합계(lotto1 + pension), 동점이면 2등 순입니다.
+
+    Returns:
+        시/도 -> 상대 경로 딕셔너리
+    """
+    tokens = stores['address'].str.split(' ', n=2, expand=True).reindex(columns=[0, 1]).fillna('')
+    ranked = stores.assign(region=tokens[0], district=tokens[1], score=stores['lotto1'] + stores['pension'])
+    ranked = ranked.sort_values(['score', 'lotto2', 'id'], ascending=[False, False, True], kind='mergesort')
+
+    shards = {}
+    for index, (region, group) in enumerate(sorted(ranked.groupby('region', sort=False), key=lambda g: g[0])):
+        rows = group[RANKING_COLUMNS].values.tolist()
+        shards[region] = write_hashed(output_dir, f"rankings/{index:02d}",
+                                      {'region': region, 'columns': RANKING_COLUMNS, 'rows': rows})
+    return shards
+
+
+@profiled('tile-exporter')
+def main():
+    parser = argparse.ArgumentParser(description='지도 정적 타일 내보내기')
+    parser.add_argument('--source', choices=['csv', 'db'], default='csv', help='데이터 출처 (기본값: csv)')
+    parser.add_argument('--csv', type=str, default='all_lottery_stores.csv', help='--source csv일 때 CSV 파일')
+    parser.add_argument('--output-dir', type=str, default=DEFAULT_OUTPUT_DIR,
+                        help=f'출력 디렉터리 (기본값: {DEFAULT_OUTPUT_DIR})')
+    parser.add_argument('--min-zoom', type=int, default=DEFAULT_MIN_ZOOM)
+    parser.add_argument('--tile-zoom', type=int, default=DEFAULT_TILE_ZOOM, help='판매점 상세 타일 줌')
+    parser.add_argument('--history-days', type=int, default=DEFAULT_HISTORY_DAYS, help='타일에 넣을 최근 이력 기간(일)')
+    parser.add_argument('--history-limit', type=int, default=DEFAULT_HISTORY_LIMIT, help='판매점별 최대 이력 수')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("지도 정적 타일 내보내기")
+    print("=" * 60)
+
+    history_since = date.today() - timedelta(days=args.history_days)
+
+    if args.source == 'csv':
+        csv_path = Path(args.csv)
+        if not csv_path.is_absolute():
+            csv_path = Path(__file__).parent / csv_path
+        if not csv_path.exists():
+            print(f"❌ CSV 파일을 찾을 수 없습니다: {csv_path}")
+            sys.exit(1)
+        print(f"\n📂 CSV 읽는 중: {csv_path}")
+        stores, history = load_export_data_from_csv(csv_path, history_since)
+    else:
+        database_url = get_database_url()
+        if not database_url:
+            print("❌ DATABASE_URL 환경변수를 찾을 수 없습니다.")
+            sys.exit(1)
+        try:
+            import psycopg2
+        except ImportError:
+            print("❌ psycopg2가 설치되지 않았습니다.")
+            sys.exit(1)
+        print("\n🔗 데이터베이스 연결 중...")
+        conn = psycopg2.connect(database_url)
+        try:
+            with conn.cursor() as cursor:
+                stores, history = load_export_data_from_db(cursor, history_since)
+        finally:
+            conn.close()
+
+    print(f"  - 판매점 {len(stores):,}개, 최근 이력 {len(history):,}건 ({history_since} 이후)")
+    if brotli is None:
+        print("  ⚠️  brotli 패키지가 없어 .br 압축본은 건너뜁니다 (pip install brotli)")
+
+    output_dir = Path(args.output_dir)
+    if not output_dir.is_absolute():
+        output_dir = Path(__file__).parent / output_dir
+
+    previous = read_manifest(output_dir)
+    tiles = export_tiles(stores, history, output_dir, args.min_zoom, args.tile_zoom, args.history_limit)
+    rankings = export_region_rankings(stores, output_dir)
+
+    manifest = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'min_zoom': args.min_zoom,
+        'tile_zoom': args.tile_zoom,
+        'encodings': ['gzip', 'br'] if brotli is not None else ['gzip'],
+        'tiles': tiles,
+        'rankings': rankings,
+    }
+    # 임시 파일에 쓴 뒤 교체해 중간 상태의 manifest가 배포되지 않도록 함
+    manifest_tmp = output_dir / 'manifest.json.tmp'
+    with open(manifest_tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    manifest_tmp.replace(output_dir / 'manifest.json')
+    removed = prune_unreferenced(output_dir, manifest_files(manifest) | manifest_files(previous))
+
+    print(f"\n  ✅ 타일 {len(tiles):,}개, 랭킹 샤드 {len(rankings)}개")
+    print(f"  🗑️  이전 manifest에도 없는 파일 {removed:,}개 삭제")
+    print(f"  💾 저장: {output_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,14 +2,19 @@
 """
 draws 테이블의 draw_date를 계산하여 업데이트하는 스크립트
 로또 6/45: 2002년 12월 7일(토) 1회차 시작, 매주 토요일 추첨
+연금복권 720+: 2020년 5월 7일(목) 1회차 시작, 매주 목요일 추첨
+
+추첨일은 draw_calendar.py 기준으로 load_data_to_supabase.py가 적재 시점에 기록합니다.
+이 스크립트는 이미 적재된 draws 중 날짜가 비었거나 다른 회차만 보정하는 수동 도구입니다
+(주간 파이프라인에서는 실행하지 않고, verify_data.py의 draws.date_rule 검사로 확인합니다).
 """
 import os
 import sys
 from pathlib import Path
-from datetime import date, timedelta
+from datetime import date
 
-# 로또 1회차 추첨일 (2002년 12월 7일 토요일)
-LOTTO_FIRST_DRAW_DATE = date(2002, 12, 7)
+from draw_calendar import draw_date, draw_date_map
+from job_runs import instrumented, job_stage
 
 
 def get_supabase_config():
@@ -34,12 +39,12 @@ def get_supabase_config():
     return supabase_url, supabase_key
 
 
-def calculate_draw_date(round_no: int) -> date:
+def calculate_draw_date(round_no: int, lottery_type: str = 'LOTTO') -> date:
     """회차 번호로 추첨일을 계산합니다."""
-    # n회차 추첨일 = 1회차 추첨일 + (n-1) * 7일
-    return LOTTO_FIRST_DRAW_DATE + timedelta(weeks=round_no - 1)
+    return draw_date(lottery_type, round_no)
 
 
+@instrumented('update-draw-dates')
 def main():
     print("=" * 60)
     print("draws 테이블 draw_date 업데이트")
@@ -59,46 +64,56 @@ def main():
     offset = 0
     page_size = 1000
 
-    while True:
-        response = supabase.table('draws').select('round_no').range(offset, offset + page_size - 1).execute()
-        if not response.data:
-            break
-        all_draws.extend(response.data)
-        offset += page_size
-        if len(response.data) < page_size:
-            break
+    with job_stage('fetch_draws') as stage:
+        while True:
+            response = supabase.table('draws').select('round_no, lottery_type, draw_date').range(offset, offset + page_size - 1).execute()
+            if not response.data:
+                break
+            all_draws.extend(response.data)
+            offset += page_size
+            if len(response.data) < page_size:
+                break
+        stage.records = len(all_draws)
 
     print(f"  - 총 {len(all_draws)}개 회차 조회 완료")
 
     # draw_date 계산 및 업데이트
     print("\n📌 draw_date 업데이트 중...")
     batch_size = 500
+    expected_dates = draw_date_map((d['round_no'], d['lottery_type']) for d in all_draws)
     updates = []
 
     for draw in all_draws:
-        round_no = draw['round_no']
-        draw_date = calculate_draw_date(round_no)
+        key = (draw['round_no'], draw['lottery_type'])
+        expected = expected_dates[key].isoformat()
+        if draw['draw_date'] == expected:
+            continue
         updates.append({
-            'round_no': round_no,
-            'draw_date': draw_date.isoformat()
+            'round_no': draw['round_no'],
+            'lottery_type': draw['lottery_type'],
+            'draw_date': expected
         })
 
-    for i in range(0, len(updates), batch_size):
-        batch = updates[i:i+batch_size]
-        supabase.table('draws').upsert(batch, on_conflict='round_no').execute()
-        print(f"  ... {min(i+batch_size, len(updates))}/{len(updates)} 완료")
+    print(f"  - 보정 대상: {len(updates)}개 회차 (나머지는 이미 올바름)")
+    with job_stage('upsert_dates') as stage:
+        for i in range(0, len(updates), batch_size):
+            batch = updates[i:i+batch_size]
+            supabase.table('draws').upsert(batch, on_conflict='round_no,lottery_type').execute()
+            print(f"  ... {min(i+batch_size, len(updates))}/{len(updates)} 완료")
+        stage.records = len(updates)
 
     print(f"\n✅ draw_date 업데이트 완료!")
 
     # 검증
     print("\n📋 검증 (샘플 데이터):")
-    samples = [1, 100, 500, 1000, 1207]
-    for round_no in samples:
-        result = supabase.table('draws').select('round_no, draw_date').eq('round_no', round_no).execute()
+    samples = [('LOTTO', 1), ('LOTTO', 500), ('LOTTO', 1000), ('PENSION', 1), ('PENSION', 298)]
+    for lottery_type, round_no in samples:
+        result = supabase.table('draws').select('round_no, draw_date')\
+            .eq('round_no', round_no).eq('lottery_type', lottery_type).execute()
         if result.data:
             d = result.data[0]
-            expected = calculate_draw_date(round_no)
-            print(f"  - {d['round_no']}회차: {d['draw_date']} (예상: {expected.isoformat()})")
+            expected = calculate_draw_date(round_no, lottery_type)
+            print(f"  - {lottery_type} {d['round_no']}회차: {d['draw_date']} (예상: {expected.isoformat()})")
 
     print("\n" + "=" * 60)
     print("완료!")
@@ -1,14 +1,27 @@
 #!/usr/bin/env python3
 """
 winning_records 테이블의 won_at을 draws 테이블의 draw_date로 업데이트하는 스크립트
+(draw_id, lottery_type) 기준의 단일 UPDATE ... FROM draws 문으로 처리합니다.
+
+사용법:
+    python update_won_at.py                                   # 전체 (값이 다른 행만 갱신)
+    python update_won_at.py --lottery-type PENSION            # 연금복권만
+    python update_won_at.py --lottery-type LOTTO --rounds 1207 1208
+    python update_won_at.py --changed-since 2026-01-01        # draws.updated_at 이후 변경된 회차만
 """
+import argparse
 import os
 import sys
 from pathlib import Path
 
-def get_supabase_config():
-    """환경변수 또는 .env.local에서 Supabase 설정을 읽어옵니다."""
-    config = {}
+from job_runs import instrumented, job_stage
+
+
+def get_database_url():
+    """환경변수 또는 .env.local에서 DATABASE_URL을 읽어옵니다."""
+    database_url = os.getenv('DATABASE_URL') or os.getenv('SUPABASE_DB_URL')
+    if database_url:
+        return database_url
 
     env_file = Path(__file__).parent.parent / '.env.local'
     if env_file.exists():
@@ -18,108 +31,126 @@ def get_supabase_config():
                     line = line.strip()
                     if line and not line.startswith('#') and '=' in line:
                         key, value = line.split('=', 1)
-                        config[key.strip()] = value.strip().strip('"').strip("'")
+                        key = key.strip()
+                        value = value.strip().strip('"').strip("'")
+                        if key in ('DATABASE_URL', 'SUPABASE_DB_URL'):
+                            return value
         except PermissionError:
             pass
 
-    supabase_url = os.getenv('VITE_SUPABASE_URL') or config.get('VITE_SUPABASE_URL')
-    supabase_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY') or config.get('SUPABASE_SERVICE_ROLE_KEY')
-
-    return supabase_url, supabase_key
-
-
+    return None
+
+
+def build_won_at_update(lottery_type: str = None, rounds=None, changed_since: str = None):
+    """
+    won_at 갱신 UPDATE 문과 파라미터를 만듭니다.
+
+    won_at이 이미 draw_date와 같은 행은 건드리지 않으므로, 재실행해도 불필요한 쓰기가 없습니다.
+    """
+    conditions = [
+        "wr.draw_id = d.round_no",
+        "wr.lottery_type = d.lottery_type",
+        "wr.won_at IS DISTINCT FROM d.draw_date",
+    ]
+    params = []
+    if lottery_type:
+        conditions.append("d.lottery_type = %s")
+        params.append(lottery_type)
+    if rounds:
+        conditions.append("d.round_no = ANY(%s)")
+        params.append(list(rounds))
+    if changed_since:
+        conditions.append("COALESCE(d.updated_at, d.created_at) >= %s")
+        params.append(changed_since)
+
+    sql = f"""
+        UPDATE winning_records wr
+        SET won_at = d.draw_date
+        FROM draws d
+        WHERE {' AND '.join(conditions)};
+    """
+    return sql, params
+
+
+@instrumented('update-won-at')
 def main():
+    parser = argparse.ArgumentParser(description='winning_records won_at 업데이트')
+    parser.add_argument('--lottery-type', choices=['LOTTO', 'PENSION'], default=None,
+                        help='복권 종류 제한 (기본값: 전체)')
+    parser.add_argument('--rounds', type=int, nargs='+', default=None,
+                        help='갱신할 회차 목록 (기본값: 전체)')
+    parser.add_argument('--changed-since', type=str, default=None,
+                        help='draws.updated_at(없으면 created_at)이 이 시각 이후인 회차만 갱신 (예: 2026-01-01)')
+    args = parser.parse_args()
+
     print("=" * 60)
     print("winning_records 테이블 won_at 업데이트")
     print("=" * 60)
 
-    supabase_url, supabase_key = get_supabase_config()
-    if not supabase_url or not supabase_key:
-        print("Supabase 설정을 찾을 수 없습니다.")
+    database_url = get_database_url()
+    if not database_url:
+        print("❌ DATABASE_URL 환경변수를 찾을 수 없습니다.")
         sys.exit(1)
 
-    from supabase import create_client
-    supabase = create_client(supabase_url, supabase_key)
-
-    # 1. draws 테이블에서 round_no -> draw_date 매핑 조회
-    print("\n📖 draws 테이블에서 draw_date 매핑 조회 중...")
-    draw_date_map = {}
-    offset = 0
-    page_size = 1000
-
-    while True:
-        response = supabase.table('draws').select('round_no, draw_date').range(offset, offset + page_size - 1).execute()
-        if not response.data:
-            break
-        for row in response.data:
-            draw_date_map[row['round_no']] = row['draw_date']
-        offset += page_size
-        if len(response.data) < page_size:
-            break
-
-    print(f"  - {len(draw_date_map)}개 회차 매핑 조회 완료")
-
-    # 2. winning_records 조회 및 업데이트
-    print("\n📖 winning_records 테이블 조회 중...")
-    all_records = []
-    offset = 0
-
-    while True:
-        response = supabase.table('winning_records').select('source_row_hash, draw_id').range(offset, offset + page_size - 1).execute()
-        if not response.data:
-            break
-        all_records.extend(response.data)
-        offset += page_size
-        print(f"  ... {len(all_records)}개 조회됨")
-        if len(response.data) < page_size:
-            break
-
-    print(f"  - 총 {len(all_records)}개 레코드 조회 완료")
-
-    # 3. won_at 업데이트 (draw_id별로 그룹화하여 일괄 업데이트)
-    print("\n📌 won_at 업데이트 중...")
-
-    # draw_id별로 그룹화
-    from collections import defaultdict
-    records_by_draw = defaultdict(list)
-    for record in all_records:
-        records_by_draw[record['draw_id']].append(record['source_row_hash'])
-
-    total_draws = len(records_by_draw)
-    updated_count = 0
-
-    for i, (draw_id, hashes) in enumerate(records_by_draw.items(), 1):
-        draw_date = draw_date_map.get(draw_id)
-        if draw_date:
-            # draw_id 기준으로 won_at 일괄 업데이트
-            supabase.table('winning_records')\
-                .update({'won_at': draw_date})\
-                .eq('draw_id', draw_id)\
-                .execute()
-            updated_count += len(hashes)
-
-        if i % 100 == 0 or i == total_draws:
-            print(f"  ... {i}/{total_draws} 회차 처리 완료 ({updated_count}개 레코드)")
-
-    print(f"\n✅ won_at 업데이트 완료!")
-
-    # 검증
-    print("\n📋 검증 (최근 로또 1등 당첨 5건):")
-    sample = supabase.table('winning_records')\
-        .select('draw_id, won_at, lottery_type, rank, stores(name)')\
-        .eq('lottery_type', 'LOTTO')\
-        .eq('rank', 1)\
-        .order('draw_id', desc=True)\
-        .limit(5)\
-        .execute()
-
-    for rec in sample.data:
-        store = rec.get('stores', {})
-        print(f"  - {rec['draw_id']}회차 ({rec['won_at']}): {store.get('name', 'N/A')}")
-
-    print("\n" + "=" * 60)
-    print("완료!")
-    print("=" * 60)
+    try:
+        import psycopg2
+        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+    except ImportError:
+        print("❌ psycopg2가 설치되지 않았습니다.")
+        sys.exit(1)
+
+    print(f"\n🔗 데이터베이스 연결 중...")
+    conn = psycopg2.connect(database_url)
+    conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+    cursor = conn.cursor()
+
+    try:
+        print("\n📌 won_at 업데이트 중...")
+        sql, params = build_won_at_update(args.lottery_type, args.rounds, args.changed_since)
+        with job_stage('update_won_at') as stage:
+            cursor.execute(sql, params)
+            stage.records = cursor.rowcount
+        print(f"  ✅ {cursor.rowcount}개 레코드 갱신")
+
+        # 검증
+        print("\n📋 검증 (won_at 누락/불일치):")
+        cursor.execute("""
+            SELECT wr.lottery_type,
+                   COUNT(*) FILTER (WHERE wr.won_at IS NULL) AS null_won_at,
+                   COUNT(*) FILTER (WHERE wr.won_at IS DISTINCT FROM d.draw_date) AS mismatched
+            FROM winning_records wr
+            JOIN draws d ON wr.draw_id = d.round_no AND wr.lottery_type = d.lottery_type
+            GROUP BY wr.lottery_type
+            ORDER BY wr.lottery_type;
+        """)
+        for row in cursor.fetchall():
+            status = "✅" if row[2] == 0 else "⚠️"
+            print(f"  {status} {row[0]}: NULL {row[1]}건, 불일치 {row[2]}건")
+
+        print("\n📋 검증 (최근 로또 1등 당첨 5건):")
+        cursor.execute("""
+            SELECT wr.draw_id, wr.won_at, s.name
+            FROM winning_records wr
+            JOIN stores s ON wr.store_id = s.id
+            WHERE wr.lottery_type = 'LOTTO' AND wr.rank = 1
+            ORDER BY wr.draw_id DESC
+            LIMIT 5;
+        """)
+        for row in cursor.fetchall():
+            print(f"  - {row[0]}회차 ({row[1]}): {row[2]}")
+
+        print("\n" + "=" * 60)
+        print("완료!")
+        print("=" * 60)
+
+    except Exception as e:
+        print(f"\n❌ 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        cursor.close()
+        conn.close()
 
 
 if __name__ == '__main__':
@@ -1,11 +1,183 @@
 #!/usr/bin/env python3
 """
 Supabase 데이터 전체 검증 스크립트
+
+검증은 두 개의 쿼리로 끝납니다 (각자 연결을 열어 병렬 실행).
+- winning_records 쿼리: CTE 하나로 winning_records를 한 번만 읽고 draws/stores를 해시 조인해
+  건수/범위/FK/등수 제약/won_at 일치를 계산하고, 판매점별 재집계 결과를 store_stats와
+  FULL OUTER JOIN 하여 모든 카운터(total_*, recent_*, last_won_at)를 대조합니다.
+- 기준 테이블 쿼리: draws, stores, 보조 테이블의 건수/범위/추첨일 규칙/좌표 범위를 한 번에 계산합니다.
+
+사용법:
+    python verify_data.py                       # 사람이 읽는 리포트
+    python verify_data.py --json                # 결과를 JSON으로 출력 (검사별 상태 + 단계별 소요 시간)
+    python verify_data.py --json-output verify.json --strict   # 파일 저장, 실패 시 종료 코드 1
 """
+import argparse
+import json
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
 from pathlib import Path
 
+from coordinate_validation import KOREA_LAT_RANGE, KOREA_LNG_RANGE
+from draw_calendar import FIRST_DRAW_DATES, override_rows
+from job_runs import instrumented, job_stage
+
+RECENT_PERIOD_DAYS = 365
+
+STATS_COUNTERS = (
+    'total_lotto_first_prize',
+    'total_lotto_second_prize',
+    'total_pension_first_prize',
+    'recent_lotto_first_prize',
+    'recent_lotto_second_prize',
+    'recent_pension_first_prize',
+    'last_won_at',
+)
+
+WINNING_RECORDS_SQL = """
+    WITH wr AS (
+        SELECT
+            w.store_id, w.lottery_type, w.rank, w.method, w.won_at, w.draw_id,
+            d.round_no IS NULL AS orphan_draw,
+            s.id IS NULL AS orphan_store,
+            d.draw_date
+        FROM winning_records w
+        LEFT JOIN draws d ON d.round_no = w.draw_id AND d.lottery_type = w.lottery_type
+        LEFT JOIN stores s ON s.id = w.store_id
+    ),
+    per_store AS (
+        SELECT
+            store_id,
+            COUNT(*) FILTER (WHERE lottery_type = 'LOTTO' AND rank = 1) AS total_lotto_first_prize,
+            COUNT(*) FILTER (WHERE lottery_type = 'LOTTO' AND rank = 2) AS total_lotto_second_prize,
+            COUNT(*) FILTER (WHERE lottery_type = 'PENSION' AND rank = 1) AS total_pension_first_prize,
+            COUNT(*) FILTER (WHERE lottery_type = 'LOTTO' AND rank = 1 AND won_at >= %(cutoff)s) AS recent_lotto_first_prize,
+            COUNT(*) FILTER (WHERE lottery_type = 'LOTTO' AND rank = 2 AND won_at >= %(cutoff)s) AS recent_lotto_second_prize,
+            COUNT(*) FILTER (WHERE lottery_type = 'PENSION' AND rank = 1 AND won_at >= %(cutoff)s) AS recent_pension_first_prize,
+            MAX(won_at) AS last_won_at
+        FROM wr
+        GROUP BY store_id
+    ),
+    reconcile AS (
+        SELECT
+            p.store_id AS expected_id,
+            ss.store_id AS actual_id,
+            {mismatch_columns}
+        FROM per_store p
+        FULL OUTER JOIN store_stats ss ON ss.store_id = p.store_id
+    )
+    SELECT json_build_object(
+        'winning_records', (
+            SELECT json_build_object(
+                'total', COUNT(*),
+                'distinct_stores', COUNT(DISTINCT store_id),
+                'null_won_at', COUNT(*) FILTER (WHERE won_at IS NULL),
+                'won_at_mismatch', COUNT(*) FILTER (WHERE NOT orphan_draw AND won_at IS DISTINCT FROM draw_date),
+                'orphan_draws', COUNT(*) FILTER (WHERE orphan_draw),
+                'orphan_stores', COUNT(*) FILTER (WHERE orphan_store),
+                'rank_violations', COUNT(*) FILTER (WHERE NOT (
+                    (lottery_type = 'LOTTO' AND rank IN (1, 2)) OR
+                    (lottery_type = 'PENSION' AND rank IN (0, 1, 2))
+                ))
+            )
+            FROM wr
+        ),
+        'by_type_rank', (
+            SELECT json_agg(json_build_object(
+                'lottery_type', lottery_type, 'rank', rank, 'count', cnt,
+                'min_won_at', min_won_at, 'max_won_at', max_won_at
+            ) ORDER BY lottery_type, rank)
+            FROM (
+                SELECT lottery_type, rank, COUNT(*) AS cnt, MIN(won_at) AS min_won_at, MAX(won_at) AS max_won_at
+                FROM wr GROUP BY lottery_type, rank
+            ) t
+        ),
+        'by_method', (
+            SELECT json_object_agg(method, cnt)
+            FROM (SELECT method, COUNT(*) AS cnt FROM wr GROUP BY method) t
+        ),
+        'store_stats', (
+            SELECT json_build_object(
+                'rows', COUNT(actual_id),
+                'missing', COUNT(*) FILTER (WHERE actual_id IS NULL),
+                'extra', COUNT(*) FILTER (WHERE expected_id IS NULL),
+                'mismatch', json_build_object({mismatch_counts})
+            )
+            FROM reconcile
+        )
+    );
+"""
+
+BASE_TABLES_SQL = """
+    SELECT json_build_object(
+        'draws', (
+            SELECT json_agg(json_build_object(
+                'lottery_type', lottery_type, 'count', cnt, 'min_round', min_round, 'max_round', max_round,
+                'min_date', min_date, 'max_date', max_date, 'null_dates', null_dates, 'date_rule_violations', bad_dates
+            ) ORDER BY lottery_type)
+            FROM (
+                SELECT
+                    d.lottery_type,
+                    COUNT(*) AS cnt,
+                    MIN(d.round_no) AS min_round,
+                    MAX(d.round_no) AS max_round,
+                    MIN(d.draw_date) AS min_date,
+                    MAX(d.draw_date) AS max_date,
+                    COUNT(*) FILTER (WHERE d.draw_date IS NULL) AS null_dates,
+                    COUNT(*) FILTER (
+                        WHERE d.draw_date <> COALESCE(o.draw_date, f.first_date + (d.round_no - 1) * 7)
+                    ) AS bad_dates
+                FROM draws d
+                LEFT JOIN unnest(%(types)s::text[], %(first_dates)s::date[]) AS f(lottery_type, first_date)
+                  ON f.lottery_type = d.lottery_type
+                LEFT JOIN unnest(%(override_types)s::text[], %(override_rounds)s::int[], %(override_dates)s::date[])
+                          AS o(lottery_type, round_no, draw_date)
+                  ON o.lottery_type = d.lottery_type AND o.round_no = d.round_no
+                GROUP BY d.lottery_type
+            ) t
+        ),
+        'stores', (
+            SELECT json_build_object(
+                'total', COUNT(*),
+                'with_coords', COUNT(*) FILTER (WHERE lat IS NOT NULL AND lng IS NOT NULL),
+                'out_of_range', COUNT(*) FILTER (WHERE lat IS NOT NULL AND lng IS NOT NULL AND NOT (
+                    lat BETWEEN %(lat_min)s AND %(lat_max)s AND lng BETWEEN %(lng_min)s AND %(lng_max)s
+                ))
+            )
+            FROM stores
+        ),
+        'store_stats_orphans', (
+            SELECT COUNT(*) FROM store_stats ss
+            WHERE NOT EXISTS (SELECT 1 FROM stores s WHERE s.id = ss.store_id)
+        ),
+        'store_name_history', (SELECT COUNT(*) FROM store_name_history),
+        'geocode_cache', (SELECT COUNT(*) FROM geocode_cache),
+        'job_runs', (SELECT COUNT(*) FROM job_runs),
+        'missing_coord_samples', (
+            SELECT COALESCE(json_agg(json_build_object('source_id', source_id, 'name', name, 'address', address_raw)), '[]')
+            FROM (SELECT source_id, name, address_raw FROM stores WHERE lat IS NULL OR lng IS NULL LIMIT 5) t
+        ),
+        'recent_lotto_first', (
+            SELECT COALESCE(json_agg(json_build_object(
+                'draw_id', draw_id, 'won_at', won_at, 'method', method, 'name', name, 'address', address_raw
+            )), '[]')
+            FROM (
+                SELECT wr.draw_id, wr.won_at, wr.method, s.name, s.address_raw
+                FROM winning_records wr
+                JOIN stores s ON wr.store_id = s.id
+                WHERE wr.lottery_type = 'LOTTO' AND wr.rank = 1
+                ORDER BY wr.draw_id DESC, wr.won_at DESC
+                LIMIT 5
+            ) t
+        )
+    );
+"""
+
+
 def get_database_url():
     """환경변수 또는 .env.local에서 DATABASE_URL을 읽어옵니다."""
     database_url = os.getenv('DATABASE_URL') or os.getenv('SUPABASE_DB_URL')
@@ -30,302 +202,251 @@ def get_database_url():
     return None
 
 
-def main():
-    print("=" * 70)
-    print("Supabase 데이터 전체 검증")
-    print("=" * 70)
+def build_winning_records_sql() -> str:
+    """store_stats의 모든 카운터를 대조하도록 WINNING_RECORDS_SQL을 완성합니다."""
+    mismatch_columns = ',\n            '.join(
+        f"(p.store_id IS NOT NULL AND ss.store_id IS NOT NULL "
+        f"AND p.{c} IS DISTINCT FROM ss.{c}) AS {c}_mismatch"
+        for c in STATS_COUNTERS
+    )
+    mismatch_counts = ', '.join(f"'{c}', COUNT(*) FILTER (WHERE {c}_mismatch)" for c in STATS_COUNTERS)
+    return WINNING_RECORDS_SQL.format(mismatch_columns=mismatch_columns, mismatch_counts=mismatch_counts)
 
-    database_url = get_database_url()
-    if not database_url:
-        print("❌ DATABASE_URL 환경변수를 찾을 수 없습니다.")
-        sys.exit(1)
 
-    try:
-        import psycopg2
-    except ImportError:
-        print("❌ psycopg2가 설치되지 않았습니다.")
-        sys.exit(1)
+def fetch_recent_cutoff(database_url: str) -> date:
+    """store_stats가 사용한 최근 기준일 (store_stats_meta가 없으면 오늘 - 365일)."""
+    import psycopg2
 
     conn = psycopg2.connect(database_url)
-    cursor = conn.cursor()
-
     try:
-        # ============================================
-        # 1. draws 테이블
-        # ============================================
-        print("\n" + "=" * 70)
-        print("1. draws 테이블")
-        print("=" * 70)
-
-        cursor.execute("""
-            SELECT lottery_type, COUNT(*), MIN(round_no), MAX(round_no), MIN(draw_date), MAX(draw_date)
-            FROM draws
-            GROUP BY lottery_type
-            ORDER BY lottery_type;
-        """)
-        print(f"\n{'복권종류':<10} {'회차수':>8} {'회차범위':>15} {'추첨일범위':>25}")
-        print("-" * 60)
-        for row in cursor.fetchall():
-            print(f"{row[0]:<10} {row[1]:>8} {row[2]:>6} ~ {row[3]:<6} {str(row[4]):>12} ~ {str(row[5]):<12}")
-
-        # draw_date NULL 체크
-        cursor.execute("SELECT COUNT(*) FROM draws WHERE draw_date IS NULL;")
-        null_dates = cursor.fetchone()[0]
-        if null_dates > 0:
-            print(f"\n⚠️  draw_date가 NULL인 레코드: {null_dates}개")
-        else:
-            print(f"\n✅ 모든 draw_date가 설정됨")
-
-        # ============================================
-        # 2. stores 테이블
-        # ============================================
-        print("\n" + "=" * 70)
-        print("2. stores 테이블")
-        print("=" * 70)
-
-        cursor.execute("SELECT COUNT(*) FROM stores;")
-        total_stores = cursor.fetchone()[0]
-        print(f"\n총 판매점 수: {total_stores:,}개")
-
-        cursor.execute("SELECT COUNT(*) FROM stores WHERE lat IS NOT NULL AND lng IS NOT NULL;")
-        with_coords = cursor.fetchone()[0]
-        print(f"좌표 있는 판매점: {with_coords:,}개")
-        print(f"좌표 없는 판매점: {total_stores - with_coords:,}개")
-
-        # 좌표 없는 판매점 샘플
-        if total_stores - with_coords > 0:
-            cursor.execute("""
-                SELECT source_id, name, address_raw
-                FROM stores
-                WHERE lat IS NULL OR lng IS NULL
-                LIMIT 5;
-            """)
-            print("\n좌표 없는 판매점 샘플:")
-            for row in cursor.fetchall():
-                print(f"  - [{row[0]}] {row[1]}: {row[2][:50]}...")
-
-        # ============================================
-        # 3. winning_records 테이블
-        # ============================================
-        print("\n" + "=" * 70)
-        print("3. winning_records 테이블")
-        print("=" * 70)
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT to_regclass('store_stats_meta') IS NOT NULL;")
+            if cursor.fetchone()[0]:
+                cursor.execute("SELECT recent_cutoff FROM store_stats_meta WHERE id = 1;")
+                row = cursor.fetchone()
+                if row:
+                    return row[0]
+    finally:
+        conn.close()
+    return date.today() - timedelta(days=RECENT_PERIOD_DAYS)
 
-        cursor.execute("""
-            SELECT lottery_type, rank, COUNT(*)
-            FROM winning_records
-            GROUP BY lottery_type, rank
-            ORDER BY lottery_type, rank;
-        """)
-        print(f"\n{'복권종류':<10} {'등수':>6} {'건수':>10}")
-        print("-" * 30)
-        for row in cursor.fetchall():
-            rank_str = f"{row[1]}등" if row[1] > 0 else "보너스"
-            print(f"{row[0]:<10} {rank_str:>6} {row[2]:>10,}")
-
-        # method 통계
-        cursor.execute("""
-            SELECT method, COUNT(*)
-            FROM winning_records
-            GROUP BY method
-            ORDER BY COUNT(*) DESC;
-        """)
-        print(f"\n방법별 통계:")
-        for row in cursor.fetchall():
-            print(f"  - {row[0]}: {row[1]:,}건")
-
-        # won_at NULL 체크
-        cursor.execute("SELECT COUNT(*) FROM winning_records WHERE won_at IS NULL;")
-        null_won_at = cursor.fetchone()[0]
-        if null_won_at > 0:
-            print(f"\n⚠️  won_at이 NULL인 레코드: {null_won_at}개")
-        else:
-            print(f"\n✅ 모든 won_at이 설정됨")
-
-        # won_at 범위
-        cursor.execute("""
-            SELECT lottery_type, MIN(won_at), MAX(won_at)
-            FROM winning_records
-            GROUP BY lottery_type;
-        """)
-        print(f"\nwon_at 범위:")
-        for row in cursor.fetchall():
-            print(f"  - {row[0]}: {row[1]} ~ {row[2]}")
-
-        # ============================================
-        # 4. store_stats 테이블
-        # ============================================
-        print("\n" + "=" * 70)
-        print("4. store_stats 테이블")
-        print("=" * 70)
 
-        cursor.execute("SELECT COUNT(*) FROM store_stats;")
-        total_stats = cursor.fetchone()[0]
-        print(f"\n총 레코드 수: {total_stats:,}개")
-
-        cursor.execute("""
-            SELECT
-                SUM(total_lotto_first_prize) AS lotto_1st,
-                SUM(total_lotto_second_prize) AS lotto_2nd,
-                SUM(total_pension_first_prize) AS pension_1st,
-                SUM(recent_lotto_first_prize) AS recent_lotto_1st,
-                SUM(recent_lotto_second_prize) AS recent_lotto_2nd,
-                SUM(recent_pension_first_prize) AS recent_pension_1st
-            FROM store_stats;
-        """)
-        row = cursor.fetchone()
-        print(f"\n전체 통계 합계:")
-        print(f"  - 로또 1등: {row[0]:,}건")
-        print(f"  - 로또 2등: {row[1]:,}건")
-        print(f"  - 연금복권 1등: {row[2]:,}건")
-        print(f"\n최근 1년 통계 합계:")
-        print(f"  - 로또 1등: {row[3]:,}건")
-        print(f"  - 로또 2등: {row[4]:,}건")
-        print(f"  - 연금복권 1등: {row[5]:,}건")
-
-        # winning_records와 일치 여부 검증
-        cursor.execute("""
-            SELECT COUNT(*) FROM winning_records WHERE lottery_type = 'LOTTO' AND rank = 1;
-        """)
-        wr_lotto_1st = cursor.fetchone()[0]
-
-        cursor.execute("SELECT SUM(total_lotto_first_prize) FROM store_stats;")
-        ss_lotto_1st = cursor.fetchone()[0]
-
-        if wr_lotto_1st == ss_lotto_1st:
-            print(f"\n✅ winning_records와 store_stats 일치 (로또 1등: {wr_lotto_1st:,}건)")
-        else:
-            print(f"\n⚠️  불일치! winning_records: {wr_lotto_1st}, store_stats: {ss_lotto_1st}")
-
-        # ============================================
-        # 5. store_name_history 테이블
-        # ============================================
-        print("\n" + "=" * 70)
-        print("5. store_name_history 테이블")
-        print("=" * 70)
+def run_json_query(database_url: str, sql: str, params: dict):
+    """별도 연결에서 JSON 한 값을 반환하는 쿼리를 실행하고 (결과, 소요 ms)를 반환합니다."""
+    import psycopg2
 
-        cursor.execute("SELECT COUNT(*) FROM store_name_history;")
-        history_count = cursor.fetchone()[0]
-        print(f"\n총 이력 수: {history_count:,}개")
-        if history_count == 0:
-            print("  (초기 적재 시 이력 없음 - 정상)")
+    started = time.perf_counter()
+    conn = psycopg2.connect(database_url)
+    try:
+        conn.set_session(readonly=True)
+        with conn.cursor() as cursor:
+            cursor.execute(sql, params)
+            result = cursor.fetchone()[0]
+    finally:
+        conn.close()
+    return result, round((time.perf_counter() - started) * 1000, 1)
+
+
+def evaluate_checks(wr: dict, base: dict) -> list:
+    """
+    쿼리 결과를 검사 목록으로 변환합니다.
+
+    Returns:
+        {'name', 'status'('ok'|'warn'|'fail'), 'value', 'message'} 리스트
+    """
+    checks = []
+
+    def check(name, bad_count, message, severity='fail'):
+        checks.append({
+            'name': name,
+            'status': 'ok' if not bad_count else severity,
+            'value': bad_count,
+            'message': message,
+        })
+
+    records = wr['winning_records']
+    # 추첨일/won_at은 적재 시 draw_calendar로 기록하므로(별도 보정 단계 없음) 어긋나면 오류
+    check('draws.null_draw_date', sum(d['null_dates'] for d in base['draws'] or []), 'draw_date가 NULL인 회차')
+    check('draws.date_rule', sum(d['date_rule_violations'] or 0 for d in base['draws'] or []),
+          '추첨일 규칙(draw_calendar, 예외 회차 포함)과 다른 회차')
+    check('draws.missing_rounds', sum(d['max_round'] - d['min_round'] + 1 - d['count'] for d in base['draws'] or []),
+          '회차 범위 안에서 빠진 회차')
+    check('stores.missing_coords', base['stores']['total'] - base['stores']['with_coords'], '좌표 없는 판매점', 'warn')
+    check('stores.coords_out_of_range', base['stores']['out_of_range'], '국내 범위를 벗어난 좌표', 'warn')
+    check('winning_records.null_won_at', records['null_won_at'], 'won_at이 NULL인 기록')
+    check('winning_records.won_at_mismatch', records['won_at_mismatch'], 'won_at이 draws.draw_date와 다른 기록')
+    check('winning_records.orphan_draws', records['orphan_draws'], 'draws에 없는 winning_records')
+    check('winning_records.orphan_stores', records['orphan_stores'], 'stores에 없는 winning_records')
+    check('winning_records.rank_check', records['rank_violations'], '복권 종류별 허용 등수 위반')
+    check('store_stats.orphans', base['store_stats_orphans'], 'stores에 없는 store_stats')
+    check('store_stats.missing', wr['store_stats']['missing'], 'store_stats가 없는 당첨 판매점')
+    check('store_stats.extra', wr['store_stats']['extra'], '당첨 기록이 없는 store_stats', 'warn')
+    for counter, mismatched in wr['store_stats']['mismatch'].items():
+        check(f'store_stats.{counter}', mismatched, f'재집계 결과와 다른 {counter} 판매점 수')
+    return checks
+
+
+def run_verification(database_url: str) -> dict:
+    """
+    전체 검증을 실행합니다.
+
+    Returns:
+        {'checks', 'winning_records', 'base_tables', 'recent_cutoff', 'timings_ms'} 딕셔너리
+    """
+    started = time.perf_counter()
+    recent_cutoff = fetch_recent_cutoff(database_url)
+    cutoff_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    base_params = {
+        'types': list(FIRST_DRAW_DATES.keys()),
+        'first_dates': list(FIRST_DRAW_DATES.values()),
+        'override_types': [t for t, _, _ in override_rows()],
+        'override_rounds': [r for _, r, _ in override_rows()],
+        'override_dates': [d for _, _, d in override_rows()],
+        'lat_min': KOREA_LAT_RANGE[0], 'lat_max': KOREA_LAT_RANGE[1],
+        'lng_min': KOREA_LNG_RANGE[0], 'lng_max': KOREA_LNG_RANGE[1],
+    }
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        wr_future = executor.submit(run_json_query, database_url, build_winning_records_sql(),
+                                    {'cutoff': recent_cutoff})
+        base_future = executor.submit(run_json_query, database_url, BASE_TABLES_SQL, base_params)
+        wr, wr_ms = wr_future.result()
+        base, base_ms = base_future.result()
+
+    return {
+        'checks': evaluate_checks(wr, base),
+        'winning_records': wr,
+        'base_tables': base,
+        'recent_cutoff': recent_cutoff.isoformat(),
+        'timings_ms': {
+            'recent_cutoff': cutoff_ms,
+            'winning_records_scan': wr_ms,
+            'base_tables': base_ms,
+            'total': round((time.perf_counter() - started) * 1000, 1),
+        },
+    }
+
+
+def print_report(result: dict):
+    """검증 결과를 사람이 읽는 형태로 출력합니다."""
+    wr, base = result['winning_records'], result['base_tables']
+
+    print("\n" + "=" * 70)
+    print("1. draws 테이블")
+    print("=" * 70)
+    print(f"\n{'복권종류':<10} {'회차수':>8} {'회차범위':>15} {'추첨일범위':>25}")
+    print("-" * 60)
+    for d in base['draws'] or []:
+        print(f"{d['lottery_type']:<10} {d['count']:>8} {d['min_round']:>6} ~ {d['max_round']:<6} "
+              f"{str(d['min_date']):>12} ~ {str(d['max_date']):<12}")
+
+    print("\n" + "=" * 70)
+    print("2. stores 테이블")
+    print("=" * 70)
+    stores = base['stores']
+    print(f"\n총 판매점 수: {stores['total']:,}개")
+    print(f"좌표 있는 판매점: {stores['with_coords']:,}개")
+    print(f"좌표 없는 판매점: {stores['total'] - stores['with_coords']:,}개")
+    if base['missing_coord_samples']:
+        print("\n좌표 없는 판매점 샘플:")
+        for s in base['missing_coord_samples']:
+            print(f"  - [{s['source_id']}] {s['name']}: {s['address'][:50]}...")
+
+    print("\n" + "=" * 70)
+    print("3. winning_records 테이블")
+    print("=" * 70)
+    print(f"\n{'복권종류':<10} {'등수':>6} {'건수':>10} {'won_at 범위':>26}")
+    print("-" * 56)
+    for r in wr['by_type_rank'] or []:
+        rank_str = f"{r['rank']}등" if r['rank'] > 0 else "보너스"
+        print(f"{r['lottery_type']:<10} {rank_str:>6} {r['count']:>10,} {str(r['min_won_at']):>12} ~ {r['max_won_at']}")
+    print("\n방법별 통계:")
+    for method, count in sorted((wr['by_method'] or {}).items(), key=lambda x: -x[1]):
+        print(f"  - {method}: {count:,}건")
+
+    print("\n" + "=" * 70)
+    print(f"4. store_stats 대조 (최근 기준일 {result['recent_cutoff']})")
+    print("=" * 70)
+    print(f"\n총 레코드 수: {wr['store_stats']['rows']:,}개 (당첨 판매점 {wr['winning_records']['distinct_stores']:,}개)")
 
-        # ============================================
-        # 6. geocode_cache 테이블
-        # ============================================
-        print("\n" + "=" * 70)
-        print("6. geocode_cache 테이블")
-        print("=" * 70)
+    print("\n" + "=" * 70)
+    print("5. 보조 테이블")
+    print("=" * 70)
+    print(f"\n  - store_name_history: {base['store_name_history']:,}개")
+    print(f"  - geocode_cache: {base['geocode_cache']:,}개")
+    print(f"  - job_runs: {base['job_runs']:,}개")
+
+    print("\n" + "=" * 70)
+    print("6. 검사 결과")
+    print("=" * 70 + "\n")
+    icons = {'ok': '✅', 'warn': '⚠️ ', 'fail': '❌'}
+    for c in result['checks']:
+        suffix = '' if c['status'] == 'ok' else f": {c['value']:,}"
+        print(f"  {icons[c['status']]} {c['name']} - {c['message']}{suffix}")
+
+    print("\n" + "=" * 70)
+    print("7. 샘플 데이터 (최근 로또 1등 당첨 5건)")
+    print("=" * 70 + "\n")
+    for r in base['recent_lotto_first']:
+        print(f"  {r['draw_id']}회차 ({r['won_at']}) [{r['method']}]")
+        print(f"    {r['name']}")
+        print(f"    {r['address']}")
+        print()
 
-        cursor.execute("SELECT COUNT(*) FROM geocode_cache;")
-        cache_count = cursor.fetchone()[0]
-        print(f"\n캐시된 주소 수: {cache_count:,}개")
+    timings = result['timings_ms']
+    print(f"⏱️  winning_records 스캔 {timings['winning_records_scan']}ms, "
+          f"기준 테이블 {timings['base_tables']}ms, 전체 {timings['total']}ms")
 
-        # ============================================
-        # 7. job_runs 테이블
-        # ============================================
-        print("\n" + "=" * 70)
-        print("7. job_runs 테이블")
-        print("=" * 70)
 
-        cursor.execute("SELECT COUNT(*) FROM job_runs;")
-        job_count = cursor.fetchone()[0]
-        print(f"\n작업 실행 로그 수: {job_count:,}개")
+@instrumented('verify-data')
+def main():
+    parser = argparse.ArgumentParser(description='Supabase 데이터 전체 검증')
+    parser.add_argument('--json', action='store_true', help='결과를 JSON으로 표준 출력')
+    parser.add_argument('--json-output', type=str, default=None, help='결과 JSON을 저장할 파일 경로')
+    parser.add_argument('--strict', action='store_true', help='fail 검사가 있으면 종료 코드 1')
+    args = parser.parse_args()
 
-        # ============================================
-        # 8. 데이터 정합성 검증
-        # ============================================
-        print("\n" + "=" * 70)
-        print("8. 데이터 정합성 검증")
+    if not args.json:
         print("=" * 70)
-
-        # FK 정합성: winning_records -> draws
-        cursor.execute("""
-            SELECT COUNT(*)
-            FROM winning_records wr
-            LEFT JOIN draws d ON wr.draw_id = d.round_no AND wr.lottery_type = d.lottery_type
-            WHERE d.round_no IS NULL;
-        """)
-        orphan_records = cursor.fetchone()[0]
-        if orphan_records == 0:
-            print("\n✅ winning_records → draws FK 정합성 OK")
-        else:
-            print(f"\n⚠️  draws에 없는 winning_records: {orphan_records}개")
-
-        # FK 정합성: winning_records -> stores
-        cursor.execute("""
-            SELECT COUNT(*)
-            FROM winning_records wr
-            LEFT JOIN stores s ON wr.store_id = s.id
-            WHERE s.id IS NULL;
-        """)
-        orphan_stores = cursor.fetchone()[0]
-        if orphan_stores == 0:
-            print("✅ winning_records → stores FK 정합성 OK")
-        else:
-            print(f"⚠️  stores에 없는 winning_records: {orphan_stores}개")
-
-        # FK 정합성: store_stats -> stores
-        cursor.execute("""
-            SELECT COUNT(*)
-            FROM store_stats ss
-            LEFT JOIN stores s ON ss.store_id = s.id
-            WHERE s.id IS NULL;
-        """)
-        orphan_stats = cursor.fetchone()[0]
-        if orphan_stats == 0:
-            print("✅ store_stats → stores FK 정합성 OK")
-        else:
-            print(f"⚠️  stores에 없는 store_stats: {orphan_stats}개")
-
-        # store_stats 누락 체크
-        cursor.execute("""
-            SELECT COUNT(DISTINCT store_id) FROM winning_records;
-        """)
-        unique_stores_in_wr = cursor.fetchone()[0]
-
-        cursor.execute("SELECT COUNT(*) FROM store_stats;")
-        stats_count = cursor.fetchone()[0]
-
-        if unique_stores_in_wr == stats_count:
-            print(f"✅ store_stats 완전성 OK ({stats_count:,}개)")
-        else:
-            print(f"⚠️  store_stats 누락: winning_records에 {unique_stores_in_wr}개, store_stats에 {stats_count}개")
-
-        # ============================================
-        # 9. 샘플 데이터
-        # ============================================
-        print("\n" + "=" * 70)
-        print("9. 샘플 데이터 (최근 로또 1등 당첨 5건)")
+        print("Supabase 데이터 전체 검증")
         print("=" * 70)
 
-        cursor.execute("""
-            SELECT wr.draw_id, wr.won_at, wr.method, s.name, s.address_raw
-            FROM winning_records wr
-            JOIN stores s ON wr.store_id = s.id
-            WHERE wr.lottery_type = 'LOTTO' AND wr.rank = 1
-            ORDER BY wr.draw_id DESC, wr.won_at DESC
-            LIMIT 5;
-        """)
-        print()
-        for row in cursor.fetchall():
-            print(f"  {row[0]}회차 ({row[1]}) [{row[2]}]")
-            print(f"    {row[3]}")
-            print(f"    {row[4]}")
-            print()
+    database_url = get_database_url()
+    if not database_url:
+        print("❌ DATABASE_URL 환경변수를 찾을 수 없습니다.")
+        sys.exit(1)
 
-        print("=" * 70)
-        print("✅ 데이터 검증 완료!")
-        print("=" * 70)
+    try:
+        import psycopg2  # noqa: F401
+    except ImportError:
+        print("❌ psycopg2가 설치되지 않았습니다.")
+        sys.exit(1)
 
+    try:
+        with job_stage('verify') as stage:
+            result = run_verification(database_url)
+            stage.records = len(result['checks'])
     except Exception as e:
         print(f"\n❌ 오류 발생: {e}")
         import traceback
         traceback.print_exc()
         sys.exit(1)
-    finally:
-        cursor.close()
-        conn.close()
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2, default=str))
+    else:
+        print_report(result)
+    if args.json_output:
+        with open(args.json_output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2, default=str)
+
+    failed = [c for c in result['checks'] if c['status'] == 'fail']
+    if not args.json:
+        print("\n" + "=" * 70)
+        print("✅ 데이터 검증 완료!" if not failed else f"❌ 실패한 검사 {len(failed)}개")
+        print("=" * 70)
+    if args.strict and failed:
+        sys.exit(1)
 
 
 if __name__ == '__main__':
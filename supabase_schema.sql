@@ -30,6 +30,11 @@ CREATE TABLE IF NOT EXISTS stores (
     CONSTRAINT stores_source_id_unique UNIQUE (source_id)
 );
 
+-- stores 공간 인덱스: bbox(<@ box) / 최근접(<-> 정렬) 조회용 (spatial_index.py)
+CREATE INDEX IF NOT EXISTS idx_stores_geo_point
+    ON stores USING gist (point(lng, lat))
+    WHERE lat IS NOT NULL AND lng IS NOT NULL;
+
 -- 3) winning_records 테이블: 당첨 기록
 CREATE TABLE IF NOT EXISTS winning_records (
     source_row_hash VARCHAR(64) PRIMARY KEY,
@@ -41,6 +46,7 @@ CREATE TABLE IF NOT EXISTS winning_records (
     source_seq INTEGER NULL,
     won_at DATE NULL,
     created_at TIMESTAMPTZ DEFAULT now(),
+    updated_at TIMESTAMPTZ DEFAULT now(),  -- 값이 바뀔 때마다 갱신 (store_stats 증분 반영 기준)
     CONSTRAINT winning_records_draw_fkey
         FOREIGN KEY (draw_id, lottery_type) REFERENCES draws(round_no, lottery_type),
     CONSTRAINT winning_records_rank_check CHECK (
@@ -59,17 +65,44 @@ CREATE INDEX IF NOT EXISTS idx_winning_records_won_at
 CREATE INDEX IF NOT EXISTS idx_winning_records_method
     ON winning_records(method);
 
+-- winning_records.updated_at: 기존 테이블에도 추가, 값이 실제로 바뀐 INSERT/UPDATE에서만 갱신
+ALTER TABLE winning_records ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT now();
+CREATE INDEX IF NOT EXISTS idx_winning_records_updated_at
+    ON winning_records(updated_at);
+
+CREATE OR REPLACE FUNCTION touch_winning_records_updated_at() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND (NEW.draw_id, NEW.store_id, NEW.lottery_type, NEW.rank, NEW.method, NEW.source_seq, NEW.won_at)
+           IS NOT DISTINCT FROM
+           (OLD.draw_id, OLD.store_id, OLD.lottery_type, OLD.rank, OLD.method, OLD.source_seq, OLD.won_at) THEN
+        NEW.updated_at := OLD.updated_at;
+    ELSE
+        NEW.updated_at := now();
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS winning_records_touch_updated_at ON winning_records;
+CREATE TRIGGER winning_records_touch_updated_at
+    BEFORE INSERT OR UPDATE ON winning_records
+    FOR EACH ROW EXECUTE FUNCTION touch_winning_records_updated_at();
+
 -- 4) geocode_cache 테이블: 주소 -> 좌표 캐시
 CREATE TABLE IF NOT EXISTS geocode_cache (
     id BIGSERIAL PRIMARY KEY,
     address_hash VARCHAR(64) NOT NULL,
     address TEXT NOT NULL,
-    lat DOUBLE PRECISION NOT NULL,
-    lng DOUBLE PRECISION NOT NULL,
+    lat DOUBLE PRECISION NULL,  -- NULL이면 제공자가 찾지 못한 주소 (음성 캐시, geocode_worker.py)
+    lng DOUBLE PRECISION NULL,
     created_at TIMESTAMPTZ DEFAULT now(),
     CONSTRAINT geocode_cache_address_hash_unique UNIQUE (address_hash)
 );
 
+-- 기존 DB의 geocode_cache도 음성 캐시를 저장할 수 있도록 (이미 NULL 허용이면 변화 없음)
+ALTER TABLE geocode_cache ALTER COLUMN lat DROP NOT NULL, ALTER COLUMN lng DROP NOT NULL;
+
 -- 5) store_stats 테이블: 판매점 통계 (집계용)
 CREATE TABLE IF NOT EXISTS store_stats (
     store_id BIGINT PRIMARY KEY REFERENCES stores(id),
@@ -110,5 +143,80 @@ CREATE TABLE IF NOT EXISTS job_runs (
     lottery_type VARCHAR(10) NULL CHECK (lottery_type IS NULL OR lottery_type IN ('LOTTO','PENSION')),
     records_processed INT DEFAULT 0,
     error_message TEXT NULL,
-    duration_ms BIGINT NULL
+    duration_ms BIGINT NULL,
+    details JSONB NULL  -- 단계별 소요 시간/처리량 (lotto-crawling/job_runs.py)
+);
+
+-- 8) stg_winning_store_rows 테이블: CSV 스테이징 (COPY 적재용, load_data_to_supabase.py --mode copy)
+CREATE UNLOGGED TABLE IF NOT EXISTS stg_winning_store_rows (
+    lottery_type TEXT NOT NULL,
+    round_no INT NOT NULL,
+    draw_date DATE NULL,
+    store_source_id TEXT NOT NULL,
+    source_seq INT NULL,
+    store_name TEXT NOT NULL,
+    prize_raw TEXT NOT NULL,
+    rank SMALLINT NOT NULL,
+    method_raw TEXT NULL,
+    address_raw TEXT NOT NULL,
+    region_raw TEXT NULL,
+    phone_raw TEXT NULL,
+    products_raw TEXT NULL,
+    lat DOUBLE PRECISION NULL,
+    lng DOUBLE PRECISION NULL,
+    coord_status TEXT NULL,
+    loaded_at TIMESTAMPTZ DEFAULT now(),
+    source_row_hash VARCHAR(64) UNIQUE
+);
+
+-- 9) store_stats_applied_records 테이블: store_stats에 반영한 당첨 기록 (populate_store_stats.py --mode incremental)
+-- 반영한 값(store_id/lottery_type/rank/won_at)을 함께 기록해 나중에 바뀐 기록은 차이만 다시 반영
+CREATE TABLE IF NOT EXISTS store_stats_applied_records (
+    source_row_hash VARCHAR(64) PRIMARY KEY,
+    store_id BIGINT NOT NULL,
+    lottery_type VARCHAR(10) NOT NULL,
+    rank SMALLINT NOT NULL,
+    won_at DATE NULL,
+    applied_at TIMESTAMPTZ DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_store_stats_applied_records_won_at
+    ON store_stats_applied_records(won_at);
+
+-- 10) store_stats_meta 테이블: store_stats 집계 기준 (단일 행)
+CREATE TABLE IF NOT EXISTS store_stats_meta (
+    id SMALLINT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    recent_cutoff DATE NOT NULL,
+    applied_through TIMESTAMPTZ NULL,  -- 반영을 마친 winning_records.updated_at 최댓값
+    rebuilt_at TIMESTAMPTZ NULL,
+    updated_at TIMESTAMPTZ DEFAULT now()
+);
+
+-- 11) ranking_cells / ranking_top_stores 테이블: 랭킹 큐브 (ranking_cubes.py)
+-- 셀 = 복권 종류 × 등수 × 방법(ALL 포함) × 기간(ALL/1Y/3Y/5Y) × 지역 단위(ALL/SIDO/SIGUNGU)
+CREATE TABLE IF NOT EXISTS ranking_cells (
+    lottery_type VARCHAR(10) NOT NULL,
+    rank SMALLINT NOT NULL,
+    method VARCHAR(10) NOT NULL,
+    time_window VARCHAR(4) NOT NULL,
+    region_level VARCHAR(10) NOT NULL,
+    region_key TEXT NOT NULL,
+    store_count INT NOT NULL,
+    win_count INT NOT NULL,
+    built_at TIMESTAMPTZ DEFAULT now(),
+    PRIMARY KEY (lottery_type, rank, method, time_window, region_level, region_key)
+);
+
+CREATE TABLE IF NOT EXISTS ranking_top_stores (
+    lottery_type VARCHAR(10) NOT NULL,
+    rank SMALLINT NOT NULL,
+    method VARCHAR(10) NOT NULL,
+    time_window VARCHAR(4) NOT NULL,
+    region_level VARCHAR(10) NOT NULL,
+    region_key TEXT NOT NULL,
+    position SMALLINT NOT NULL,
+    store_id BIGINT NOT NULL REFERENCES stores(id),
+    win_count INT NOT NULL,
+    last_won_at DATE NULL,
+    PRIMARY KEY (lottery_type, rank, method, time_window, region_level, region_key, position)
 );